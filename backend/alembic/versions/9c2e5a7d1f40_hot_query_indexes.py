@@ -0,0 +1,45 @@
+"""hot query indexes
+
+Revision ID: 9c2e5a7d1f40
+Revises: 4bd60ab61176
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2e5a7d1f40'
+down_revision: Union[str, None] = '4bd60ab61176'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns) — every list endpoint pages on (created_at, id), scoped
+# by the leading column where the query has an equality filter.
+INDEXES = [
+    ('ix_cases_created_at_id', 'cases', ['created_at', 'id']),
+    ('ix_cases_lawyer_id_created_at_id', 'cases', ['lawyer_id', 'created_at', 'id']),
+    ('ix_cases_client_id_created_at_id', 'cases', ['client_id', 'created_at', 'id']),
+    ('ix_chat_messages_case_id_created_at_id', 'chat_messages', ['case_id', 'created_at', 'id']),
+    ('ix_chat_messages_user_id', 'chat_messages', ['user_id']),
+    ('ix_documents_case_id_created_at_id', 'documents', ['case_id', 'created_at', 'id']),
+    ('ix_users_created_at_id', 'users', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while large indexes build; it cannot
+    # run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
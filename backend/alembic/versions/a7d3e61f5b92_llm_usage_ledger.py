@@ -0,0 +1,59 @@
+"""llm usage ledger
+
+Revision ID: a7d3e61f5b92
+Revises: f2c47d9e8a13
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e61f5b92'
+down_revision: Union[str, None] = 'f2c47d9e8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('llm_calls',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('case_id', sa.UUID(), nullable=False),
+    sa.Column('purpose', sa.String(length=32), nullable=False),
+    sa.Column('model', sa.String(length=64), nullable=False),
+    sa.Column('step', sa.SmallInteger(), nullable=False),
+    sa.Column('input_tokens', sa.Integer(), nullable=False),
+    sa.Column('output_tokens', sa.Integer(), nullable=False),
+    sa.Column('cache_creation_input_tokens', sa.Integer(), nullable=False),
+    sa.Column('cache_read_input_tokens', sa.Integer(), nullable=False),
+    sa.Column('latency_ms', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('llm_usage_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('case_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('purpose', sa.String(length=32), nullable=False),
+    sa.Column('model', sa.String(length=64), nullable=False),
+    sa.Column('calls', sa.Integer(), nullable=False),
+    sa.Column('input_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('output_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('cache_creation_input_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('cache_read_input_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('latency_ms', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'case_id', 'user_id', 'purpose', 'model')
+    )
+    op.create_index('ix_llm_usage_daily_case_id_day', 'llm_usage_daily', ['case_id', 'day'], unique=False)
+    op.create_index('ix_llm_usage_daily_user_id_day', 'llm_usage_daily', ['user_id', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_llm_usage_daily_user_id_day', table_name='llm_usage_daily')
+    op.drop_index('ix_llm_usage_daily_case_id_day', table_name='llm_usage_daily')
+    op.drop_table('llm_usage_daily')
+    op.drop_table('llm_calls')
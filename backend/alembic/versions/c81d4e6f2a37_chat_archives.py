@@ -0,0 +1,67 @@
+"""chat archives
+
+Revision ID: c81d4e6f2a37
+Revises: a7d3e61f5b92
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d4e6f2a37'
+down_revision: Union[str, None] = 'a7d3e61f5b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_archives',
+    sa.Column('case_id', sa.UUID(), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('case_id')
+    )
+    # The payload is compressed already; don't let TOAST try again.
+    op.execute('ALTER TABLE chat_archives ALTER COLUMN payload SET STORAGE EXTERNAL')
+    op.add_column('cases', sa.Column('chat_archived_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('cases', sa.Column('chat_restored_at', sa.DateTime(timezone=True), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_cases_closed_unarchived_updated_at_id',
+            'cases',
+            ['updated_at', 'id'],
+            postgresql_where=sa.text("status = 'closed' AND chat_archived_at IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    # Put archived messages back before the archive goes; Postgres cannot
+    # inflate zlib, so they go through Python.
+    conn = op.get_bind()
+    for case_id, payload in conn.execute(sa.text('SELECT case_id, payload FROM chat_archives')):
+        conn.execute(
+            sa.text(
+                """
+                INSERT INTO chat_messages (id, case_id, user_id, role, content, created_at, updated_at)
+                SELECT (m->>'id')::uuid, :case_id, u.id, (m->>'role')::messagerole, m->>'content',
+                       (m->>'created_at')::timestamptz, (m->>'updated_at')::timestamptz
+                FROM jsonb_array_elements(CAST(:messages AS jsonb)) AS m
+                LEFT JOIN users u ON u.id = (m->>'user_id')::uuid
+                ON CONFLICT (id) DO NOTHING
+                """
+            ),
+            {'case_id': case_id, 'messages': zlib.decompress(payload).decode()},
+        )
+    op.drop_index('ix_cases_closed_unarchived_updated_at_id', table_name='cases')
+    op.drop_column('cases', 'chat_restored_at')
+    op.drop_column('cases', 'chat_archived_at')
+    op.drop_table('chat_archives')
@@ -0,0 +1,38 @@
+"""document analysis claims
+
+Revision ID: f2c47d9e8a13
+Revises: e5a91c3b7d24
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c47d9e8a13'
+down_revision: Union[str, None] = 'e5a91c3b7d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('analysis_started_at', sa.DateTime(timezone=True), nullable=True))
+    # Partial, so it only holds the few documents being analyzed; built
+    # concurrently like the hot query indexes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_documents_analyzing_started_at',
+            'documents',
+            ['analysis_started_at'],
+            postgresql_where=sa.text("status = 'analyzing'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_analyzing_started_at', table_name='documents')
+    op.drop_column('documents', 'analysis_started_at')
@@ -1,14 +1,32 @@
+import time
 from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from app.config import settings
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.APP_ENV == "development",
-    pool_pre_ping=True,
-)
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.APP_ENV == "development",
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+replica_engine = _create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else None
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -16,8 +34,33 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Read sessions open their transactions as BEGIN READ ONLY; the option travels
+# with the BEGIN, so it costs no extra round trip.
+PrimaryReadSessionLocal = async_sessionmaker(
+    engine.execution_options(postgresql_readonly=True),
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+ReplicaReadSessionLocal = (
+    async_sessionmaker(
+        replica_engine.execution_options(postgresql_readonly=True),
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    if replica_engine is not None
+    else None
+)
+
+_replica_down_until = 0.0
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+
+@asynccontextmanager
+async def session_scope() -> AsyncGenerator[AsyncSession, None]:
+    """One short unit of work: commit on success, roll back on error, then release.
+
+    Routes that await slow external calls (Claude) use this instead of ``get_db``
+    so no pooled connection or open transaction is held while they wait.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -25,3 +68,43 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with session_scope() as session:
+        yield session
+
+
+async def _open_read_session() -> AsyncSession:
+    global _replica_down_until
+    if ReplicaReadSessionLocal is not None and time.monotonic() >= _replica_down_until:
+        session = ReplicaReadSessionLocal()
+        try:
+            # Connect eagerly so an unreachable replica falls back to the primary
+            # here rather than failing the route's first query.
+            await session.connection()
+            return session
+        except (DBAPIError, OSError):
+            await session.close()
+            _replica_down_until = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+    return PrimaryReadSessionLocal()
+
+
+@asynccontextmanager
+async def read_session_scope() -> AsyncGenerator[AsyncSession, None]:
+    """READ ONLY session that is never committed.
+
+    Served by DATABASE_READ_URL when configured, so results may trail the
+    primary by the replica's lag.
+    """
+    session = await _open_read_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for GET routes; see ``read_session_scope``."""
+    async with read_session_scope() as session:
+        yield session
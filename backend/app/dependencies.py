@@ -1,43 +1,78 @@
+import uuid
 from collections.abc import Callable
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import AsyncSessionLocal
 from app.models.user import User, UserRole
-from app.services.auth_service import decode_access_token
+from app.services.auth_service import decode_access_token, decode_download_token
+from app.services.user_cache import UserSnapshot, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
-    credentials_exc = HTTPException(
+def _credentials_exc() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> UserSnapshot:
     try:
-        user_id = decode_access_token(token)
+        user_id = uuid.UUID(decode_access_token(token))
     except ValueError:
-        raise credentials_exc
+        raise _credentials_exc()
+    return await _active_user(user_id)
+
+
+async def get_download_user(
+    request: Request,
+    bearer: Annotated[str | None, Depends(optional_oauth2_scheme)],
+    token: str | None = None,
+) -> UserSnapshot:
+    """The bearer token's user, or the user a signed link for this path was made for."""
+    if bearer is not None:
+        return await get_current_user(bearer)
+    if token is None:
+        raise _credentials_exc()
+    try:
+        user_id = uuid.UUID(decode_download_token(token, request.url.path))
+    except ValueError:
+        raise _credentials_exc() from None
+    return await _active_user(user_id)
+
+
+async def _active_user(user_id: uuid.UUID) -> UserSnapshot:
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
 
-    result = await session.execute(select(User).where(User.id == user_id, User.is_active == True))  # noqa: E712
-    user = result.scalar_one_or_none()
+    # A separate, immediately released session: routes that avoid get_db while
+    # waiting on Claude must not inherit a connection from the auth lookup.
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(User).where(User.id == user_id, User.is_active == True)  # noqa: E712
+        )
+        user = result.scalar_one_or_none()
     if user is None:
-        raise credentials_exc
-    return user
+        raise _credentials_exc()
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.set(snapshot.id, snapshot)
+    return snapshot
 
 
 def require_roles(*roles: UserRole) -> Callable:
     async def dependency(
-        current_user: Annotated[User, Depends(get_current_user)],
-    ) -> User:
+        current_user: Annotated[UserSnapshot, Depends(get_current_user)],
+    ) -> UserSnapshot:
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -48,5 +83,6 @@ def require_roles(*roles: UserRole) -> Callable:
     return dependency
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
-AdminUser = Annotated[User, Depends(require_roles(UserRole.admin))]
+CurrentUser = Annotated[UserSnapshot, Depends(get_current_user)]
+DownloadUser = Annotated[UserSnapshot, Depends(get_download_user)]
+AdminUser = Annotated[UserSnapshot, Depends(require_roles(UserRole.admin))]
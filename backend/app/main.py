@@ -1,14 +1,68 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.config import settings
-from app.routers import auth, cases, chat, documents, users
+from app.database import engine, replica_engine
+from app.routers import auth, cases, chat, documents, events, usage, users
+from app.services import web_search
+from app.services.auth_service import password_hasher
+from app.services.case_events import case_events
+from app.services.chat_archive import run_chat_archival
+from app.services.document_analysis import run_analysis_recovery
+from app.services.drain import drain
+from app.services.request_timing import (
+    RequestTimingMiddleware,
+    instrument_engine,
+    render_metrics,
+)
+from app.services.upload_gc import run_upload_gc
+from app.services.usage_ledger import usage_ledger
+from app.services.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup finishes before the worker accepts connections, so the first
+    # request does not pay for cold pools and imports.
+    app.state.warmup = await warm_up() if settings.WARMUP_ON_STARTUP else None
+    upload_gc = None
+    if settings.UPLOAD_GC_INTERVAL_SECONDS > 0:
+        upload_gc = asyncio.create_task(run_upload_gc())
+    analysis_recovery = None
+    if settings.ANALYSIS_RECOVERY_INTERVAL_SECONDS > 0:
+        analysis_recovery = asyncio.create_task(run_analysis_recovery())
+    chat_archival = None
+    if settings.CHAT_ARCHIVE_INTERVAL_SECONDS > 0:
+        chat_archival = asyncio.create_task(run_chat_archival())
+    usage_ledger.start()
+    drain.install_signal_handlers()
+    # Streams end with resync so clients reconnect to a worker that stays up.
+    drain.on_drain(case_events.close_subscriptions)
+    yield
+    # Runs once uvicorn has stopped serving; calls it gave up on may still be
+    # finishing and need the database and event broker.
+    await drain.wait()
+    await usage_ledger.stop()
+    for task in (upload_gc, analysis_recovery, chat_archival):
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    await case_events.close()
+    await web_search.close()
+
 
 app = FastAPI(
     title="OpenClaw API",
     description="Legal AI assistant backend",
     version="0.1.0",
     redirect_slashes=False,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -18,14 +72,44 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so the timings cover the whole stack.
+app.add_middleware(RequestTimingMiddleware)
+
+instrument_engine(engine)
+if replica_engine is not None:
+    instrument_engine(replica_engine)
 
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(cases.router)
 app.include_router(documents.router)
 app.include_router(chat.router)
+app.include_router(events.router)
+app.include_router(usage.router)
 
 
 @app.get("/health", tags=["health"])
-async def health():
-    return {"status": "ok", "version": "0.1.0"}
+async def health(request: Request):
+    return {
+        "status": "draining" if drain.draining else "ok",
+        "version": "0.1.0",
+        "password_hasher": password_hasher.stats(),
+        "warmup": getattr(request.app.state, "warmup", None),
+    }
+
+
+@app.get("/health/ready", tags=["health"])
+async def ready():
+    """Readiness: 503 once the worker is shutting down, so no new traffic is routed here."""
+    if drain.draining:
+        return JSONResponse(
+            {"status": "draining", "in_flight": drain.in_flight},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return {"status": "ready", "in_flight": drain.in_flight}
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics():
+    """Per-route request timing histograms of this worker, in Prometheus text format."""
+    return render_metrics()
@@ -3,6 +3,10 @@ from app.models.user import User, UserRole
 from app.models.case import Case, CaseStatus
 from app.models.document import Document, DocumentStatus
 from app.models.chat_message import ChatMessage, MessageRole
+from app.models.chat_archive import ChatArchive
+from app.models.rate_limit import RateLimitBucket
+from app.models.idempotency_key import IdempotencyKey
+from app.models.llm_usage import LLMCall, LLMUsageDaily
 
 __all__ = [
     "Base",
@@ -15,4 +19,9 @@ __all__ = [
     "DocumentStatus",
     "ChatMessage",
     "MessageRole",
+    "ChatArchive",
+    "RateLimitBucket",
+    "IdempotencyKey",
+    "LLMCall",
+    "LLMUsageDaily",
 ]
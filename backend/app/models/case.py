@@ -1,7 +1,8 @@
 import enum
 import uuid
+from datetime import datetime
 
-from sqlalchemy import Enum, ForeignKey, String, Text
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,6 +17,18 @@ class CaseStatus(str, enum.Enum):
 
 class Case(Base, TimestampMixin):
     __tablename__ = "cases"
+    __table_args__ = (
+        Index("ix_cases_created_at_id", "created_at", "id"),
+        Index("ix_cases_lawyer_id_created_at_id", "lawyer_id", "created_at", "id"),
+        Index("ix_cases_client_id_created_at_id", "client_id", "created_at", "id"),
+        # Candidates for the chat archival sweep.
+        Index(
+            "ix_cases_closed_unarchived_updated_at_id",
+            "updated_at",
+            "id",
+            postgresql_where=text("status = 'closed' AND chat_archived_at IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -25,6 +38,14 @@ class Case(Base, TimestampMixin):
     status: Mapped[CaseStatus] = mapped_column(
         Enum(CaseStatus), nullable=False, default=CaseStatus.open
     )
+    # Set while the chat history lives in chat_archives instead of chat_messages.
+    chat_archived_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Last restore from the archive; restarts the archival clock.
+    chat_restored_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     lawyer_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
@@ -39,9 +60,11 @@ class Case(Base, TimestampMixin):
     client: Mapped["User | None"] = relationship(  # noqa: F821
         "User", back_populates="client_cases", foreign_keys=[client_id]
     )
+    # The foreign keys cascade in the database, so deleting a case is one
+    # statement rather than loading and deleting every child row.
     documents: Mapped[list["Document"]] = relationship(  # noqa: F821
-        "Document", back_populates="case", cascade="all, delete-orphan"
+        "Document", back_populates="case", cascade="all, delete-orphan", passive_deletes=True
     )
     chat_messages: Mapped[list["ChatMessage"]] = relationship(  # noqa: F821
-        "ChatMessage", back_populates="case", cascade="all, delete-orphan"
+        "ChatMessage", back_populates="case", cascade="all, delete-orphan", passive_deletes=True
     )
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Enum, ForeignKey, Text
+from sqlalchemy import Enum, ForeignKey, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -15,6 +15,10 @@ class MessageRole(str, enum.Enum):
 
 class ChatMessage(Base, TimestampMixin):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_case_id_created_at_id", "case_id", "created_at", "id"),
+        Index("ix_chat_messages_user_id", "user_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
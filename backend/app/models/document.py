@@ -1,7 +1,8 @@
 import enum
 import uuid
+from datetime import datetime
 
-from sqlalchemy import Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -17,6 +18,15 @@ class DocumentStatus(str, enum.Enum):
 
 class Document(Base, TimestampMixin):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_case_id_created_at_id", "case_id", "created_at", "id"),
+        # Finds analyses left running by crashed workers.
+        Index(
+            "ix_documents_analyzing_started_at",
+            "analysis_started_at",
+            postgresql_where=text("status = 'analyzing'"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -35,5 +45,9 @@ class Document(Base, TimestampMixin):
     extracted_text: Mapped[str | None] = mapped_column(Text, nullable=True)
     ai_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     ai_key_points: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # When the current or last analysis was claimed; see document_analysis.
+    analysis_started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     case: Mapped["Case"] = relationship("Case", back_populates="documents")  # noqa: F821
@@ -0,0 +1,51 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Index, Integer, SmallInteger, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class LLMCall(Base):
+    """One Claude API call. Append-only; ids are kept without foreign keys so
+    the record outlives deleted cases and users."""
+
+    __tablename__ = "llm_calls"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    case_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    purpose: Mapped[str] = mapped_column(String(32), nullable=False)
+    model: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Position of the call within its chat turn's tool loop.
+    step: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+    input_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
+    output_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
+    cache_creation_input_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
+    cache_read_input_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
+    latency_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class LLMUsageDaily(Base):
+    """``llm_calls`` summed per UTC day, case, user, purpose and model."""
+
+    __tablename__ = "llm_usage_daily"
+    __table_args__ = (
+        Index("ix_llm_usage_daily_case_id_day", "case_id", "day"),
+        Index("ix_llm_usage_daily_user_id_day", "user_id", "day"),
+    )
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    case_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    purpose: Mapped[str] = mapped_column(String(32), primary_key=True)
+    model: Mapped[str] = mapped_column(String(64), primary_key=True)
+    calls: Mapped[int] = mapped_column(Integer, nullable=False)
+    input_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    output_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    cache_creation_input_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    cache_read_input_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    latency_ms: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Boolean, Enum, String
+from sqlalchemy import Boolean, Enum, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,6 +16,7 @@ class UserRole(str, enum.Enum):
 
 class User(Base, TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -29,8 +30,8 @@ class User(Base, TimestampMixin):
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
     lawyer_cases: Mapped[list["Case"]] = relationship(  # noqa: F821
-        "Case", back_populates="lawyer", foreign_keys="Case.lawyer_id"
+        "Case", back_populates="lawyer", foreign_keys="Case.lawyer_id", passive_deletes=True
     )
     client_cases: Mapped[list["Case"]] = relationship(  # noqa: F821
-        "Case", back_populates="client", foreign_keys="Case.client_id"
+        "Case", back_populates="client", foreign_keys="Case.client_id", passive_deletes=True
     )
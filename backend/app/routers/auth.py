@@ -11,9 +11,13 @@ from app.models.user import User
 from app.schemas.auth import LoginResponse, RegisterRequest
 from app.schemas.user import UserRead, UserUpdate
 from app.services.auth_service import create_access_token, hash_password, verify_password
+from app.services.case_service import get_user_or_404
+from app.services.rate_limit import LOGIN, rate_limit_by_ip
+from app.services.request_timing import TimedRoute, query_budget
+from app.services.user_cache import invalidate_user
 from app.utils.exceptions import conflict
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -25,7 +29,7 @@ async def register(body: RegisterRequest, session: Annotated[AsyncSession, Depen
     user = User(
         email=body.email,
         full_name=body.full_name,
-        hashed_password=hash_password(body.password),
+        hashed_password=await hash_password(body.password),
         role=body.role,
     )
     session.add(user)
@@ -34,24 +38,34 @@ async def register(body: RegisterRequest, session: Annotated[AsyncSession, Depen
     return user
 
 
-@router.post("/login", response_model=LoginResponse)
+@router.post(
+    "/login", response_model=LoginResponse, dependencies=[Depends(rate_limit_by_ip(LOGIN))]
+)
 async def login(
     form: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Annotated[AsyncSession, Depends(get_db)],
 ):
+    invalid_credentials = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
     result = await session.execute(select(User).where(User.email == form.username))
     user = result.scalar_one_or_none()
-    if user is None or not verify_password(form.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    if user is None:
+        raise invalid_credentials
+    verified, new_hash = await verify_password(form.password, user.hashed_password)
+    if not verified:
+        raise invalid_credentials
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        session.add(user)
     token = create_access_token(str(user.id))
     return LoginResponse(access_token=token)
 
 
 @router.get("/me", response_model=UserRead)
+@query_budget(3)
 async def get_me(current_user: CurrentUser):
     return current_user
 
@@ -62,18 +76,20 @@ async def update_me(
     current_user: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_db)],
 ):
+    user = await get_user_or_404(session, current_user.id)
     if body.email is not None:
         existing = await session.execute(
-            select(User).where(User.email == body.email, User.id != current_user.id)
+            select(User).where(User.email == body.email, User.id != user.id)
         )
         if existing.scalar_one_or_none():
             raise conflict("Email already in use")
-        current_user.email = body.email
+        user.email = body.email
     if body.full_name is not None:
-        current_user.full_name = body.full_name
+        user.full_name = body.full_name
     if body.password is not None:
-        current_user.hashed_password = hash_password(body.password)
-    session.add(current_user)
+        user.hashed_password = await hash_password(body.password)
+    session.add(user)
     await session.flush()
-    await session.refresh(current_user)
-    return current_user
+    await session.refresh(user)
+    invalidate_user(session, user.id)
+    return user
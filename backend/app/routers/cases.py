@@ -1,23 +1,46 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.dependencies import CurrentUser
-from app.models.case import Case
+from app.database import get_db, get_read_db, read_session_scope
+from app.dependencies import CurrentUser, DownloadUser
+from app.models.case import Case, CaseStatus
 from app.models.user import UserRole
-from app.schemas.case import CaseAssign, CaseCreate, CaseRead, CaseUpdate
+from app.schemas.auth import DownloadLink
+from app.schemas.case import (
+    CaseAssign,
+    CaseCreate,
+    CaseDetail,
+    CaseRead,
+    CaseStats,
+    CaseUpdate,
+)
+from app.schemas.pagination import Page
+from app.services.auth_service import download_link
+from app.services.case_bundle import stream_case_bundle
+from app.services.case_events import publish_case_event
 from app.services.case_service import (
     assert_case_access,
+    authorize_case,
+    case_access_cache,
+    case_stats_cache,
+    filter_case_list,
     get_case_or_404,
+    get_case_stats,
     get_user_or_404,
     list_cases_for_user,
 )
+from app.services.document_service import remove_case_uploads
+from app.services.request_timing import TimedRoute, query_budget
+from app.utils.etag import is_not_modified, not_modified, page_etag, set_etag
 from app.utils.exceptions import forbidden
+from app.utils.pagination import Pagination
 
-router = APIRouter(prefix="/cases", tags=["cases"])
+router = APIRouter(prefix="/cases", tags=["cases"], route_class=TimedRoute)
 
 
 @router.post("", response_model=CaseRead, status_code=status.HTTP_201_CREATED)
@@ -34,29 +57,76 @@ async def create_case(
     session.add(case)
     await session.flush()
     await session.refresh(case)
+    case_stats_cache.invalidate(current_user.id)
     return case
 
 
-@router.get("", response_model=list[CaseRead])
+@router.get("", response_model=Page[CaseRead])
+@query_budget(6)
 async def list_cases(
+    request: Request,
+    response: Response,
     current_user: CurrentUser,
-    session: Annotated[AsyncSession, Depends(get_db)],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
+    page: Pagination,
+    status: CaseStatus | None = None,
+):
+    versions = filter_case_list(
+        select(Case.id, Case.created_at, Case.updated_at), current_user, status
+    )
+    etag = await page_etag(session, versions, Case, page)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await list_cases_for_user(session, current_user, page, status)
+
+
+@router.get("/stats", response_model=CaseStats)
+@query_budget(4)
+async def case_stats(
+    current_user: CurrentUser,
+    session: Annotated[AsyncSession, Depends(get_read_db)],
 ):
-    return await list_cases_for_user(session, current_user)
+    return await get_case_stats(session, current_user)
 
 
-@router.get("/{case_id}", response_model=CaseRead)
+@router.get("/{case_id}", response_model=CaseDetail)
+@query_budget(4)
 async def get_case(
     case_id: uuid.UUID,
     current_user: CurrentUser,
-    session: Annotated[AsyncSession, Depends(get_db)],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
 ):
     case = await get_case_or_404(session, case_id)
     assert_case_access(case, current_user)
     return case
 
 
-@router.put("/{case_id}", response_model=CaseRead)
+@router.post("/{case_id}/bundle/link", response_model=DownloadLink)
+async def link_case_bundle(case_id: uuid.UUID, request: Request, current_user: CurrentUser):
+    """Signed, short-lived URL for the bundle, so the browser can download it itself."""
+    async with read_session_scope() as session:
+        await authorize_case(session, case_id, current_user)
+    path = request.app.url_path_for("download_case_bundle", case_id=str(case_id))
+    return download_link(str(current_user.id), path)
+
+
+@router.get("/{case_id}/bundle")
+async def download_case_bundle(case_id: uuid.UUID, current_user: DownloadUser):
+    """Zip of all documents, a manifest with their analyses and the chat transcript.
+
+    Takes a bearer token or the ``token`` of a link from ``POST .../bundle/link``.
+    """
+    async with read_session_scope() as session:
+        await authorize_case(session, case_id, current_user)
+    return StreamingResponse(
+        stream_case_bundle(case_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="case-{case_id}.zip"'},
+    )
+
+
+@router.put("/{case_id}", response_model=CaseDetail)
 async def update_case(
     case_id: uuid.UUID,
     body: CaseUpdate,
@@ -72,6 +142,8 @@ async def update_case(
     session.add(case)
     await session.flush()
     await session.refresh(case)
+    case_stats_cache.invalidate(current_user.id)
+    await publish_case_event(session, case_id, "case.updated")
     return case
 
 
@@ -80,14 +152,21 @@ async def delete_case(
     case_id: uuid.UUID,
     current_user: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_db)],
+    background_tasks: BackgroundTasks,
 ):
     case = await get_case_or_404(session, case_id)
     if current_user.role != UserRole.admin:
         raise forbidden("Only admins can delete cases")
+    # Documents and messages go with it through ON DELETE CASCADE.
     await session.delete(case)
+    case_access_cache.invalidate(case_id)
+    await publish_case_event(session, case_id, "case.deleted")
+    case_stats_cache.invalidate(current_user.id)
+    # Runs after the commit, so a rolled-back delete keeps its files.
+    background_tasks.add_task(remove_case_uploads, case_id)
 
 
-@router.post("/{case_id}/assign", response_model=CaseRead)
+@router.post("/{case_id}/assign", response_model=CaseDetail)
 async def assign_case(
     case_id: uuid.UUID,
     body: CaseAssign,
@@ -112,4 +191,6 @@ async def assign_case(
     session.add(case)
     await session.flush()
     await session.refresh(case)
+    case_access_cache.invalidate(case_id)
+    await publish_case_event(session, case_id, "case.assigned")
     return case
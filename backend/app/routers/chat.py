@@ -1,82 +1,220 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.dependencies import CurrentUser
+from app.database import (
+    PrimaryReadSessionLocal,
+    get_db,
+    get_read_db,
+    read_session_scope,
+    session_scope,
+)
+from app.dependencies import CurrentUser, DownloadUser
 from app.models.chat_message import ChatMessage, MessageRole
-from app.schemas.chat import ChatMessageCreate, ChatMessageRead
-from app.services.case_service import assert_case_access, get_case_or_404
+from app.schemas.auth import DownloadLink
+from app.schemas.chat import ChatMessageCreate, ChatMessageRead, ChatRestore
+from app.schemas.pagination import Page
+from app.services.auth_service import download_link
+from app.services.case_events import publish_case_event
+from app.services.case_service import authorize_case
+from app.services.chat_archive import restore_chat
+from app.services.chat_export import (
+    EXPORT_EXTENSIONS,
+    EXPORT_MEDIA_TYPES,
+    ExportFormat,
+    export_transcript,
+)
 from app.services.claude_service import chat_with_claude
+from app.services.drain import drain, reject_if_draining
+from app.services.idempotency import IdempotencyKeyHeader, idempotent, request_fingerprint
+from app.services.rate_limit import CHAT, LLM_TOKENS, charge_llm_tokens, enforce_rate_limit
+from app.services.request_timing import TimedRoute, query_budget
+from app.services.user_cache import UserSnapshot
+from app.utils.etag import is_not_modified, not_modified, page_etag, set_etag
 from app.utils.exceptions import not_found
+from app.utils.pagination import PageParams, Pagination, paginate
+from app.utils.responses import columns_for, page_response
 
-router = APIRouter(prefix="/cases/{case_id}/chat", tags=["chat"])
+router = APIRouter(
+    prefix="/cases/{case_id}/chat", tags=["chat"], route_class=TimedRoute
+)
 
 
-@router.post("", response_model=list[ChatMessageRead], status_code=status.HTTP_201_CREATED)
+async def _answer(case_id: uuid.UUID, user_id: uuid.UUID, messages: list[dict]) -> ChatMessage:
+    ai_content, usage = await chat_with_claude(messages, case_id=case_id, user_id=user_id)
+    await charge_llm_tokens(user_id, usage.total_tokens)
+    async with session_scope() as session:
+        ai_msg = ChatMessage(
+            case_id=case_id,
+            user_id=None,
+            role=MessageRole.assistant,
+            content=ai_content,
+        )
+        session.add(ai_msg)
+        await session.flush()
+        await publish_case_event(session, case_id, "message.created", id=ai_msg.id)
+        await session.refresh(ai_msg)
+    return ai_msg
+
+
+async def _send(case_id: uuid.UUID, content: str, current_user: UserSnapshot) -> list[dict]:
+    # Save the user message and load context, then commit so no connection is
+    # held while Claude runs (up to 10 tool iterations).
+    async with session_scope() as session:
+        access = await authorize_case(session, case_id, current_user)
+        if access.chat_archived:
+            await restore_chat(session, case_id)
+
+        user_msg = ChatMessage(
+            case_id=case_id,
+            user_id=current_user.id,
+            role=MessageRole.user,
+            content=content,
+        )
+        session.add(user_msg)
+        await session.flush()
+        await publish_case_event(session, case_id, "message.created", id=user_msg.id)
+
+        # Load last 20 messages for context
+        history_result = await session.execute(
+            select(ChatMessage)
+            .where(ChatMessage.case_id == case_id)
+            .order_by(ChatMessage.created_at.desc())
+            .limit(20)
+        )
+        history = list(reversed(history_result.scalars().all()))
+        await session.refresh(user_msg)
+
+    messages = [{"role": msg.role.value, "content": msg.content} for msg in history]
+
+    # Get AI response; it is stored even if the request is cut off by a shutdown.
+    ai_msg = await drain.run(_answer(case_id, current_user.id, messages))
+    return [ChatMessageRead.model_validate(m).model_dump(mode="json") for m in (user_msg, ai_msg)]
+
+
+@router.post(
+    "",
+    response_model=list[ChatMessageRead],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(reject_if_draining)],
+)
+@query_budget(20)
 async def send_message(
     case_id: uuid.UUID,
     body: ChatMessageCreate,
     current_user: CurrentUser,
-    session: Annotated[AsyncSession, Depends(get_db)],
+    response: Response,
+    idempotency_key: IdempotencyKeyHeader = None,
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
-
-    # Save user message
-    user_msg = ChatMessage(
-        case_id=case_id,
-        user_id=current_user.id,
-        role=MessageRole.user,
-        content=body.content,
-    )
-    session.add(user_msg)
-    await session.flush()
-
-    # Load last 20 messages for context
-    history_result = await session.execute(
-        select(ChatMessage)
-        .where(ChatMessage.case_id == case_id)
-        .order_by(ChatMessage.created_at.desc())
-        .limit(20)
+    async def send():
+        # Limited only when the message is really sent, not when a retry is replayed.
+        await enforce_rate_limit(response, current_user.id, LLM_TOKENS, CHAT)
+        return await _send(case_id, body.content, current_user)
+
+    # A retry with the same Idempotency-Key gets the first answer back.
+    return await idempotent(
+        current_user.id,
+        idempotency_key,
+        request_fingerprint("chat", case_id, body.content),
+        send,
+        response,
     )
-    history = list(reversed(history_result.scalars().all()))
 
-    messages = [{"role": msg.role.value, "content": msg.content} for msg in history]
 
-    # Get AI response
-    ai_content = await chat_with_claude(messages)
+@router.get("", response_model=Page[ChatMessageRead])
+@query_budget(6)
+async def list_messages(
+    request: Request,
+    case_id: uuid.UUID,
+    current_user: CurrentUser,
+    session: Annotated[AsyncSession, Depends(get_read_db)],
+    page: Pagination,
+    role: MessageRole | None = None,
+):
+    # An archived history is not listed until POST .../restore brings it back;
+    # GET requests never write.
+    access = await authorize_case(session, case_id, current_user)
+    if access.chat_archived:
+        # The flag may be cached from before a restore the replica has not
+        # caught up with yet.
+        async with PrimaryReadSessionLocal() as primary:
+            return await _message_page(request, primary, case_id, page, role)
+    return await _message_page(request, session, case_id, page, role)
 
-    ai_msg = ChatMessage(
-        case_id=case_id,
-        user_id=None,
-        role=MessageRole.assistant,
-        content=ai_content,
+
+async def _message_page(
+    request: Request,
+    session: AsyncSession,
+    case_id: uuid.UUID,
+    page: PageParams,
+    role: MessageRole | None,
+):
+    # Pages run newest-first so the first one holds the latest messages and
+    # next_cursor walks back through history; each page is returned oldest-first.
+    criteria = [ChatMessage.case_id == case_id]
+    if role is not None:
+        criteria.append(ChatMessage.role == role)
+    # Messages are never edited, so ids alone version a page and the check is
+    # answered from the (case_id, created_at, id) index.
+    versions = select(ChatMessage.id, ChatMessage.created_at).where(*criteria)
+    etag = await page_etag(session, versions, ChatMessage, page)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    stmt = select(*columns_for(ChatMessageRead, ChatMessage)).where(*criteria)
+    result = await paginate(session, stmt, ChatMessage, page, scalars=False)
+    result["items"].reverse()
+    response = page_response(result)
+    set_etag(response, etag)
+    return response
+
+
+@router.post("/export/link", response_model=DownloadLink)
+async def link_export(
+    case_id: uuid.UUID,
+    request: Request,
+    current_user: CurrentUser,
+    format: ExportFormat = ExportFormat.ndjson,
+):
+    """Signed, short-lived URL for the export, so the browser can download it itself."""
+    async with read_session_scope() as session:
+        await authorize_case(session, case_id, current_user)
+    path = request.app.url_path_for("export_messages", case_id=str(case_id))
+    return download_link(str(current_user.id), path, format=format.value)
+
+
+@router.get("/export")
+async def export_messages(
+    case_id: uuid.UUID,
+    current_user: DownloadUser,
+    format: ExportFormat = ExportFormat.ndjson,
+):
+    """Download the whole conversation as NDJSON, Markdown or CSV, streamed.
+
+    Takes a bearer token or the ``token`` of a link from ``POST .../export/link``.
+    """
+    async with read_session_scope() as session:
+        await authorize_case(session, case_id, current_user)
+    filename = f"case-{case_id}-chat.{EXPORT_EXTENSIONS[format]}"
+    return StreamingResponse(
+        export_transcript(case_id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
-    session.add(ai_msg)
-    await session.flush()
-    await session.refresh(user_msg)
-    await session.refresh(ai_msg)
-    return [user_msg, ai_msg]
 
 
-@router.get("", response_model=list[ChatMessageRead])
-async def list_messages(
+@router.post("/restore", response_model=ChatRestore)
+async def restore_messages(
     case_id: uuid.UUID,
     current_user: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_db)],
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
-    result = await session.execute(
-        select(ChatMessage)
-        .where(ChatMessage.case_id == case_id)
-        .order_by(ChatMessage.created_at.asc())
-    )
-    return list(result.scalars().all())
+    """Bring an archived chat history back; a no-op for a case that is not archived."""
+    await authorize_case(session, case_id, current_user)
+    return ChatRestore(restored=await restore_chat(session, case_id))
 
 
 @router.delete("/{msg_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -86,8 +224,9 @@ async def delete_message(
     current_user: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_db)],
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
+    access = await authorize_case(session, case_id, current_user)
+    if access.chat_archived:
+        await restore_chat(session, case_id)
     result = await session.execute(
         select(ChatMessage).where(ChatMessage.id == msg_id, ChatMessage.case_id == case_id)
     )
@@ -95,3 +234,4 @@ async def delete_message(
     if msg is None:
         raise not_found("Message")
     await session.delete(msg)
+    await publish_case_event(session, case_id, "message.deleted", id=msg_id)
@@ -1,27 +1,64 @@
+import asyncio
 import uuid
 from pathlib import Path
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, UploadFile, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
 from fastapi.responses import FileResponse
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db, session_scope
 from app.dependencies import CurrentUser
 from app.models.document import Document, DocumentStatus
-from app.schemas.document import DocumentRead
-from app.services.case_service import assert_case_access, get_case_or_404
+from app.schemas.document import DocumentRead, DocumentUploadResult
+from app.schemas.pagination import Page
+from app.services.case_events import publish_case_event, publish_case_events
+from app.services.case_service import authorize_case
 from app.services.claude_service import analyze_document_with_claude
 from app.services.document_service import (
-    ALLOWED_MIME_TYPES,
+    check_upload_type,
+    extract_documents,
     extract_text,
-    save_upload,
+    remove_upload,
+    stream_upload,
 )
+from app.services.document_analysis import analyze_once
+from app.services.drain import reject_if_draining
+from app.services.idempotency import IdempotencyKeyHeader, idempotent, request_fingerprint
+from app.services.rate_limit import ANALYZE, LLM_TOKENS, charge_llm_tokens, enforce_rate_limit
+from app.services.request_timing import TimedRoute, query_budget
+from app.services.user_cache import UserSnapshot
 from app.config import settings
+from app.utils.etag import is_not_modified, not_modified, page_etag, set_etag
 from app.utils.exceptions import bad_request, not_found
+from app.utils.pagination import Pagination, paginate
+from app.utils.responses import columns_for, page_response
+
+router = APIRouter(
+    prefix="/cases/{case_id}/documents", tags=["documents"], route_class=TimedRoute
+)
 
-router = APIRouter(prefix="/cases/{case_id}/documents", tags=["documents"])
+
+async def _get_document_or_404(
+    session: AsyncSession, case_id: uuid.UUID, doc_id: uuid.UUID
+) -> Document:
+    result = await session.execute(
+        select(Document).where(Document.id == doc_id, Document.case_id == case_id)
+    )
+    doc = result.scalar_one_or_none()
+    if doc is None:
+        raise not_found("Document")
+    return doc
 
 
 @router.post("/upload", response_model=DocumentRead, status_code=status.HTTP_201_CREATED)
@@ -31,125 +68,233 @@ async def upload_document(
     current_user: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_db)],
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
-
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise bad_request(f"Unsupported file type: {file.content_type}")
-
-    file_bytes = await file.read()
-    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
-    if len(file_bytes) > max_bytes:
-        raise bad_request(f"File exceeds maximum size of {settings.MAX_UPLOAD_SIZE_MB}MB")
-
-    ext = Path(file.filename or "file").suffix
-    unique_name, file_path = await save_upload(case_id, file_bytes, ext)
+    await authorize_case(session, case_id, current_user)
+    check_upload_type(file)
+    unique_name, file_path, file_size = await stream_upload(case_id, file)
 
     doc = Document(
         case_id=case_id,
         filename=unique_name,
         original_filename=file.filename or unique_name,
         mime_type=file.content_type,
-        file_size=len(file_bytes),
+        file_size=file_size,
         file_path=str(file_path),
         status=DocumentStatus.uploaded,
     )
     session.add(doc)
     await session.flush()
     await session.refresh(doc)
+    await publish_case_event(session, case_id, "document.created", id=doc.id)
     return doc
 
 
-@router.get("", response_model=list[DocumentRead])
-async def list_documents(
+@router.post("/batch", response_model=list[DocumentUploadResult])
+async def upload_documents(
     case_id: uuid.UUID,
+    files: list[UploadFile],
     current_user: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_db)],
+    background_tasks: BackgroundTasks,
+    extract: bool = False,
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
-    result = await session.execute(
-        select(Document).where(Document.case_id == case_id).order_by(Document.created_at.desc())
-    )
-    return list(result.scalars().all())
+    """Upload many files at once; each is validated on its own.
 
+    Accepted files are inserted in one statement and rejected ones reported
+    with their error. With ``extract=true`` text extraction runs in the
+    background so later analyses can skip it.
+    """
+    await authorize_case(session, case_id, current_user)
+    if len(files) > settings.MAX_BATCH_UPLOAD_FILES:
+        raise bad_request(f"At most {settings.MAX_BATCH_UPLOAD_FILES} files per batch")
 
-@router.get("/{doc_id}", response_model=DocumentRead)
-async def get_document(
+    results: list[DocumentUploadResult] = []
+    rows: list[dict] = []
+    for file in files:
+        filename = file.filename or "file"
+        try:
+            check_upload_type(file)
+            unique_name, file_path, file_size = await stream_upload(case_id, file)
+        except HTTPException as e:
+            results.append(DocumentUploadResult(filename=filename, error=e.detail))
+            continue
+        results.append(DocumentUploadResult(filename=filename))
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "case_id": case_id,
+                "filename": unique_name,
+                "original_filename": filename,
+                "mime_type": file.content_type,
+                "file_size": file_size,
+                "file_path": str(file_path),
+                "status": DocumentStatus.uploaded,
+            }
+        )
+
+    if rows:
+        try:
+            created = await session.scalars(
+                insert(Document).returning(Document, sort_by_parameter_order=True), rows
+            )
+        except Exception:
+            for row in rows:
+                Path(row["file_path"]).unlink(missing_ok=True)
+            raise
+        documents = iter(created.all())
+        for result in results:
+            if result.error is None:
+                result.document = DocumentRead.model_validate(next(documents))
+        await publish_case_events(
+            session, case_id, "document.created", [{"id": row["id"]} for row in rows]
+        )
+        if extract:
+            background_tasks.add_task(
+                extract_documents,
+                [(row["id"], row["file_path"], row["mime_type"]) for row in rows],
+            )
+    return results
+
+
+@router.get("", response_model=Page[DocumentRead])
+@query_budget(6)
+async def list_documents(
+    request: Request,
     case_id: uuid.UUID,
-    doc_id: uuid.UUID,
     current_user: CurrentUser,
-    session: Annotated[AsyncSession, Depends(get_db)],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
+    page: Pagination,
+    status: DocumentStatus | None = None,
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
-    result = await session.execute(
-        select(Document).where(Document.id == doc_id, Document.case_id == case_id)
-    )
-    doc = result.scalar_one_or_none()
-    if doc is None:
-        raise not_found("Document")
-    return doc
+    await authorize_case(session, case_id, current_user)
+    criteria = [Document.case_id == case_id]
+    if status is not None:
+        criteria.append(Document.status == status)
+    versions = select(Document.id, Document.created_at, Document.updated_at).where(*criteria)
+    etag = await page_etag(session, versions, Document, page)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    stmt = select(*columns_for(DocumentRead, Document)).where(*criteria)
+    response = page_response(await paginate(session, stmt, Document, page, scalars=False))
+    set_etag(response, etag)
+    return response
 
 
-@router.post("/{doc_id}/analyze", response_model=DocumentRead)
-async def analyze_document(
+@router.get("/{doc_id}", response_model=DocumentRead)
+async def get_document(
     case_id: uuid.UUID,
     doc_id: uuid.UUID,
     current_user: CurrentUser,
-    session: Annotated[AsyncSession, Depends(get_db)],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
-    result = await session.execute(
-        select(Document).where(Document.id == doc_id, Document.case_id == case_id)
-    )
-    doc = result.scalar_one_or_none()
-    if doc is None:
-        raise not_found("Document")
+    await authorize_case(session, case_id, current_user)
+    return await _get_document_or_404(session, case_id, doc_id)
 
-    doc.status = DocumentStatus.analyzing
-    session.add(doc)
-    await session.flush()
 
+async def _analyze(
+    case_id: uuid.UUID,
+    doc_id: uuid.UUID,
+    user_id: uuid.UUID,
+    file_path: str,
+    mime_type: str,
+    text: str | None,
+) -> Document:
     try:
-        with open(doc.file_path, "rb") as f:
-            file_bytes = f.read()
-        text = extract_text(file_bytes, doc.mime_type)
-        doc.extracted_text = text
+        if text is None:
+            file_bytes = await asyncio.to_thread(Path(file_path).read_bytes)
+            text = await asyncio.to_thread(extract_text, file_bytes, mime_type)
+        analysis, usage = await analyze_document_with_claude(
+            text, case_id=case_id, user_id=user_id
+        )
+    except Exception as e:
+        async with session_scope() as session:
+            doc = await _get_document_or_404(session, case_id, doc_id)
+            doc.status = DocumentStatus.failed
+            if text is not None:
+                doc.extracted_text = text
+            session.add(doc)
+            await publish_case_event(
+                session, case_id, "document.updated", id=doc_id, status=doc.status
+            )
+        raise bad_request(f"Analysis failed: {str(e)}")
 
-        analysis = await analyze_document_with_claude(text)
+    await charge_llm_tokens(user_id, usage.total_tokens)
+    async with session_scope() as session:
+        doc = await _get_document_or_404(session, case_id, doc_id)
+        doc.extracted_text = text
         doc.ai_summary = analysis.get("summary", "")
         doc.ai_key_points = "\n".join(analysis.get("key_points", []))
         doc.status = DocumentStatus.analyzed
-    except Exception as e:
-        doc.status = DocumentStatus.failed
         session.add(doc)
         await session.flush()
-        raise bad_request(f"Analysis failed: {str(e)}")
-
-    session.add(doc)
-    await session.flush()
-    await session.refresh(doc)
+        await session.refresh(doc)
+        await publish_case_event(
+            session, case_id, "document.updated", id=doc_id, status=doc.status
+        )
     return doc
 
 
+async def _start_analysis(
+    case_id: uuid.UUID, doc_id: uuid.UUID, current_user: UserSnapshot
+) -> dict:
+    async with session_scope() as session:
+        await authorize_case(session, case_id, current_user)
+        await _get_document_or_404(session, case_id, doc_id)
+
+    # Concurrent requests for the document share one analysis. The claim is
+    # committed before the file is parsed and Claude runs, so no connection is
+    # held meanwhile.
+    doc = await analyze_once(
+        case_id,
+        doc_id,
+        lambda doc: _analyze(
+            case_id, doc_id, current_user.id, doc.file_path, doc.mime_type, doc.extracted_text
+        ),
+    )
+    return DocumentRead.model_validate(doc).model_dump(mode="json")
+
+
+@router.post(
+    "/{doc_id}/analyze",
+    response_model=DocumentRead,
+    dependencies=[Depends(reject_if_draining)],
+)
+@query_budget(20)
+async def analyze_document(
+    case_id: uuid.UUID,
+    doc_id: uuid.UUID,
+    current_user: CurrentUser,
+    response: Response,
+    idempotency_key: IdempotencyKeyHeader = None,
+):
+    async def analyze():
+        # Limited only when an analysis really starts, not when a retry is replayed.
+        await enforce_rate_limit(response, current_user.id, LLM_TOKENS, ANALYZE)
+        return await _start_analysis(case_id, doc_id, current_user)
+
+    # A retry with the same Idempotency-Key gets the first analysis back.
+    return await idempotent(
+        current_user.id,
+        idempotency_key,
+        request_fingerprint("analyze", case_id, doc_id),
+        analyze,
+        response,
+    )
+
+
 @router.delete("/{doc_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     case_id: uuid.UUID,
     doc_id: uuid.UUID,
     current_user: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_db)],
+    background_tasks: BackgroundTasks,
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
-    result = await session.execute(
-        select(Document).where(Document.id == doc_id, Document.case_id == case_id)
-    )
-    doc = result.scalar_one_or_none()
-    if doc is None:
-        raise not_found("Document")
+    await authorize_case(session, case_id, current_user)
+    doc = await _get_document_or_404(session, case_id, doc_id)
     await session.delete(doc)
+    await publish_case_event(session, case_id, "document.deleted", id=doc_id)
+    # Runs after the commit, so a rolled-back delete keeps its file.
+    background_tasks.add_task(remove_upload, doc.file_path)
 
 
 @router.get("/{doc_id}/download")
@@ -157,16 +302,10 @@ async def download_document(
     case_id: uuid.UUID,
     doc_id: uuid.UUID,
     current_user: CurrentUser,
-    session: Annotated[AsyncSession, Depends(get_db)],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
 ):
-    case = await get_case_or_404(session, case_id)
-    assert_case_access(case, current_user)
-    result = await session.execute(
-        select(Document).where(Document.id == doc_id, Document.case_id == case_id)
-    )
-    doc = result.scalar_one_or_none()
-    if doc is None:
-        raise not_found("Document")
+    await authorize_case(session, case_id, current_user)
+    doc = await _get_document_or_404(session, case_id, doc_id)
     return FileResponse(
         path=doc.file_path,
         filename=doc.original_filename,
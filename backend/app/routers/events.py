@@ -0,0 +1,67 @@
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.database import PrimaryReadSessionLocal, read_session_scope
+from app.dependencies import CurrentUser
+from app.services.case_events import RESYNC, case_events
+from app.services.case_service import authorize_case, case_access_cache
+from app.services.request_timing import TimedRoute
+from app.services.user_cache import UserSnapshot
+
+router = APIRouter(
+    prefix="/cases/{case_id}/events", tags=["events"], route_class=TimedRoute
+)
+
+
+async def _still_authorized(case_id: uuid.UUID, user: UserSnapshot) -> bool:
+    case_access_cache.invalidate(case_id)
+    try:
+        # Read-only, but on the primary: a lagging replica could still show the
+        # assignment this event just replaced.
+        async with PrimaryReadSessionLocal() as session:
+            await authorize_case(session, case_id, user)
+    except HTTPException:
+        return False
+    return True
+
+
+async def _event_stream(case_id: uuid.UUID, user: UserSnapshot) -> AsyncIterator[str]:
+    async with case_events.subscribe(case_id) as subscription:
+        # Tells the client it is subscribed, so refetching now cannot miss anything.
+        yield "event: ready\ndata: {}\n\n"
+        while True:
+            try:
+                event, payload = await asyncio.wait_for(
+                    subscription.queue.get(), settings.EVENT_STREAM_KEEPALIVE_SECONDS
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event == "case.assigned" and not await _still_authorized(case_id, user):
+                return
+            yield f"event: {event}\ndata: {payload}\n\n"
+            if event in (RESYNC, "case.deleted"):
+                return
+
+
+@router.get("")
+async def stream_case_events(case_id: uuid.UUID, current_user: CurrentUser):
+    """Server-sent events for one case: ``message.*``, ``document.*`` and ``case.*``.
+
+    Access is checked when the stream opens and again after the case is
+    reassigned. ``resync`` means events may have been dropped; the stream ends
+    and the client should reconnect and refetch.
+    """
+    # A short session for the check; the stream itself holds no DB connection.
+    async with read_session_scope() as session:
+        await authorize_case(session, case_id, current_user)
+    return StreamingResponse(
+        _event_stream(case_id, current_user),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
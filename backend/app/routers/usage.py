@@ -0,0 +1,93 @@
+import uuid
+from datetime import UTC, date, datetime, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.dependencies import AdminUser
+from app.models.case import Case
+from app.models.llm_usage import LLMUsageDaily
+from app.models.user import User
+from app.schemas.usage import UsageGroup, UsageReport, UsageRow, UsageTotals
+from app.services.request_timing import TimedRoute, query_budget
+from app.utils.exceptions import bad_request
+
+router = APIRouter(prefix="/usage", tags=["usage"], route_class=TimedRoute)
+
+_GROUP_COLUMNS = {
+    UsageGroup.case: LLMUsageDaily.case_id,
+    UsageGroup.user: LLMUsageDaily.user_id,
+    UsageGroup.day: LLMUsageDaily.day,
+    UsageGroup.purpose: LLMUsageDaily.purpose,
+    UsageGroup.model: LLMUsageDaily.model,
+}
+# Deleted cases and users keep their usage, just without a label.
+_LABELS = {
+    UsageGroup.case: (Case.id, Case.title),
+    UsageGroup.user: (User.id, User.email),
+}
+_SUMS = [
+    func.coalesce(func.sum(getattr(LLMUsageDaily, field)), 0).label(field)
+    for field in UsageTotals.model_fields
+]
+
+
+@router.get("", response_model=UsageReport)
+@query_budget(6)
+async def usage_report(
+    _: AdminUser,
+    session: Annotated[AsyncSession, Depends(get_read_db)],
+    start: date | None = None,
+    end: date | None = None,
+    group_by: UsageGroup = UsageGroup.case,
+    case_id: uuid.UUID | None = None,
+    user_id: uuid.UUID | None = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+):
+    """LLM token usage from the daily rollups, between ``start`` and ``end`` (UTC, inclusive).
+
+    Defaults to the last 30 days. Grouped rows come heaviest first, or by date
+    for ``group_by=day``.
+    """
+    end = end or datetime.now(UTC).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise bad_request("start must not be after end")
+
+    criteria = [LLMUsageDaily.day.between(start, end)]
+    if case_id is not None:
+        criteria.append(LLMUsageDaily.case_id == case_id)
+    if user_id is not None:
+        criteria.append(LLMUsageDaily.user_id == user_id)
+
+    totals = (await session.execute(select(*_SUMS).where(*criteria))).one()
+
+    column = _GROUP_COLUMNS[group_by]
+    stmt = select(column.label("key"), *_SUMS).where(*criteria).group_by(column)
+    if group_by == UsageGroup.day:
+        stmt = stmt.order_by(column)
+    else:
+        total_tokens = func.sum(LLMUsageDaily.input_tokens + LLMUsageDaily.output_tokens)
+        stmt = stmt.order_by(total_tokens.desc(), column)
+    rows = (await session.execute(stmt.limit(limit))).all()
+
+    labels: dict = {}
+    keys = [row.key for row in rows]
+    if keys and group_by in _LABELS:
+        id_column, label_column = _LABELS[group_by]
+        found = await session.execute(select(id_column, label_column).where(id_column.in_(keys)))
+        labels = dict(found.all())
+
+    return UsageReport(
+        start=start,
+        end=end,
+        group_by=group_by,
+        totals=UsageTotals(**totals._mapping),
+        rows=[
+            UsageRow(**{**row._mapping, "key": str(row.key)}, label=labels.get(row.key))
+            for row in rows
+        ],
+    )
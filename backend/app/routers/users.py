@@ -5,31 +5,44 @@ from fastapi import APIRouter, Depends, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import AdminUser, CurrentUser
-from app.models.user import User
+from app.models.user import User, UserRole
+from app.schemas.pagination import Page
 from app.schemas.user import UserRead, UserUpdate
 from app.services.auth_service import hash_password
 from app.services.case_service import get_user_or_404
+from app.services.request_timing import TimedRoute, query_budget
+from app.services.user_cache import invalidate_user
 from app.utils.exceptions import conflict
+from app.utils.pagination import Pagination, paginate
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=TimedRoute)
 
 
-@router.get("", response_model=list[UserRead])
+@router.get("", response_model=Page[UserRead])
+@query_budget(4)
 async def list_users(
     _: AdminUser,
-    session: Annotated[AsyncSession, Depends(get_db)],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
+    page: Pagination,
+    role: UserRole | None = None,
+    is_active: bool | None = None,
 ):
-    result = await session.execute(select(User).order_by(User.created_at.desc()))
-    return list(result.scalars().all())
+    stmt = select(User)
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)
+    return await paginate(session, stmt, User, page)
 
 
 @router.get("/{user_id}", response_model=UserRead)
+@query_budget(4)
 async def get_user(
     user_id: uuid.UUID,
     _: CurrentUser,
-    session: Annotated[AsyncSession, Depends(get_db)],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
 ):
     return await get_user_or_404(session, user_id)
 
@@ -52,7 +65,7 @@ async def update_user(
     if body.full_name is not None:
         user.full_name = body.full_name
     if body.password is not None:
-        user.hashed_password = hash_password(body.password)
+        user.hashed_password = await hash_password(body.password)
     if body.is_active is not None:
         user.is_active = body.is_active
     if body.role is not None:
@@ -60,6 +73,7 @@ async def update_user(
     session.add(user)
     await session.flush()
     await session.refresh(user)
+    invalidate_user(session, user_id)
     return user
 
 
@@ -71,3 +85,4 @@ async def delete_user(
 ):
     user = await get_user_or_404(session, user_id)
     await session.delete(user)
+    invalidate_user(session, user_id)
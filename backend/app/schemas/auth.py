@@ -13,3 +13,9 @@ class RegisterRequest(BaseModel):
 class LoginResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+
+
+class DownloadLink(BaseModel):
+    # Relative to the API; open it directly rather than through fetch/XHR.
+    url: str
+    expires_in: int
@@ -31,6 +31,21 @@ class CaseRead(BaseModel):
     updated_at: datetime
 
 
+class CaseDetail(CaseRead):
+    # Set while the chat history is archived; POST /cases/{id}/chat/restore
+    # brings it back.
+    chat_archived_at: datetime | None
+
+
+class CaseStats(BaseModel):
+    total: int = 0
+    open: int = 0
+    in_progress: int = 0
+    closed: int = 0
+    documents: int = 0
+    messages: int = 0
+
+
 class CaseAssign(BaseModel):
     lawyer_id: uuid.UUID | None = None
     client_id: uuid.UUID | None = None
@@ -20,3 +20,7 @@ class ChatMessageRead(BaseModel):
     content: str
     created_at: datetime
     updated_at: datetime
+
+
+class ChatRestore(BaseModel):
+    restored: int
@@ -22,6 +22,14 @@ class DocumentRead(BaseModel):
     updated_at: datetime
 
 
+class DocumentUploadResult(BaseModel):
+    """Outcome for one file of a batch upload: ``document`` or ``error`` is set."""
+
+    filename: str
+    document: DocumentRead | None = None
+    error: str | None = None
+
+
 class AnalysisResult(BaseModel):
     summary: str
     key_points: list[str]
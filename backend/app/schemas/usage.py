@@ -0,0 +1,36 @@
+import enum
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class UsageGroup(str, enum.Enum):
+    case = "case"
+    user = "user"
+    day = "day"
+    purpose = "purpose"
+    model = "model"
+
+
+class UsageTotals(BaseModel):
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    latency_ms: int = 0
+
+
+class UsageRow(UsageTotals):
+    # The case id, user id, day, purpose or model, per ``group_by``.
+    key: str
+    # Case title or user email, when grouped by case or user.
+    label: str | None = None
+
+
+class UsageReport(BaseModel):
+    start: date
+    end: date
+    group_by: UsageGroup
+    totals: UsageTotals
+    rows: list[UsageRow]
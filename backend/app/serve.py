@@ -0,0 +1,30 @@
+"""Production server: ``python -m app.serve``.
+
+Runs WEB_CONCURRENCY uvicorn workers (one per core by default). Every worker
+reads the same environment, so they share one configuration. On SIGTERM the
+workers stop accepting connections and wait up to SHUTDOWN_TIMEOUT_SECONDS for
+open requests; LLM calls of requests cut off then get up to
+SHUTDOWN_LLM_GRACE_SECONDS more to be stored. The container's stop timeout
+must cover SHUTDOWN_NOTICE_SECONDS + SHUTDOWN_TIMEOUT_SECONDS +
+SHUTDOWN_LLM_GRACE_SECONDS.
+"""
+import os
+
+import uvicorn
+
+from app.config import settings
+
+
+def main() -> None:
+    uvicorn.run(
+        "app.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=settings.WEB_CONCURRENCY or os.cpu_count() or 1,
+        timeout_graceful_shutdown=int(settings.SHUTDOWN_TIMEOUT_SECONDS),
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
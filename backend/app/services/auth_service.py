@@ -1,19 +1,78 @@
-from datetime import datetime, timedelta, timezone
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta, timezone
+from functools import partial
+from typing import TypeVar
+from urllib.parse import urlencode
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.schemas.auth import DownloadLink
+from app.utils.exceptions import service_unavailable
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
 
+# Pinning min/max rounds to the configured cost makes passlib flag hashes made
+# with any other cost as needing an update, which drives rehash-on-login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
 
+class PasswordHasherPool:
+    """Bounded thread pool for bcrypt work with simple queue-depth counters."""
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise service_unavailable("Authentication service is busy, please retry")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(fn, *args))
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "in_flight": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasherPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+async def verify_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Check a password; also return a new hash if the stored one uses an old cost."""
+    return await password_hasher.run(pwd_context.verify_and_update, plain, hashed)
 
 
 def create_access_token(subject: str) -> str:
@@ -25,9 +84,34 @@ def create_access_token(subject: str) -> str:
 def decode_access_token(token: str) -> str:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        sub: str | None = payload.get("sub")
-        if sub is None:
-            raise ValueError("Missing subject")
-        return sub
     except JWTError as exc:
         raise ValueError("Invalid token") from exc
+    sub: str | None = payload.get("sub")
+    if sub is None:
+        raise ValueError("Missing subject")
+    if "path" in payload:
+        raise ValueError("Download links are not access tokens")
+    return sub
+
+
+def create_download_token(subject: str, path: str) -> str:
+    """Short-lived token that authenticates ``subject`` for GETs of ``path`` only."""
+    expire = datetime.now(UTC) + timedelta(seconds=settings.DOWNLOAD_LINK_EXPIRE_SECONDS)
+    payload = {"sub": subject, "path": path, "exp": expire}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def download_link(subject: str, path: str, **params: str) -> DownloadLink:
+    query = urlencode({**params, "token": create_download_token(subject, path)})
+    return DownloadLink(url=f"{path}?{query}", expires_in=settings.DOWNLOAD_LINK_EXPIRE_SECONDS)
+
+
+def decode_download_token(token: str, path: str) -> str:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as exc:
+        raise ValueError("Invalid token") from exc
+    sub: str | None = payload.get("sub")
+    if sub is None or payload.get("path") != path:
+        raise ValueError("Token is not for this download")
+    return sub
@@ -0,0 +1,156 @@
+"""Zip "case bundle": every document, a metadata manifest and the chat transcript.
+
+The archive is produced while it is sent. ``zipfile`` writes into a sink that
+cannot seek, so it falls back to data descriptors and never needs to go back
+and patch headers; the sink is drained after every chunk, so at most one file
+chunk is held in memory whatever the size of the case.
+"""
+import asyncio
+import uuid
+import zipfile
+from collections.abc import AsyncIterator
+from datetime import datetime
+from pathlib import Path
+
+import aiofiles
+import orjson
+from sqlalchemy import select
+
+from app.database import read_session_scope
+from app.models.case import Case
+from app.models.document import Document
+from app.services.chat_export import ExportFormat, export_transcript
+from app.services.document_service import CHUNK_SIZE
+
+
+class _Sink:
+    """Write-only file object whose contents are handed out as they arrive."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(name: str, when: datetime, compress_type: int) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=when.timetuple()[:6])
+    info.compress_type = compress_type
+    return info
+
+
+def _archive_name(filename: str, taken: set[str]) -> str:
+    name = Path(filename).name or "document"
+    stem, suffix = Path(name).stem, Path(name).suffix
+    candidate, n = name, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{stem} ({n}){suffix}"
+    taken.add(candidate)
+    return f"documents/{candidate}"
+
+
+async def _file_size(path: Path) -> int | None:
+    try:
+        return (await asyncio.to_thread(path.stat)).st_size
+    except FileNotFoundError:
+        return None
+
+
+async def stream_case_bundle(case_id: uuid.UUID) -> AsyncIterator[bytes]:
+    # Metadata is read up front so no connection is held while files stream
+    # to a possibly slow client.
+    async with read_session_scope() as session:
+        case = (
+            await session.execute(
+                select(Case.title, Case.description, Case.status, Case.created_at).where(
+                    Case.id == case_id
+                )
+            )
+        ).one_or_none()
+        if case is None:
+            return
+        documents = (
+            await session.execute(
+                select(
+                    Document.id,
+                    Document.original_filename,
+                    Document.mime_type,
+                    Document.file_path,
+                    Document.status,
+                    Document.ai_summary,
+                    Document.ai_key_points,
+                    Document.created_at,
+                )
+                .where(Document.case_id == case_id)
+                .order_by(Document.created_at, Document.id)
+            )
+        ).all()
+
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w") as archive:
+        manifest = []
+        taken: set[str] = set()
+        for doc in documents:
+            entry = {
+                "id": doc.id,
+                "original_filename": doc.original_filename,
+                "mime_type": doc.mime_type,
+                "status": doc.status,
+                "created_at": doc.created_at,
+                "ai_summary": doc.ai_summary,
+                "ai_key_points": doc.ai_key_points.splitlines() if doc.ai_key_points else [],
+                "path": None,
+            }
+            manifest.append(entry)
+            path = Path(doc.file_path)
+            size = await _file_size(path)
+            if size is None:
+                continue
+            name = _archive_name(doc.original_filename, taken)
+            # Uploads are mostly PDFs and DOCX, which are compressed already.
+            info = _zip_info(name, doc.created_at, zipfile.ZIP_STORED)
+            info.file_size = size
+            with archive.open(info, "w") as dest:
+                async with aiofiles.open(path, "rb") as src:
+                    while chunk := await src.read(CHUNK_SIZE):
+                        dest.write(chunk)
+                        yield sink.drain()
+            entry["path"] = name
+            yield sink.drain()
+
+        archive.writestr(
+            _zip_info("manifest.json", case.created_at, zipfile.ZIP_DEFLATED),
+            orjson.dumps(
+                {
+                    "case": {
+                        "id": case_id,
+                        "title": case.title,
+                        "description": case.description,
+                        "status": case.status,
+                        "created_at": case.created_at,
+                    },
+                    "documents": manifest,
+                },
+                option=orjson.OPT_INDENT_2,
+                default=str,
+            ),
+        )
+        yield sink.drain()
+
+        transcript = _zip_info("transcript.md", case.created_at, zipfile.ZIP_DEFLATED)
+        with archive.open(transcript, "w", force_zip64=True) as dest:
+            async for text in export_transcript(case_id, ExportFormat.markdown):
+                dest.write(text.encode())
+                yield sink.drain()
+    # Closing the archive wrote the central directory.
+    yield sink.drain()
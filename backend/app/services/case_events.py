@@ -0,0 +1,148 @@
+"""Per-case change notifications fanned out through Postgres LISTEN/NOTIFY.
+
+Writers call ``publish_case_event`` inside their transaction; Postgres delivers
+the notification on commit (and drops it on rollback) to every API worker. Each
+worker holds one listening connection and hands events to the streams
+subscribed to that case.
+"""
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import asyncpg
+import orjson
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "case_events"
+# Sent instead of further events once a stream may have missed some.
+RESYNC = "resync"
+
+
+def _payload(case_id: uuid.UUID, event: str, data: dict[str, Any]) -> str:
+    # default=str also covers asyncpg's UUID subclass on refreshed rows.
+    return orjson.dumps({"event": event, "case_id": case_id, **data}, default=str).decode()
+
+
+async def publish_case_event(
+    session: AsyncSession, case_id: uuid.UUID, event: str, **data: Any
+) -> None:
+    """Queue ``event`` for subscribers of ``case_id`` once ``session`` commits.
+
+    Payloads only identify what changed; clients refetch the resource, so the
+    usual access checks and serialization apply.
+    """
+    await session.execute(select(func.pg_notify(CHANNEL, _payload(case_id, event, data))))
+
+
+async def publish_case_events(
+    session: AsyncSession, case_id: uuid.UUID, event: str, items: list[dict[str, Any]]
+) -> None:
+    """``publish_case_event`` for many items, in one round trip."""
+    if not items:
+        return
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        [{"channel": CHANNEL, "payload": _payload(case_id, event, data)} for data in items],
+    )
+
+
+class Subscription:
+    def __init__(self, case_id: uuid.UUID, max_buffered: int) -> None:
+        self.case_id = case_id
+        self.queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue(max_buffered + 1)
+        self._max_buffered = max_buffered
+        self.closed = False
+
+    def push(self, event: str, payload: str) -> None:
+        if self.closed:
+            return
+        if self.queue.qsize() >= self._max_buffered:
+            # A consumer this far behind is dropped rather than buffered without
+            # bound; it reconnects and refetches.
+            self.close()
+            return
+        self.queue.put_nowait((event, payload))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # The extra slot guarantees room for the final marker.
+        self.queue.put_nowait((RESYNC, "{}"))
+
+
+class CaseEventBroker:
+    def __init__(self, dsn: str, max_buffered: int) -> None:
+        self._dsn = dsn
+        self._max_buffered = max_buffered
+        self._subscriptions: dict[uuid.UUID, set[Subscription]] = defaultdict(set)
+        self._conn: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    async def _ensure_listening(self) -> None:
+        async with self._lock:
+            if self._conn is not None and not self._conn.is_closed():
+                return
+            conn = await asyncpg.connect(self._dsn)
+            conn.add_termination_listener(self._on_terminated)
+            await conn.add_listener(CHANNEL, self._on_notify)
+            self._conn = conn
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = orjson.loads(payload)
+            case_id = uuid.UUID(message["case_id"])
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            logger.warning("Ignoring malformed %s notification: %r", CHANNEL, payload)
+            return
+        for subscription in tuple(self._subscriptions.get(case_id, ())):
+            subscription.push(message["event"], payload)
+
+    def _on_terminated(self, conn: Any) -> None:
+        # Notifications sent while we reconnect are lost, so every open stream
+        # is told to resync; the next subscribe opens a fresh connection.
+        self._conn = None
+        self.close_subscriptions()
+
+    def close_subscriptions(self) -> None:
+        """End every open stream with ``resync``; clients reconnect and refetch."""
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.close()
+
+    @asynccontextmanager
+    async def subscribe(self, case_id: uuid.UUID) -> AsyncIterator[Subscription]:
+        await self._ensure_listening()
+        subscription = Subscription(case_id, self._max_buffered)
+        self._subscriptions[case_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscriptions.get(case_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[case_id]
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._conn is not None:
+                conn, self._conn = self._conn, None
+                await conn.close()
+        self.close_subscriptions()
+
+
+case_events = CaseEventBroker(
+    engine.url.set(drivername="postgresql").render_as_string(hide_password=False),
+    max_buffered=settings.EVENT_STREAM_BUFFER_SIZE,
+)
@@ -1,27 +1,77 @@
 import uuid
+from dataclasses import dataclass
 
-from sqlalchemy import select
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.models.case import Case
+from app.config import settings
+from app.models.case import Case, CaseStatus
+from app.models.chat_archive import ChatArchive
+from app.models.chat_message import ChatMessage
+from app.models.document import Document
 from app.models.user import User, UserRole
+from app.schemas.case import CaseStats
+from app.services.user_cache import UserSnapshot
 from app.utils.exceptions import forbidden, not_found
+from app.utils.pagination import PageParams, paginate
+from app.utils.ttl_cache import TTLCache
+
+case_stats_cache: TTLCache[uuid.UUID, CaseStats] = TTLCache(
+    ttl_seconds=settings.CASE_STATS_CACHE_TTL_SECONDS, max_size=10_000
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CaseAccess:
+    """The columns an access check needs, without loading the whole case."""
+
+    id: uuid.UUID
+    lawyer_id: uuid.UUID | None
+    client_id: uuid.UUID | None
+    # The chat history is in cold storage and must be restored before use.
+    chat_archived: bool
+
+
+# Keyed by case; the caller's role and id are checked against the entry on every
+# hit, so one entry serves every user. assign_case, delete_case and chat
+# archiving and restoring evict it.
+case_access_cache: TTLCache[uuid.UUID, CaseAccess] = TTLCache(
+    ttl_seconds=settings.CASE_ACCESS_CACHE_TTL_SECONDS, max_size=50_000
+)
 
 
 async def get_case_or_404(session: AsyncSession, case_id: uuid.UUID) -> Case:
-    result = await session.execute(
-        select(Case)
-        .where(Case.id == case_id)
-        .options(selectinload(Case.lawyer), selectinload(Case.client))
-    )
+    result = await session.execute(select(Case).where(Case.id == case_id))
     case = result.scalar_one_or_none()
     if case is None:
         raise not_found("Case")
     return case
 
 
-def assert_case_access(case: Case, user: User) -> None:
+async def authorize_case(
+    session: AsyncSession, case_id: uuid.UUID, user: UserSnapshot
+) -> CaseAccess:
+    """404 if the case does not exist, 403 if ``user`` may not access it."""
+    access = case_access_cache.get(case_id)
+    if access is None:
+        result = await session.execute(
+            select(
+                Case.id,
+                Case.lawyer_id,
+                Case.client_id,
+                Case.chat_archived_at.is_not(None).label("chat_archived"),
+            ).where(Case.id == case_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise not_found("Case")
+        access = CaseAccess(**row._mapping)
+        case_access_cache.set(case_id, access)
+    assert_case_access(access, user)
+    return access
+
+
+def assert_case_access(case: Case | CaseAccess, user: UserSnapshot) -> None:
     if user.role == UserRole.admin:
         return
     if user.role == UserRole.lawyer and case.lawyer_id == user.id:
@@ -31,16 +81,75 @@ def assert_case_access(case: Case, user: User) -> None:
     raise forbidden("You do not have access to this case")
 
 
-async def list_cases_for_user(session: AsyncSession, user: User) -> list[Case]:
-    stmt = select(Case).options(selectinload(Case.lawyer), selectinload(Case.client))
+def scope_cases_to_user(stmt: Select, user: UserSnapshot) -> Select:
     if user.role == UserRole.admin:
-        pass
-    elif user.role == UserRole.lawyer:
-        stmt = stmt.where(Case.lawyer_id == user.id)
-    else:
-        stmt = stmt.where(Case.client_id == user.id)
-    result = await session.execute(stmt)
-    return list(result.scalars().all())
+        return stmt
+    if user.role == UserRole.lawyer:
+        return stmt.where(Case.lawyer_id == user.id)
+    return stmt.where(Case.client_id == user.id)
+
+
+def filter_case_list(stmt: Select, user: UserSnapshot, status: CaseStatus | None) -> Select:
+    stmt = scope_cases_to_user(stmt, user)
+    if status is not None:
+        stmt = stmt.where(Case.status == status)
+    return stmt
+
+
+async def list_cases_for_user(
+    session: AsyncSession,
+    user: UserSnapshot,
+    params: PageParams,
+    status: CaseStatus | None = None,
+) -> dict:
+    return await paginate(session, filter_case_list(select(Case), user, status), Case, params)
+
+
+async def get_case_stats(session: AsyncSession, user: UserSnapshot) -> CaseStats:
+    cached = case_stats_cache.get(user.id)
+    if cached is not None:
+        return cached
+
+    # Per-case counts come from correlated subqueries so they use the case_id
+    # indexes instead of aggregating the whole documents/messages tables.
+    document_count = (
+        select(func.count()).where(Document.case_id == Case.id).scalar_subquery()
+    )
+    # Archived histories count with the total stored alongside them.
+    message_count = (
+        select(func.count()).where(ChatMessage.case_id == Case.id).scalar_subquery()
+        + func.coalesce(
+            select(ChatArchive.message_count)
+            .where(ChatArchive.case_id == Case.id)
+            .scalar_subquery(),
+            0,
+        )
+    )
+    scoped = scope_cases_to_user(
+        select(
+            Case.status,
+            document_count.label("documents"),
+            message_count.label("messages"),
+        ),
+        user,
+    ).subquery()
+    result = await session.execute(
+        select(
+            scoped.c.status,
+            func.count(),
+            func.coalesce(func.sum(scoped.c.documents), 0),
+            func.coalesce(func.sum(scoped.c.messages), 0),
+        ).group_by(scoped.c.status)
+    )
+
+    stats = CaseStats()
+    for status, cases, documents, messages in result.all():
+        setattr(stats, status.value, cases)
+        stats.total += cases
+        stats.documents += int(documents)
+        stats.messages += int(messages)
+    case_stats_cache.set(user.id, stats)
+    return stats
 
 
 async def get_user_or_404(session: AsyncSession, user_id: uuid.UUID) -> User:
@@ -0,0 +1,214 @@
+"""Cold storage for the chat history of long-closed cases.
+
+The periodic sweep looks for closed cases that nobody has touched for
+CHAT_ARCHIVE_AFTER_DAYS: no update to the case row (closing it is one) and no
+new message. It moves each such case's messages into one zlib-compressed row
+of ``chat_archives`` and stamps ``cases.chat_archived_at``. That way
+``chat_messages`` and its indexes only hold the history of cases in use.
+
+``restore_chat`` moves the messages back. Only write requests call it:
+``POST /cases/{id}/chat/restore``, which the frontend sends when an archived
+chat is opened, and sending or deleting a message. GET routes never write,
+so a prefetch or crawler cannot bring a history back. A restore stamps
+``chat_restored_at``, which keeps the case out of the sweep for another
+period, and leaves ``updated_at`` alone. Exports read the archive in place.
+"""
+import asyncio
+import logging
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+import orjson
+from sqlalchemy import delete, func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import PrimaryReadSessionLocal, session_scope
+from app.models.case import Case, CaseStatus
+from app.models.chat_archive import ChatArchive
+from app.models.chat_message import ChatMessage, MessageRole
+from app.models.user import User
+from app.services.case_service import case_access_cache
+from app.services.job_lock import JobLock
+
+logger = logging.getLogger(__name__)
+
+# Candidate cases listed per query.
+BATCH_SIZE = 100
+COMPRESSION_LEVEL = 6
+
+_AFTER = timedelta(days=settings.CHAT_ARCHIVE_AFTER_DAYS)
+
+
+class ArchivedMessage(NamedTuple):
+    id: uuid.UUID
+    user_id: uuid.UUID | None
+    role: MessageRole
+    content: str
+    created_at: datetime
+    updated_at: datetime
+
+
+def _pack(messages: list[ArchivedMessage]) -> bytes:
+    # default=str covers asyncpg's own UUID type.
+    data = orjson.dumps([m._asdict() for m in messages], default=str)
+    return zlib.compress(data, COMPRESSION_LEVEL)
+
+
+def _unpack(payload: bytes) -> list[ArchivedMessage]:
+    return [
+        ArchivedMessage(
+            id=uuid.UUID(m["id"]),
+            user_id=uuid.UUID(m["user_id"]) if m["user_id"] else None,
+            role=MessageRole(m["role"]),
+            content=m["content"],
+            created_at=datetime.fromisoformat(m["created_at"]),
+            updated_at=datetime.fromisoformat(m["updated_at"]),
+        )
+        for m in orjson.loads(zlib.decompress(payload))
+    ]
+
+
+def _is_due():
+    cutoff = func.now() - _AFTER
+    # NULL, and so not due, for cases without messages.
+    last_message = (
+        select(func.max(ChatMessage.created_at))
+        .where(ChatMessage.case_id == Case.id)
+        .scalar_subquery()
+    )
+    return (
+        Case.status == CaseStatus.closed,
+        Case.chat_archived_at.is_(None),
+        Case.updated_at < cutoff,
+        or_(Case.chat_restored_at.is_(None), Case.chat_restored_at < cutoff),
+        last_message < cutoff,
+    )
+
+
+async def _archive_case(case_id: uuid.UUID) -> int:
+    async with session_scope() as session:
+        # Message inserts take a key-share lock on the case row, so holding
+        # it keeps new messages out until the move commits, and a case being
+        # chatted in or restored right now is skipped.
+        locked = await session.scalar(
+            select(Case.id)
+            .where(Case.id == case_id, *_is_due())
+            .with_for_update(of=Case, skip_locked=True)
+        )
+        if locked is None:
+            return 0
+        rows = await session.execute(
+            select(*(getattr(ChatMessage, field) for field in ArchivedMessage._fields))
+            .where(ChatMessage.case_id == case_id)
+            .order_by(ChatMessage.created_at, ChatMessage.id)
+        )
+        messages = [ArchivedMessage(*row) for row in rows]
+        payload = await asyncio.to_thread(_pack, messages)
+        session.add(ChatArchive(case_id=case_id, message_count=len(messages), payload=payload))
+        await session.execute(delete(ChatMessage).where(ChatMessage.case_id == case_id))
+        # Archiving is not an edit, so updated_at keeps its value.
+        await session.execute(
+            update(Case)
+            .where(Case.id == case_id)
+            .values(chat_archived_at=func.now(), updated_at=Case.updated_at)
+        )
+    case_access_cache.invalidate(case_id)
+    return len(messages)
+
+
+async def archive_closed_chats() -> tuple[int, int]:
+    """Archive every case that is due; returns (cases, messages) archived."""
+    cases = messages = 0
+    after = None
+    while True:
+        stmt = select(Case.updated_at, Case.id).where(*_is_due())
+        if after is not None:
+            stmt = stmt.where(tuple_(Case.updated_at, Case.id) > after)
+        async with PrimaryReadSessionLocal() as session:
+            batch = (
+                await session.execute(stmt.order_by(Case.updated_at, Case.id).limit(BATCH_SIZE))
+            ).all()
+        for _, case_id in batch:
+            moved = await _archive_case(case_id)
+            if moved:
+                cases += 1
+                messages += moved
+        if len(batch) < BATCH_SIZE:
+            return cases, messages
+        after = tuple(batch[-1])
+
+
+async def restore_chat(session: AsyncSession, case_id: uuid.UUID) -> int:
+    """Move an archived case's messages back to ``chat_messages``; returns how many.
+
+    Runs in the caller's transaction. A no-op returning 0 when the case is not
+    archived, e.g. because a concurrent request restored it first.
+    """
+    restored = await session.scalar(
+        update(Case)
+        .where(Case.id == case_id, Case.chat_archived_at.is_not(None))
+        .values(
+            chat_archived_at=None, chat_restored_at=func.now(), updated_at=Case.updated_at
+        )
+        .returning(Case.id)
+    )
+    if restored is None:
+        return 0
+    payload = await session.scalar(
+        delete(ChatArchive).where(ChatArchive.case_id == case_id).returning(ChatArchive.payload)
+    )
+    messages = await asyncio.to_thread(_unpack, payload) if payload else []
+    if messages:
+        # Authors deleted since archiving lose their id, as SET NULL would have done.
+        authors = {m.user_id for m in messages if m.user_id is not None}
+        existing = set(await session.scalars(select(User.id).where(User.id.in_(authors))))
+        await session.execute(
+            insert(ChatMessage).on_conflict_do_nothing(index_elements=[ChatMessage.id]),
+            [
+                {
+                    **m._asdict(),
+                    "case_id": case_id,
+                    "user_id": m.user_id if m.user_id in existing else None,
+                }
+                for m in messages
+            ],
+        )
+    # Another request may re-cache the old flag before the caller commits;
+    # that only costs it a no-op restore within the cache TTL.
+    case_access_cache.invalidate(case_id)
+    logger.info("Restored %d archived chat messages of case %s", len(messages), case_id)
+    return len(messages)
+
+
+async def load_archived_chat(session: AsyncSession, case_id: uuid.UUID) -> list[ArchivedMessage]:
+    """An archived case's messages, oldest first, read without restoring them."""
+    payload = await session.scalar(
+        select(ChatArchive.payload).where(ChatArchive.case_id == case_id)
+    )
+    return await asyncio.to_thread(_unpack, payload) if payload else []
+
+
+async def run_chat_archival() -> None:
+    """Archive due chat histories every CHAT_ARCHIVE_INTERVAL_SECONDS until cancelled.
+
+    Runs on one worker of the deployment; see ``job_lock``.
+    """
+    lock = JobLock("chat_archival")
+    try:
+        while True:
+            await asyncio.sleep(settings.CHAT_ARCHIVE_INTERVAL_SECONDS)
+            try:
+                if not await lock.acquire():
+                    continue
+                cases, messages = await archive_closed_chats()
+            except Exception:
+                logger.exception("Chat archival failed")
+                continue
+            if cases:
+                logger.info("Archived %d chat messages of %d closed cases", messages, cases)
+    finally:
+        await lock.release()
@@ -0,0 +1,152 @@
+import csv
+import enum
+import io
+import uuid
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+import orjson
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import read_session_scope
+from app.models.case import Case
+from app.models.chat_message import ChatMessage, MessageRole
+from app.models.user import User
+from app.services.chat_archive import load_archived_chat
+
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    markdown = "markdown"
+    csv = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.markdown: "text/markdown; charset=utf-8",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+EXPORT_EXTENSIONS = {
+    ExportFormat.ndjson: "ndjson",
+    ExportFormat.markdown: "md",
+    ExportFormat.csv: "csv",
+}
+CSV_COLUMNS = ("id", "created_at", "role", "author", "content")
+
+
+def _author(row: Row) -> str:
+    if row.role == MessageRole.assistant:
+        return "Assistant"
+    return row.full_name or "Deleted user"
+
+
+def _ndjson(rows: Sequence[Row]) -> str:
+    return "".join(
+        orjson.dumps(
+            {
+                "id": row.id,
+                "created_at": row.created_at,
+                "role": row.role,
+                "author": _author(row),
+                "content": row.content,
+            },
+            default=str,
+        ).decode()
+        + "\n"
+        for row in rows
+    )
+
+
+def _markdown(rows: Sequence[Row]) -> str:
+    return "".join(
+        f"**{_author(row)}** · {row.created_at.astimezone(UTC):%Y-%m-%d %H:%M} UTC\n\n"
+        f"{row.content}\n\n---\n\n"
+        for row in rows
+    )
+
+
+def _csv(rows: Sequence[Row]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        (row.id, row.created_at.isoformat(), row.role.value, _author(row), row.content)
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+_RENDERERS = {
+    ExportFormat.ndjson: _ndjson,
+    ExportFormat.markdown: _markdown,
+    ExportFormat.csv: _csv,
+}
+
+
+class _ArchivedRow(NamedTuple):
+    id: uuid.UUID
+    created_at: datetime
+    role: MessageRole
+    content: str
+    full_name: str | None
+
+
+async def _archived_rows(session: AsyncSession, case_id: uuid.UUID) -> list[_ArchivedRow]:
+    messages = await load_archived_chat(session, case_id)
+    authors = {m.user_id for m in messages if m.user_id is not None}
+    names = dict(
+        (await session.execute(select(User.id, User.full_name).where(User.id.in_(authors)))).all()
+    )
+    return [
+        _ArchivedRow(m.id, m.created_at, m.role, m.content, names.get(m.user_id))
+        for m in messages
+    ]
+
+
+async def export_transcript(case_id: uuid.UUID, fmt: ExportFormat) -> AsyncIterator[str]:
+    """Yield a case's full chat history, oldest first, rendered as ``fmt``.
+
+    Rows come from a server-side cursor ``EXPORT_BATCH_SIZE`` at a time, so
+    memory stays flat however long the history is. The generator owns its
+    session because it outlives the request handler.
+    """
+    async with read_session_scope() as session:
+        case = (
+            await session.execute(
+                select(Case.title, Case.chat_archived_at).where(Case.id == case_id)
+            )
+        ).one_or_none()
+        if case is None:
+            return
+        title = case.title
+        if fmt == ExportFormat.markdown:
+            yield f"# {title}\n\n"
+        elif fmt == ExportFormat.csv:
+            yield ",".join(CSV_COLUMNS) + "\r\n"
+
+        render = _RENDERERS[fmt]
+        if case.chat_archived_at is not None:
+            # Downloads leave the history in cold storage; it is one blob, so
+            # it is decoded whole rather than streamed.
+            rows = await _archived_rows(session, case_id)
+            for start in range(0, len(rows), settings.EXPORT_BATCH_SIZE):
+                yield render(rows[start : start + settings.EXPORT_BATCH_SIZE])
+            return
+
+        stmt = (
+            select(
+                ChatMessage.id,
+                ChatMessage.created_at,
+                ChatMessage.role,
+                ChatMessage.content,
+                User.full_name,
+            )
+            .outerjoin(User, User.id == ChatMessage.user_id)
+            .where(ChatMessage.case_id == case_id)
+            .order_by(ChatMessage.created_at, ChatMessage.id)
+            .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            yield render(rows)
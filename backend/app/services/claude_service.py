@@ -1,9 +1,21 @@
+from __future__ import annotations
+
 import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass
 from functools import partial
-
-import anthropic
+from typing import TYPE_CHECKING, Any
 
 from app.config import settings
+from app.services import web_search
+from app.services.request_timing import llm_timer
+from app.services.usage_ledger import usage_ledger
+from app.services.web_search import SearchError
+
+if TYPE_CHECKING:
+    import anthropic
 
 LEGAL_SYSTEM_PROMPT = """You are an expert legal AI assistant helping lawyers and clients
 understand legal documents, cases, and related matters. You have access to a web search tool
@@ -33,40 +45,108 @@ WEB_SEARCH_TOOL = {
     },
 }
 
+MODEL = "claude-opus-4-6"
+
 _client: anthropic.Anthropic | None = None
 
 
+@dataclass
+class LLMUsage:
+    """Tokens billed for one chat turn or analysis, over all its model calls."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, usage: Any) -> None:
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+
+
 def _get_client() -> anthropic.Anthropic:
     global _client
     if _client is None:
+        # The SDK takes most of a second to import, so it is loaded here (or by
+        # the startup warm-up) rather than with the app.
+        import anthropic
+
         _client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
     return _client
 
 
-def _execute_web_search(query: str) -> str:
+def warm_up_client() -> None:
+    """Create the client and open its HTTPS connection with a free models call."""
+    import anthropic
+
     try:
-        from duckduckgo_search import DDGS
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=5))
-        if not results:
-            return "No results found for this query."
-        parts = []
-        for r in results:
-            parts.append(f"Title: {r['title']}\nSummary: {r['body']}\nURL: {r['href']}")
-        return "\n\n---\n\n".join(parts)
-    except Exception as exc:
-        return f"Search error: {exc}"
-
-
-def _sync_chat(messages: list[dict]) -> str:
-    client = _get_client()
-    current_messages = list(messages)
+        _get_client().models.list(limit=1)
+    except anthropic.APIStatusError:
+        # Any HTTP answer means the connection is open, which is all we want.
+        pass
+
+
+def _create_message(**kwargs: Any) -> Any:
+    return _get_client().messages.create(**kwargs)
+
 
-    for _ in range(10):  # cap at 10 iterations
-        response = client.messages.create(
-            model="claude-opus-4-6",
+async def _run_tool(block: Any) -> dict:
+    result = {"type": "tool_result", "tool_use_id": block.id}
+    try:
+        result["content"] = await web_search.search(block.input.get("query", ""))
+    except SearchError as exc:
+        # Claude is told the tool failed rather than handed an error as results.
+        result["content"] = str(exc)
+        result["is_error"] = True
+    return result
+
+
+async def _call(
+    usage: LLMUsage,
+    *,
+    case_id: uuid.UUID,
+    user_id: uuid.UUID,
+    purpose: str,
+    step: int = 0,
+    **kwargs: Any,
+) -> Any:
+    """One model call on the executor, added to ``usage`` and the usage ledger."""
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    with llm_timer():
+        response = await loop.run_in_executor(
+            None, partial(_create_message, model=MODEL, system=LEGAL_SYSTEM_PROMPT, **kwargs)
+        )
+    usage.add(response.usage)
+    usage_ledger.record(
+        user_id=user_id,
+        case_id=case_id,
+        purpose=purpose,
+        model=MODEL,
+        step=step,
+        usage=response.usage,
+        latency_ms=round((time.perf_counter() - started) * 1000),
+    )
+    return response
+
+
+async def chat_with_claude(
+    messages: list[dict], *, case_id: uuid.UUID, user_id: uuid.UUID
+) -> tuple[str, LLMUsage]:
+    # Model calls block, so each runs on the executor; searches run on the loop.
+    current_messages = list(messages)
+    usage = LLMUsage()
+
+    for step in range(10):  # cap at 10 iterations
+        response = await _call(
+            usage,
+            case_id=case_id,
+            user_id=user_id,
+            purpose="chat",
+            step=step,
             max_tokens=4096,
-            system=LEGAL_SYSTEM_PROMPT,
             tools=[WEB_SEARCH_TOOL],
             messages=current_messages,
         )
@@ -86,31 +166,26 @@ def _sync_chat(messages: list[dict]) -> str:
                     })
             current_messages.append({"role": "assistant", "content": content_dicts})
 
-            # Execute each tool call and collect results
-            tool_results = []
-            for block in response.content:
-                if block.type == "tool_use":
-                    result = _execute_web_search(block.input["query"])
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": result,
-                    })
+            # Run every tool call of the turn concurrently
+            tool_results = await asyncio.gather(
+                *(_run_tool(block) for block in response.content if block.type == "tool_use")
+            )
 
-            current_messages.append({"role": "user", "content": tool_results})
+            current_messages.append({"role": "user", "content": list(tool_results)})
             continue  # let Claude process the results
 
         # stop_reason == "end_turn" — extract final text
         for block in response.content:
             if hasattr(block, "text"):
-                return block.text
+                return block.text, usage
         break
 
-    return "Unable to generate a response."
+    return "Unable to generate a response.", usage
 
 
-def _sync_analyze_document(text: str) -> dict:
-    client = _get_client()
+async def analyze_document_with_claude(
+    text: str, *, case_id: uuid.UUID, user_id: uuid.UUID
+) -> tuple[dict, LLMUsage]:
     prompt = (
         f"Analyze this legal document and provide:\n"
         f"1. A concise summary (2-3 paragraphs)\n"
@@ -118,26 +193,18 @@ def _sync_analyze_document(text: str) -> dict:
         f"Document text:\n{text[:15000]}\n\n"
         f"Respond with JSON: {{\"summary\": \"...\", \"key_points\": [...]}}"
     )
-    response = client.messages.create(
-        model="claude-opus-4-6",
+    usage = LLMUsage()
+    response = await _call(
+        usage,
+        case_id=case_id,
+        user_id=user_id,
+        purpose="analysis",
         max_tokens=2048,
-        system=LEGAL_SYSTEM_PROMPT,
         messages=[{"role": "user", "content": prompt}],
     )
-    import json
     raw = response.content[0].text.strip()
     if raw.startswith("```"):
         raw = raw.split("```")[1]
         if raw.startswith("json"):
             raw = raw[4:]
-    return json.loads(raw.strip())
-
-
-async def chat_with_claude(messages: list[dict]) -> str:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, partial(_sync_chat, messages))
-
-
-async def analyze_document_with_claude(text: str) -> dict:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, partial(_sync_analyze_document, text))
+    return json.loads(raw.strip()), usage
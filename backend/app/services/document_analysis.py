@@ -0,0 +1,185 @@
+"""One analysis per document at a time, across requests and workers.
+
+Starting an analysis claims the document. A single conditional UPDATE sets
+its status to ``analyzing`` and stamps ``analysis_started_at``, so only one
+of any number of racing requests wins. The others attach to the running
+analysis. On the same worker they await its future. On another worker they
+wait for its ``document.updated`` event and then re-read the row. No
+connection or lock is held while Claude runs.
+
+A claim older than ANALYSIS_STALE_SECONDS is assumed to belong to a worker
+that crashed. The next analyze request takes it over, and the periodic
+recovery sweep marks it failed.
+"""
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+
+from sqlalchemy import and_, func, or_, select, update
+
+from app.config import settings
+from app.database import session_scope
+from app.models.document import Document, DocumentStatus
+from app.services.case_events import case_events, publish_case_event, publish_case_events
+from app.services.drain import drain
+from app.services.job_lock import JobLock
+from app.utils.exceptions import bad_request, not_found
+
+logger = logging.getLogger(__name__)
+
+# Fallback re-read interval while waiting on another worker, in case its
+# event is lost (e.g. the listener reconnected).
+WAIT_POLL_SECONDS = 5.0
+
+_STALE = timedelta(seconds=settings.ANALYSIS_STALE_SECONDS)
+
+# Analyses led by this worker, by document id.
+_running: dict[uuid.UUID, asyncio.Future[Document]] = {}
+
+
+def _is_stale():
+    return or_(
+        Document.analysis_started_at.is_(None),
+        Document.analysis_started_at < func.now() - _STALE,
+    )
+
+
+async def _claim(case_id: uuid.UUID, doc_id: uuid.UUID) -> Document | None:
+    async with session_scope() as session:
+        doc = (
+            await session.scalars(
+                update(Document)
+                .where(
+                    Document.id == doc_id,
+                    Document.case_id == case_id,
+                    or_(Document.status != DocumentStatus.analyzing, _is_stale()),
+                )
+                .values(status=DocumentStatus.analyzing, analysis_started_at=func.now())
+                .returning(Document)
+            )
+        ).one_or_none()
+        if doc is not None:
+            await publish_case_event(
+                session, case_id, "document.updated", id=doc_id, status=doc.status
+            )
+    return doc
+
+
+async def _outcome(case_id: uuid.UUID, doc_id: uuid.UUID) -> Document | None:
+    """The finished document, or None while another analysis is still running."""
+    async with session_scope() as session:
+        doc = await session.scalar(
+            select(Document).where(Document.id == doc_id, Document.case_id == case_id)
+        )
+    if doc is None:
+        raise not_found("Document")
+    if doc.status == DocumentStatus.failed:
+        raise bad_request("Analysis failed")
+    return None if doc.status == DocumentStatus.analyzing else doc
+
+
+async def _claim_or_wait(
+    case_id: uuid.UUID,
+    doc_id: uuid.UUID,
+    analyze: Callable[[Document], Awaitable[Document]],
+) -> Document:
+    while True:
+        doc = await _claim(case_id, doc_id)
+        if doc is not None:
+            return await analyze(doc)
+        # Running on another worker. Subscribing before the re-read means its
+        # final event cannot slip in between.
+        async with case_events.subscribe(case_id) as subscription:
+            while (doc := await _outcome(case_id, doc_id)) is None:
+                try:
+                    await asyncio.wait_for(subscription.queue.get(), WAIT_POLL_SECONDS)
+                except TimeoutError:
+                    # Either the event was lost or the claim went stale.
+                    break
+        if doc is not None:
+            return doc
+
+
+async def _lead(
+    case_id: uuid.UUID,
+    doc_id: uuid.UUID,
+    analyze: Callable[[Document], Awaitable[Document]],
+    future: asyncio.Future[Document],
+) -> Document:
+    try:
+        doc = await _claim_or_wait(case_id, doc_id, analyze)
+    except Exception as exc:
+        future.set_exception(exc)
+        future.exception()  # Followers are optional; don't warn when there are none.
+        raise
+    except BaseException:
+        future.cancel()
+        raise
+    else:
+        future.set_result(doc)
+        return doc
+    finally:
+        _running.pop(doc_id, None)
+
+
+async def analyze_once(
+    case_id: uuid.UUID,
+    doc_id: uuid.UUID,
+    analyze: Callable[[Document], Awaitable[Document]],
+) -> Document:
+    """Run ``analyze`` on the claimed document, or attach to the analysis already running.
+
+    ``analyze`` must store its result (or the failed status) and publish
+    ``document.updated``. It runs under the shutdown drain, so it finishes even
+    if this request is cut off.
+    """
+    running = _running.get(doc_id)
+    if running is not None:
+        return await asyncio.shield(running)
+    future = asyncio.get_running_loop().create_future()
+    _running[doc_id] = future
+    return await drain.run(_lead(case_id, doc_id, analyze, future))
+
+
+async def recover_stale_analyses() -> int:
+    """Mark analyses abandoned by crashed workers as failed; returns the count."""
+    async with session_scope() as session:
+        rows = (
+            await session.execute(
+                update(Document)
+                .where(and_(Document.status == DocumentStatus.analyzing, _is_stale()))
+                .values(status=DocumentStatus.failed)
+                .returning(Document.id, Document.case_id)
+            )
+        ).all()
+        by_case: dict[uuid.UUID, list[dict]] = defaultdict(list)
+        for doc_id, case_id in rows:
+            by_case[case_id].append({"id": doc_id, "status": DocumentStatus.failed})
+        for case_id, items in by_case.items():
+            await publish_case_events(session, case_id, "document.updated", items)
+    return len(rows)
+
+
+async def run_analysis_recovery() -> None:
+    """Recover stale analyses every ANALYSIS_RECOVERY_INTERVAL_SECONDS until cancelled.
+
+    Runs on one worker of the deployment; see ``job_lock``.
+    """
+    lock = JobLock("analysis_recovery")
+    try:
+        while True:
+            await asyncio.sleep(settings.ANALYSIS_RECOVERY_INTERVAL_SECONDS)
+            try:
+                if not await lock.acquire():
+                    continue
+                recovered = await recover_stale_analyses()
+            except Exception:
+                logger.exception("Stale analysis recovery failed")
+                continue
+            if recovered:
+                logger.warning("Marked %d abandoned document analyses as failed", recovered)
+    finally:
+        await lock.release()
@@ -1,10 +1,22 @@
+import asyncio
 import io
+import logging
+import shutil
 import uuid
 from pathlib import Path
 
 import aiofiles
+from fastapi import UploadFile
+from sqlalchemy import update
 
 from app.config import settings
+from app.database import session_scope
+from app.models.document import Document
+from app.utils.exceptions import bad_request
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
 
 ALLOWED_MIME_TYPES = {
     "application/pdf",
@@ -14,18 +26,79 @@ ALLOWED_MIME_TYPES = {
 }
 
 
+def get_case_upload_dir(case_id: uuid.UUID) -> Path:
+    return Path(settings.UPLOAD_DIR) / str(case_id)
+
+
 def get_upload_path(case_id: uuid.UUID, filename: str) -> Path:
-    upload_dir = Path(settings.UPLOAD_DIR) / str(case_id)
+    upload_dir = get_case_upload_dir(case_id)
     upload_dir.mkdir(parents=True, exist_ok=True)
     return upload_dir / filename
 
 
-async def save_upload(case_id: uuid.UUID, file_bytes: bytes, ext: str) -> tuple[str, Path]:
-    unique_name = f"{uuid.uuid4()}{ext}"
+async def remove_upload(file_path: str) -> None:
+    await asyncio.to_thread(Path(file_path).unlink, missing_ok=True)
+
+
+async def remove_case_uploads(case_id: uuid.UUID) -> None:
+    await asyncio.to_thread(shutil.rmtree, get_case_upload_dir(case_id), ignore_errors=True)
+
+
+def check_upload_type(upload: UploadFile) -> None:
+    if upload.content_type not in ALLOWED_MIME_TYPES:
+        raise bad_request(f"Unsupported file type: {upload.content_type}")
+
+
+async def stream_upload(case_id: uuid.UUID, upload: UploadFile) -> tuple[str, Path, int]:
+    """Copy ``upload`` to storage in chunks; returns ``(name, path, size)``.
+
+    Oversized files are rejected as soon as they cross the limit and the
+    partial copy is removed.
+    """
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    unique_name = f"{uuid.uuid4()}{Path(upload.filename or 'file').suffix}"
     file_path = get_upload_path(case_id, unique_name)
-    async with aiofiles.open(file_path, "wb") as f:
-        await f.write(file_bytes)
-    return unique_name, file_path
+    size = 0
+    try:
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise bad_request(
+                        f"File exceeds maximum size of {settings.MAX_UPLOAD_SIZE_MB}MB"
+                    )
+                await f.write(chunk)
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
+    return unique_name, file_path, size
+
+
+async def extract_documents(documents: list[tuple[uuid.UUID, str, str]]) -> None:
+    """Fill in ``extracted_text`` for ``(id, file_path, mime_type)`` documents.
+
+    Runs as a background task after a batch upload, a few files at a time, so
+    a later analysis can skip parsing.
+    """
+    semaphore = asyncio.Semaphore(settings.EXTRACTION_CONCURRENCY)
+
+    async def extract_one(doc_id: uuid.UUID, file_path: str, mime_type: str) -> None:
+        async with semaphore:
+            file_bytes = await asyncio.to_thread(Path(file_path).read_bytes)
+            text = await asyncio.to_thread(extract_text, file_bytes, mime_type)
+        async with session_scope() as session:
+            await session.execute(
+                update(Document)
+                .where(Document.id == doc_id, Document.extracted_text.is_(None))
+                .values(extracted_text=text)
+            )
+
+    results = await asyncio.gather(
+        *(extract_one(*document) for document in documents), return_exceptions=True
+    )
+    for (doc_id, _, _), result in zip(documents, results, strict=True):
+        if isinstance(result, Exception):
+            logger.warning("Text extraction failed for document %s: %s", doc_id, result)
 
 
 def extract_text(file_bytes: bytes, mime_type: str) -> str:
@@ -0,0 +1,106 @@
+"""Graceful shutdown of a worker.
+
+On SIGTERM the worker reports itself not ready, refuses new LLM work and ends
+its event streams; then uvicorn stops accepting connections and waits for
+open requests. LLM calls run as shielded tasks: if uvicorn gives up on a
+request at its deadline, the call still finishes and its result is stored
+before the lifespan lets the process exit. The lifespan only runs once
+uvicorn's SHUTDOWN_TIMEOUT_SECONDS are over, so the calls get
+SHUTDOWN_LLM_GRACE_SECONDS beyond that.
+"""
+import asyncio
+import logging
+import signal
+import threading
+import time
+from collections.abc import Callable, Coroutine
+from typing import Any, TypeVar
+
+from app.config import settings
+from app.utils.exceptions import service_unavailable
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Drain:
+    def __init__(self) -> None:
+        self.draining = False
+        self._deadline: float | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def on_drain(self, callback: Callable[[], None]) -> None:
+        self._callbacks.append(callback)
+
+    def start(self) -> None:
+        if self.draining:
+            return
+        self.draining = True
+        self._deadline = (
+            time.monotonic()
+            + settings.SHUTDOWN_NOTICE_SECONDS
+            + settings.SHUTDOWN_TIMEOUT_SECONDS
+            + settings.SHUTDOWN_LLM_GRACE_SECONDS
+        )
+        logger.info("Draining: %d LLM calls in flight", self.in_flight)
+        for callback in self._callbacks:
+            callback()
+
+    def install_signal_handlers(self) -> None:
+        """Start draining on SIGTERM/SIGINT, then hand the signal on to uvicorn.
+
+        SIGTERM reaches uvicorn, which closes the socket, only after
+        SHUTDOWN_NOTICE_SECONDS, so load balancers can see the 503 from
+        readiness checks first.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+            notice = settings.SHUTDOWN_NOTICE_SECONDS if sig == signal.SIGTERM else 0
+
+            def handler(
+                signum: int, frame: Any, previous: Any = previous, notice: float = notice
+            ) -> None:
+                loop.call_soon_threadsafe(self.start)
+                if notice > 0 and not self.draining:
+                    loop.call_soon_threadsafe(loop.call_later, notice, previous, signum, frame)
+                else:
+                    previous(signum, frame)
+
+            signal.signal(sig, handler)
+
+    async def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Await ``coro`` in a task that survives cancellation of the caller."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(task)
+
+    async def wait(self) -> None:
+        """Wait until in-flight calls finish or the shutdown deadline passes."""
+        self.start()
+        if not self._tasks:
+            return
+        timeout = max(0.0, self._deadline - time.monotonic())
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            logger.warning("Shutting down with %d LLM calls unfinished", len(pending))
+
+
+drain = Drain()
+
+
+def reject_if_draining() -> None:
+    """Dependency for routes that start LLM work."""
+    if drain.draining:
+        raise service_unavailable("Server is restarting, please retry", retry_after=5)
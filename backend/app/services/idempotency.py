@@ -0,0 +1,178 @@
+"""Idempotency-Key support for routes that start LLM work.
+
+A client that repeats a request with the same key gets the first request's
+response back, so its retries never call the model twice. Keys belong to the
+user, and finished responses are kept in ``idempotency_keys`` for
+IDEMPOTENCY_RETENTION_HOURS. A duplicate that arrives while the first request
+is still running waits for it. On the same worker it awaits that request's
+future; on another worker it polls the row. A failed request releases its key
+so the client can retry. Reusing a key for a different request is refused
+with 422.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Annotated, Any
+
+from fastapi import Header, Response
+from sqlalchemy import and_, delete, func, null, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.database import session_scope
+from app.models.idempotency_key import IdempotencyKey
+from app.services.drain import drain
+from app.utils.exceptions import conflict, unprocessable
+
+logger = logging.getLogger(__name__)
+
+IdempotencyKeyHeader = Annotated[
+    str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+]
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+POLL_INTERVAL_SECONDS = 0.5
+PRUNE_INTERVAL_SECONDS = 3600.0
+
+_LOCK = timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+_RETENTION = timedelta(hours=settings.IDEMPOTENCY_RETENTION_HOURS)
+
+# Requests running on this worker, by (user_id, key): (fingerprint, result).
+_inflight: dict[tuple[uuid.UUID, str], tuple[str, asyncio.Future]] = {}
+_pruned_at = time.monotonic()
+
+
+def request_fingerprint(*parts: object) -> str:
+    """Hash of what identifies a request, e.g. its route, path ids and body."""
+    return hashlib.sha256("\x1f".join(map(str, parts)).encode()).hexdigest()
+
+
+def _claim(user_id: uuid.UUID, key: str, fingerprint: str):
+    stmt = insert(IdempotencyKey).values(user_id=user_id, key=key, fingerprint=fingerprint)
+    # An existing key is only taken over once abandoned by a crashed worker or expired.
+    takeover = or_(
+        and_(
+            IdempotencyKey.completed_at.is_(None),
+            IdempotencyKey.created_at < func.now() - _LOCK,
+        ),
+        IdempotencyKey.completed_at < func.now() - _RETENTION,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "fingerprint": stmt.excluded.fingerprint,
+            "response": null(),
+            "created_at": func.now(),
+            "completed_at": None,
+        },
+        where=takeover,
+    ).returning(IdempotencyKey.key)
+
+
+def _where(user_id: uuid.UUID, key: str):
+    return (IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+
+
+def _check_fingerprint(stored: str, fingerprint: str) -> None:
+    if stored != fingerprint:
+        raise unprocessable("Idempotency-Key was already used for a different request")
+
+
+async def _execute(
+    user_id: uuid.UUID, key: str, fingerprint: str, work: Callable[[], Awaitable[Any]]
+) -> Any:
+    future = asyncio.get_running_loop().create_future()
+    _inflight[(user_id, key)] = (fingerprint, future)
+    try:
+        result = await work()
+        async with session_scope() as session:
+            await session.execute(
+                update(IdempotencyKey)
+                .where(*_where(user_id, key))
+                .values(response=result, completed_at=func.now())
+            )
+    except BaseException as exc:
+        try:
+            async with session_scope() as session:
+                await session.execute(delete(IdempotencyKey).where(*_where(user_id, key)))
+        except (SQLAlchemyError, OSError):
+            # The key stays locked until IDEMPOTENCY_LOCK_SECONDS have passed.
+            logger.warning("Could not release idempotency key %s", key, exc_info=True)
+        if isinstance(exc, Exception):
+            future.set_exception(exc)
+            future.exception()  # Waiters are optional; don't warn when there are none.
+        else:
+            future.cancel()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop((user_id, key), None)
+
+
+async def idempotent(
+    user_id: uuid.UUID,
+    key: str | None,
+    fingerprint: str,
+    work: Callable[[], Awaitable[Any]],
+    response: Response,
+) -> Any:
+    """Run ``work`` once per user and ``key`` and return its JSON-able result.
+
+    Without a key ``work`` just runs. With one it runs like ``drain.run``, so the
+    result is stored even if the request is cut off.
+    """
+    global _pruned_at
+    if key is None:
+        return await work()
+
+    deadline = time.monotonic() + settings.IDEMPOTENCY_LOCK_SECONDS
+    while True:
+        inflight = _inflight.get((user_id, key))
+        if inflight is not None:
+            _check_fingerprint(inflight[0], fingerprint)
+            result = await asyncio.shield(inflight[1])
+            break
+
+        async with session_scope() as session:
+            claimed = (await session.execute(_claim(user_id, key, fingerprint))).first()
+            row = None
+            if claimed is None:
+                row = (
+                    await session.execute(
+                        select(
+                            IdempotencyKey.fingerprint,
+                            IdempotencyKey.response,
+                            IdempotencyKey.completed_at,
+                        ).where(*_where(user_id, key))
+                    )
+                ).first()
+            if time.monotonic() - _pruned_at > PRUNE_INTERVAL_SECONDS:
+                _pruned_at = time.monotonic()
+                await session.execute(
+                    delete(IdempotencyKey).where(
+                        func.coalesce(IdempotencyKey.completed_at, IdempotencyKey.created_at)
+                        < func.now() - _RETENTION
+                    )
+                )
+        if claimed is not None:
+            return await drain.run(_execute(user_id, key, fingerprint, work))
+        if row is None:
+            continue  # Released by a failed request in between; claim it again.
+        _check_fingerprint(row.fingerprint, fingerprint)
+        if row.completed_at is not None:
+            result = row.response
+            break
+        # Still running on another worker.
+        if time.monotonic() > deadline:
+            raise conflict("A request with this Idempotency-Key is still in progress")
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    response.headers[REPLAYED_HEADER] = "true"
+    return result
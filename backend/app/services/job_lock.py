@@ -0,0 +1,60 @@
+"""One runner per deployment for the periodic background jobs.
+
+Every worker starts the job loops, but only the worker holding a job's
+Postgres advisory lock runs the job. The lock is taken with
+``pg_try_advisory_lock`` on a dedicated autocommit connection and kept for
+the life of that connection. So the first worker to get it keeps running the
+job, and the others skip each round. If that worker dies or loses its
+connection, the lock is freed and another worker takes over on its next
+round. The cost is one pooled connection on the running worker.
+"""
+import logging
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class JobLock:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._conn: AsyncConnection | None = None
+
+    async def acquire(self) -> bool:
+        """Whether this worker runs the job this round; cheap once it holds the lock."""
+        if self._conn is not None:
+            try:
+                await self._conn.execute(text("SELECT 1"))
+                return True
+            except (DBAPIError, OSError):
+                logger.warning("Lost the connection holding the %s job lock", self.name)
+                await self.release()
+        conn = await engine.connect()
+        try:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await conn.scalar(
+                select(func.pg_try_advisory_lock(func.hashtextextended(self.name, 0)))
+            )
+        except BaseException:
+            await conn.invalidate()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        logger.info("This worker now runs the %s job", self.name)
+        self._conn = conn
+        return True
+
+    async def release(self) -> None:
+        """Give the job up; closing the connection frees the lock."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                # The pool would otherwise hand the session, lock and all, to a request.
+                await conn.invalidate()
+            except (DBAPIError, OSError):
+                pass
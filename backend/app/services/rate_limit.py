@@ -0,0 +1,213 @@
+"""Token-bucket rate limits per user and route (per client IP for login).
+
+Each ``Limit`` is a bucket of ``capacity`` tokens that refills at ``capacity``
+per ``period`` seconds. Request limits take one token per request. The LLM
+token limit admits a request while its bucket is positive and is charged
+afterwards with the tokens the call actually used, so one long answer can
+leave it in debt.
+
+Buckets live in process memory. With RATE_LIMIT_BACKEND=postgres they are
+also kept in ``rate_limit_buckets``, so every worker and replica sees the same
+counts. A local bucket only counts requests that the shared one allowed, so it
+never holds fewer tokens than the shared bucket. A local refusal is therefore
+always right and is answered without a database round trip.
+
+Routes that take an Idempotency-Key check their limits inside the idempotent
+work, so a retry that is answered from the first request costs nothing.
+"""
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.database import session_scope
+from app.utils.exceptions import too_many_requests
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Limit:
+    name: str
+    capacity: float
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+
+LOGIN = Limit("login", settings.RATE_LIMIT_LOGIN_PER_MINUTE, 60)
+CHAT = Limit("chat", settings.RATE_LIMIT_CHAT_PER_MINUTE, 60)
+ANALYZE = Limit("analyze", settings.RATE_LIMIT_ANALYZE_PER_MINUTE, 60)
+LLM_TOKENS = Limit("llm_tokens", settings.RATE_LIMIT_LLM_TOKENS_PER_HOUR, 3600)
+
+
+@dataclass
+class Decision:
+    limit: Limit
+    allowed: bool
+    # Tokens left after this request, or held when it was refused.
+    tokens: float
+    needed: float
+
+    def headers(self) -> dict[str, str]:
+        limit = self.limit
+        headers = {
+            "RateLimit-Limit": str(int(limit.capacity)),
+            "RateLimit-Remaining": str(max(0, math.floor(self.tokens))),
+            "RateLimit-Reset": str(math.ceil(max(0.0, limit.capacity - self.tokens) / limit.rate)),
+            "RateLimit-Policy": f"{int(limit.capacity)};w={int(limit.period)}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil((self.needed - self.tokens) / limit.rate))
+        return headers
+
+
+class LocalBuckets:
+    """This process's buckets; the least recently used are dropped past ``max_keys``."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def peek(self, key: str, limit: Limit) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return limit.capacity
+        tokens, updated = bucket
+        return min(limit.capacity, tokens + (time.monotonic() - updated) * limit.rate)
+
+    def take(self, key: str, limit: Limit, amount: float) -> float:
+        tokens = self.peek(key, limit) - amount
+        self._buckets[key] = (tokens, time.monotonic())
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return tokens
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+# Refills the row (creating it full) and locks it; refill uses the database
+# clock, so every worker agrees on it.
+_REFILL = text(
+    """
+    INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+    VALUES (:key, :capacity, now())
+    ON CONFLICT (key) DO UPDATE
+    SET tokens = least(:capacity, b.tokens + extract(epoch FROM now() - b.updated_at) * :rate),
+        updated_at = now()
+    RETURNING tokens
+    """
+)
+_TAKE = text("UPDATE rate_limit_buckets SET tokens = tokens - :amount WHERE key = :key")
+# Idle this long, any bucket has refilled and is the same as no row.
+_PRUNE = text("DELETE FROM rate_limit_buckets WHERE updated_at < now() - interval '1 day'")
+PRUNE_INTERVAL_SECONDS = 3600.0
+
+
+class SharedBuckets:
+    def __init__(self) -> None:
+        self._pruned_at = time.monotonic()
+
+    async def take(
+        self, key: str, limit: Limit, amount: float, needed: float
+    ) -> tuple[bool, float]:
+        """Take ``amount`` if the bucket holds ``needed``; returns (allowed, tokens)."""
+        params = {"key": key, "capacity": limit.capacity, "rate": limit.rate}
+        async with session_scope() as session:
+            tokens = (await session.execute(_REFILL, params)).scalar_one()
+            if tokens < needed:
+                return False, tokens
+            if amount:
+                await session.execute(_TAKE, {"key": key, "amount": amount})
+            if time.monotonic() - self._pruned_at > PRUNE_INTERVAL_SECONDS:
+                self._pruned_at = time.monotonic()
+                await session.execute(_PRUNE)
+        return True, tokens - amount
+
+
+class RateLimiter:
+    def __init__(self, shared: SharedBuckets | None, max_keys: int) -> None:
+        self.local = LocalBuckets(max_keys)
+        self.shared = shared
+
+    async def _take(self, key: str, limit: Limit, amount: float, needed: float) -> Decision:
+        tokens = self.local.peek(key, limit)
+        if tokens < needed:
+            return Decision(limit, False, tokens, needed)
+        if self.shared is not None:
+            try:
+                allowed, tokens = await self.shared.take(key, limit, amount, needed)
+            except (SQLAlchemyError, OSError):
+                # Fail open to the local bucket rather than refuse all traffic.
+                logger.warning("Shared rate limit unavailable for %s", key, exc_info=True)
+            else:
+                if allowed:
+                    self.local.take(key, limit, amount)
+                return Decision(limit, allowed, tokens, needed)
+        return Decision(limit, True, self.local.take(key, limit, amount), needed)
+
+    async def acquire(self, key: str, limit: Limit, cost: float = 1) -> Decision:
+        """Take ``cost`` tokens if available; a cost of 0 only requires a positive bucket."""
+        return await self._take(key, limit, cost, max(cost, 1))
+
+    async def charge(self, key: str, limit: Limit, amount: float) -> None:
+        """Take ``amount`` unconditionally, e.g. tokens used by a finished LLM call."""
+        if limit.enabled and amount > 0:
+            await self._take(key, limit, amount, -math.inf)
+
+
+rate_limiter = RateLimiter(
+    SharedBuckets() if settings.RATE_LIMIT_BACKEND == "postgres" else None,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+)
+
+
+async def _enforce(response: Response, subject: str, limits: tuple[Limit, ...]) -> None:
+    decisions = []
+    for limit in limits:
+        if not limit.enabled:
+            continue
+        # Cost 0 for LLM tokens: admitted while positive, charged after the call.
+        cost = 0 if limit is LLM_TOKENS else 1
+        decision = await rate_limiter.acquire(f"{limit.name}:{subject}", limit, cost)
+        if not decision.allowed:
+            raise too_many_requests(f"Rate limit exceeded ({limit.name})", decision.headers())
+        decisions.append(decision)
+    if decisions:
+        # The limit closest to running out is the one worth reporting.
+        tightest = min(decisions, key=lambda d: d.tokens / d.limit.capacity)
+        response.headers.update(tightest.headers())
+
+
+async def enforce_rate_limit(response: Response, user_id: uuid.UUID, *limits: Limit) -> None:
+    """Enforce ``limits`` for a user; order them cheapest-to-refuse first."""
+    await _enforce(response, str(user_id), limits)
+
+
+def rate_limit_by_ip(*limits: Limit) -> Callable:
+    """Dependency enforcing ``limits`` per client address, for unauthenticated routes."""
+
+    async def dependency(request: Request, response: Response) -> None:
+        await _enforce(response, request.client.host if request.client else "unknown", limits)
+
+    return dependency
+
+
+async def charge_llm_tokens(user_id: uuid.UUID, tokens: int) -> None:
+    await rate_limiter.charge(f"{LLM_TOKENS.name}:{user_id}", LLM_TOKENS, tokens)
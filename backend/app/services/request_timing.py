@@ -0,0 +1,268 @@
+"""Per-request timing: wall time, DB queries, LLM time and serialization.
+
+``RequestTimingMiddleware`` opens a ``RequestTiming`` for every HTTP request
+and publishes it three ways once the response is done: a ``Server-Timing``
+header, one JSON log line and the route-labelled histograms served from
+``/metrics``. Queries are counted through engine events, so every session on
+an instrumented engine is covered without the routes doing anything.
+
+The header is written when the response starts; work done after that
+(streamed bodies, background tasks) only shows in the log and histograms.
+Histograms are per worker process.
+"""
+import bisect
+import functools
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import orjson
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestTiming:
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    llm_seconds: float = 0.0
+    # Set by TimedRoute when the endpoint returns, with the DB time so far, so
+    # the commit that follows is not counted as serialization.
+    handler_done: float | None = None
+    db_seconds_at_handler_done: float = 0.0
+    serialize_seconds: float | None = None
+    query_budget: int | None = None
+
+    def server_timing(self, total: float) -> str:
+        metrics = [
+            f"db;desc=\"{self.db_queries} queries\";dur={self.db_seconds * 1000:.1f}",
+            f"llm;dur={self.llm_seconds * 1000:.1f}",
+        ]
+        if self.serialize_seconds is not None:
+            metrics.append(f"serialize;dur={self.serialize_seconds * 1000:.1f}")
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_current: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+@contextmanager
+def llm_timer() -> Iterator[None]:
+    """Add the time spent in the block to the current request's LLM time."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = _current.get()
+        if timing is not None:
+            timing.llm_seconds += time.perf_counter() - started
+
+
+# The start time lives on the statement's execution context, which is dropped
+# with the statement, so a failed one leaves nothing behind on the pooled
+# connection; handle_error counts it instead of after_cursor_execute.
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    if context is not None:
+        context.query_started = time.perf_counter()
+
+
+def _count_query(context: Any) -> None:
+    started = getattr(context, "query_started", None)
+    timing = _current.get()
+    if started is not None and timing is not None:
+        timing.db_queries += 1
+        timing.db_seconds += time.perf_counter() - started
+        context.query_started = None
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    _count_query(context)
+
+
+def _handle_error(exception_context: Any) -> None:
+    _count_query(exception_context.execution_context)
+
+
+def instrument_engine(target: AsyncEngine) -> None:
+    event.listen(target.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target.sync_engine, "handle_error", _handle_error)
+
+
+def query_budget(queries: int) -> Callable[[Callable], Callable]:
+    """Set a route's query count above which a request is flagged as a likely N+1.
+
+    Hot routes set one close to what they need, so a per-row query shows up
+    at once; other routes fall back to REQUEST_QUERY_BUDGET.
+    """
+
+    def decorate(endpoint: Callable) -> Callable:
+        endpoint.query_budget = queries
+        return endpoint
+
+    return decorate
+
+
+class TimedRoute(APIRoute):
+    """Marks when the endpoint returns, so the time up to the response start
+    can be reported as serialization."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any) -> None:
+        budget = getattr(endpoint, "query_budget", None)
+        self.query_budget = budget or settings.REQUEST_QUERY_BUDGET
+
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args: Any, **kw: Any) -> Any:
+            try:
+                return await endpoint(*args, **kw)
+            finally:
+                timing = _current.get()
+                if timing is not None:
+                    timing.handler_done = time.perf_counter()
+                    timing.db_seconds_at_handler_done = timing.db_seconds
+                    timing.query_budget = budget
+
+        super().__init__(path, timed_endpoint, **kwargs)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # labels -> per-bucket counts (+Inf last), sum
+        self._counts: dict[tuple[str, ...], list[int]] = defaultdict(
+            lambda: [0] * (len(buckets) + 1)
+        )
+        self._sums: dict[tuple[str, ...], float] = defaultdict(float)
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        self._counts[labels][bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def render(self, label_names: tuple[str, ...]) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, counts in self._counts.items():
+            base = ",".join(f'{k}="{v}"' for k, v in zip(label_names, labels, strict=True))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                cumulative += count
+                yield f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{base}}} {self._sums[labels]}"
+            yield f"{self.name}_count{{{base}}} {cumulative}"
+
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+LABELS = ("method", "route")
+
+HISTOGRAMS = {
+    "total": Histogram("http_request_duration_seconds", "Request wall time", SECONDS_BUCKETS),
+    "db": Histogram("http_request_db_seconds", "Time in database queries", SECONDS_BUCKETS),
+    "queries": Histogram("http_request_db_queries", "Database queries per request", QUERY_BUCKETS),
+    "llm": Histogram("http_request_llm_seconds", "Time waiting on the LLM", SECONDS_BUCKETS),
+    "serialize": Histogram(
+        "http_request_serialize_seconds", "Response validation and encoding", SECONDS_BUCKETS
+    ),
+}
+_n_plus_one: dict[tuple[str, ...], int] = defaultdict(int)
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for histogram in HISTOGRAMS.values():
+        lines.extend(histogram.render(LABELS))
+    lines.append("# HELP http_request_n_plus_one_total Requests over their route's query budget")
+    lines.append("# TYPE http_request_n_plus_one_total counter")
+    for (method, route), count in _n_plus_one.items():
+        lines.append(f'http_request_n_plus_one_total{{method="{method}",route="{route}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def _record(scope: Scope, timing: RequestTiming, status: int | None, total: float) -> None:
+    route = scope.get("route")
+    labels = (scope["method"], route.path_format if route is not None else "unmatched")
+    budget = timing.query_budget or settings.REQUEST_QUERY_BUDGET
+    n_plus_one = timing.db_queries > budget
+
+    HISTOGRAMS["total"].observe(labels, total)
+    HISTOGRAMS["db"].observe(labels, timing.db_seconds)
+    HISTOGRAMS["queries"].observe(labels, timing.db_queries)
+    HISTOGRAMS["llm"].observe(labels, timing.llm_seconds)
+    if timing.serialize_seconds is not None:
+        HISTOGRAMS["serialize"].observe(labels, timing.serialize_seconds)
+    if n_plus_one:
+        _n_plus_one[labels] += 1
+
+    line = {
+        "method": labels[0],
+        "route": labels[1],
+        "path": scope["path"],
+        "status": status,
+        "total_ms": round(total * 1000, 1),
+        "db_queries": timing.db_queries,
+        "db_ms": round(timing.db_seconds * 1000, 1),
+        "llm_ms": round(timing.llm_seconds * 1000, 1),
+        "serialize_ms": (
+            round(timing.serialize_seconds * 1000, 1)
+            if timing.serialize_seconds is not None
+            else None
+        ),
+    }
+    if n_plus_one:
+        line["n_plus_one"] = True
+        line["query_budget"] = budget
+        logger.warning(orjson.dumps(line).decode())
+    else:
+        logger.info(orjson.dumps(line).decode())
+
+
+class RequestTimingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        status: int | None = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                status = message["status"]
+                if timing.handler_done is not None:
+                    db_since = timing.db_seconds - timing.db_seconds_at_handler_done
+                    timing.serialize_seconds = max(0.0, now - timing.handler_done - db_since)
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing.server_timing(now - timing.started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            _record(scope, timing, status, time.perf_counter() - timing.started)
@@ -0,0 +1,109 @@
+"""Reclaims files under UPLOAD_DIR that no ``documents`` row points to.
+
+Deletes remove their files right after commit, so the sweep only catches what
+that misses: crashes between commit and unlink, failed inserts, and files left
+from before deletes cleaned up after themselves.
+"""
+import asyncio
+import logging
+import socket
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import PrimaryReadSessionLocal
+from app.models.case import Case
+from app.models.document import Document
+from app.services.job_lock import JobLock
+
+logger = logging.getLogger(__name__)
+
+# Case directories reconciled per round of queries.
+BATCH_SIZE = 500
+
+
+def _list_case_dirs(root: Path) -> list[tuple[uuid.UUID, Path]]:
+    if not root.is_dir():
+        return []
+    case_dirs = []
+    for entry in root.iterdir():
+        try:
+            case_dirs.append((uuid.UUID(entry.name), entry))
+        except ValueError:
+            continue
+    return [(case_id, path) for case_id, path in case_dirs if path.is_dir()]
+
+
+def _sweep(
+    case_dirs: list[tuple[uuid.UUID, Path]],
+    known: dict[uuid.UUID, set[str]],
+    live_cases: set[uuid.UUID],
+    cutoff: float,
+) -> int:
+    removed = 0
+    for case_id, directory in case_dirs:
+        try:
+            for path in directory.iterdir():
+                if path.name in known[case_id] or not path.is_file():
+                    continue
+                # Young files may belong to an upload whose row is not committed yet.
+                if path.stat().st_mtime > cutoff:
+                    continue
+                path.unlink(missing_ok=True)
+                removed += 1
+            if case_id not in live_cases and not any(directory.iterdir()):
+                directory.rmdir()
+        except FileNotFoundError:
+            # Removed concurrently, e.g. by a case delete.
+            continue
+    return removed
+
+
+async def collect_orphaned_files() -> int:
+    """Delete unreferenced upload files older than the grace period; returns the count."""
+    case_dirs = await asyncio.to_thread(_list_case_dirs, Path(settings.UPLOAD_DIR))
+    cutoff = time.time() - settings.UPLOAD_GC_GRACE_SECONDS
+    removed = 0
+    for start in range(0, len(case_dirs), BATCH_SIZE):
+        batch = case_dirs[start : start + BATCH_SIZE]
+        case_ids = [case_id for case_id, _ in batch]
+        # Always the primary: a lagging replica could miss fresh rows.
+        async with PrimaryReadSessionLocal() as session:
+            rows = await session.execute(
+                select(Document.case_id, Document.filename).where(
+                    Document.case_id.in_(case_ids)
+                )
+            )
+            known: dict[uuid.UUID, set[str]] = defaultdict(set)
+            for case_id, filename in rows:
+                known[case_id].add(filename)
+            live_cases = set(await session.scalars(select(Case.id).where(Case.id.in_(case_ids))))
+        removed += await asyncio.to_thread(_sweep, batch, known, live_cases, cutoff)
+    return removed
+
+
+async def run_upload_gc() -> None:
+    """Sweep every UPLOAD_GC_INTERVAL_SECONDS until cancelled, on one worker per host.
+
+    Per host rather than per deployment, as UPLOAD_DIR may be a local disk;
+    hosts sharing a volume sweep it each, which only repeats idempotent unlinks.
+    """
+    lock = JobLock(f"upload_gc:{socket.gethostname()}")
+    try:
+        while True:
+            await asyncio.sleep(settings.UPLOAD_GC_INTERVAL_SECONDS)
+            try:
+                if not await lock.acquire():
+                    continue
+                removed = await collect_orphaned_files()
+            except Exception:
+                logger.exception("Upload garbage collection failed")
+                continue
+            if removed:
+                logger.info("Removed %d orphaned upload files", removed)
+    finally:
+        await lock.release()
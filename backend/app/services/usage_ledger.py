@@ -0,0 +1,166 @@
+"""Per-call LLM token ledger.
+
+``claude_service`` records every Claude API call here. Recording only appends
+to an in-memory buffer, so it adds nothing to request latency. A background
+task writes the buffer every USAGE_FLUSH_INTERVAL_SECONDS, or sooner once
+USAGE_FLUSH_BATCH_SIZE calls are waiting. Each write is one transaction. It
+inserts the calls into ``llm_calls`` and adds their sums to the matching
+``llm_usage_daily`` rows, so the rollups are always up to date and reports
+never scan the raw calls.
+
+If the database is unavailable, the rows stay buffered up to
+USAGE_MAX_BUFFERED; beyond that the oldest are dropped and counted. Shutdown
+writes what is left once in-flight LLM calls have finished.
+"""
+import asyncio
+import contextlib
+import logging
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.database import session_scope
+from app.models.llm_usage import LLMCall, LLMUsageDaily
+
+logger = logging.getLogger(__name__)
+
+_SUMMED = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+    "latency_ms",
+)
+_ROLLUP_KEY = ("day", "case_id", "user_id", "purpose", "model")
+
+
+def _rollup(rows: list[dict]) -> list[dict]:
+    totals: dict[tuple, dict] = {}
+    for row in rows:
+        key = (row["created_at"].date(), *(row[column] for column in _ROLLUP_KEY[1:]))
+        total = totals.get(key)
+        if total is None:
+            total = totals[key] = {
+                **dict(zip(_ROLLUP_KEY, key, strict=True)),
+                "calls": 0,
+                **dict.fromkeys(_SUMMED, 0),
+            }
+        total["calls"] += 1
+        for column in _SUMMED:
+            total[column] += row[column]
+    # Workers upsert in key order, so concurrent flushes cannot deadlock.
+    return [totals[key] for key in sorted(totals)]
+
+
+class UsageLedger:
+    def __init__(self, batch_size: int, interval: float, max_buffered: int) -> None:
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_buffered = max_buffered
+        self.dropped = 0
+        self._buffer: list[dict] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def record(
+        self,
+        *,
+        user_id: uuid.UUID,
+        case_id: uuid.UUID,
+        purpose: str,
+        model: str,
+        step: int,
+        usage: object,
+        latency_ms: int,
+    ) -> None:
+        """Buffer one call; ``usage`` is the API response's usage block."""
+        self._buffer.append(
+            {
+                "created_at": datetime.now(UTC),
+                "user_id": user_id,
+                "case_id": case_id,
+                "purpose": purpose,
+                "model": model,
+                "step": step,
+                "input_tokens": usage.input_tokens,
+                "output_tokens": usage.output_tokens,
+                # None when the request used no prompt caching.
+                "cache_creation_input_tokens": (
+                    getattr(usage, "cache_creation_input_tokens", None) or 0
+                ),
+                "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+                "latency_ms": latency_ms,
+            }
+        )
+        self._trim()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _trim(self) -> None:
+        overflow = len(self._buffer) - self.max_buffered
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+
+    async def flush(self) -> int:
+        """Write everything buffered; returns the number of calls written."""
+        rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        try:
+            async with session_scope() as session:
+                await session.execute(insert(LLMCall), rows)
+                stmt = pg_insert(LLMUsageDaily)
+                await session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=list(_ROLLUP_KEY),
+                        set_={
+                            column: getattr(LLMUsageDaily, column) + stmt.excluded[column]
+                            for column in ("calls", *_SUMMED)
+                        },
+                    ),
+                    _rollup(rows),
+                )
+        except BaseException:
+            # Put them back in front of anything recorded meanwhile.
+            self._buffer[:0] = rows
+            self._trim()
+            raise
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Writing %d LLM usage rows failed", len(self._buffer))
+            if self.dropped:
+                logger.warning("Dropped %d LLM usage rows; the buffer was full", self.dropped)
+                self.dropped = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Writing %d LLM usage rows at shutdown failed", len(self._buffer))
+
+
+usage_ledger = UsageLedger(
+    batch_size=settings.USAGE_FLUSH_BATCH_SIZE,
+    interval=settings.USAGE_FLUSH_INTERVAL_SECONDS,
+    max_buffered=settings.USAGE_MAX_BUFFERED,
+)
@@ -0,0 +1,66 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User, UserRole
+from app.utils.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Read-only copy of an active user row, safe to share between requests."""
+
+    id: uuid.UUID
+    email: str
+    full_name: str
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+user_cache: TTLCache[uuid.UUID, UserSnapshot] = TTLCache(
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
+
+
+_PENDING_KEY = "invalidated_user_ids"
+
+
+def invalidate_user(session: AsyncSession, user_id: uuid.UUID) -> None:
+    """Drop a user from the cache now and again once the session commits.
+
+    The second eviction covers requests that re-cached the old row while the
+    change was still uncommitted.
+    """
+    user_cache.invalidate(user_id)
+    session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_evictions(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,88 @@
+"""Startup warm-up, run by the lifespan before the worker accepts requests.
+
+Everything here would otherwise happen on some user's first request: opening
+DB connections, configuring the ORM mappers, importing the document
+extractors and search client, loading the bcrypt backend, and the TLS
+handshake with the Anthropic API. Each step is
+time-boxed and a failure is only logged; a cold path is slower, not broken.
+"""
+import asyncio
+import importlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers
+
+from app.config import settings
+from app.database import engine, replica_engine
+from app.services.auth_service import pwd_context
+from app.services.claude_service import warm_up_client
+
+logger = logging.getLogger(__name__)
+
+# Imported lazily by the code that uses them.
+LAZY_MODULES = ("PyPDF2", "duckduckgo_search", "httpx", "anthropic")
+
+
+async def _fill_pool(target: AsyncEngine) -> None:
+    async def ping() -> None:
+        async with target.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Concurrent checkouts, so the pool ends up holding DB_POOL_SIZE connections.
+    await asyncio.gather(*(ping() for _ in range(settings.DB_POOL_SIZE)))
+
+
+async def _warm_database() -> None:
+    await _fill_pool(engine)
+    if replica_engine is not None:
+        await _fill_pool(replica_engine)
+
+
+async def _configure_orm() -> None:
+    # Otherwise done by the first ORM query.
+    configure_mappers()
+
+
+async def _import_lazy_modules() -> None:
+    for name in LAZY_MODULES:
+        await asyncio.to_thread(importlib.import_module, name)
+
+
+async def _load_bcrypt() -> None:
+    await asyncio.to_thread(pwd_context.handler("bcrypt").get_backend)
+
+
+async def _warm_llm_client() -> None:
+    if settings.WARMUP_LLM_CONNECTION and settings.ANTHROPIC_API_KEY:
+        await asyncio.to_thread(warm_up_client)
+
+
+STEPS: dict[str, Callable[[], Awaitable[None]]] = {
+    "database": _warm_database,
+    "orm": _configure_orm,
+    "imports": _import_lazy_modules,
+    "bcrypt": _load_bcrypt,
+    "llm_client": _warm_llm_client,
+}
+
+
+async def warm_up() -> dict[str, float | None]:
+    """Run every step concurrently; returns each step's seconds, or None if it failed."""
+
+    async def timed(name: str, step: Callable[[], Awaitable[None]]) -> float | None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(step(), settings.WARMUP_TIMEOUT_SECONDS)
+        except Exception as exc:
+            logger.warning("Warm-up step %s failed: %r", name, exc)
+            return None
+        return time.perf_counter() - started
+
+    results = await asyncio.gather(*(timed(name, step) for name, step in STEPS.items()))
+    timings = dict(zip(STEPS, results, strict=True))
+    logger.info("Warm-up finished: %s", timings)
+    return timings
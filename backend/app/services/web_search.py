@@ -0,0 +1,245 @@
+"""Web search behind Claude's ``web_search`` tool.
+
+SEARCH_PROVIDER picks where results come from:
+
+- ``duckduckgo`` (the default, no key needed) runs the synchronous
+  duckduckgo_search client on its own small thread pool, keeping one session
+  per thread. A search keeps its thread slot until the thread is done, even
+  after ``search`` has timed out on it, so abandoned searches cannot pile up;
+- ``brave`` calls the Brave Search API with SEARCH_API_KEY through a shared
+  keep-alive httpx client;
+- ``fixture`` answers from a JSON file of canned results, for tests and
+  benchmarks.
+
+``search`` limits how many searches run at once and how long each may take.
+It returns the results as compact text for the next model turn: duplicates
+dropped, snippets shortened, and the total kept within SEARCH_RESULT_TOKENS.
+A failure raises ``SearchError``, which the tool loop reports to Claude as a
+failed tool call rather than as search results.
+"""
+from __future__ import annotations
+
+import asyncio
+import html
+import json
+import logging
+import re
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in English text, for trimming without a tokenizer.
+CHARS_PER_TOKEN = 4
+SNIPPET_CHARS = 320
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    title: str
+    url: str
+    snippet: str
+
+
+class SearchError(Exception):
+    """A search that failed; the message is shown to the model."""
+
+
+class SearchProvider(ABC):
+    @abstractmethod
+    async def search(self, query: str, max_results: int) -> list[SearchResult]: ...
+
+    async def aclose(self) -> None:  # noqa: B027 - optional hook
+        """Release connections or threads; nothing by default."""
+
+
+class DuckDuckGoProvider(SearchProvider):
+    def __init__(self, workers: int, timeout: float) -> None:
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="web-search")
+        # Released when the thread finishes, not when the caller stops waiting:
+        # a timeout cannot stop the thread.
+        self._jobs = asyncio.Semaphore(workers)
+        self._local = threading.local()
+
+    def _search(self, query: str, max_results: int) -> list[SearchResult]:
+        ddgs = getattr(self._local, "ddgs", None)
+        if ddgs is None:
+            from duckduckgo_search import DDGS
+
+            ddgs = self._local.ddgs = DDGS(timeout=max(1, round(self.timeout)))
+        return [
+            SearchResult(r.get("title", ""), r.get("href", ""), r.get("body", ""))
+            for r in ddgs.text(query, max_results=max_results)
+        ]
+
+    async def search(self, query: str, max_results: int) -> list[SearchResult]:
+        await self._jobs.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._executor.submit(self._search, query, max_results)
+        except BaseException:
+            self._jobs.release()
+            raise
+
+        def release(_) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._jobs.release)
+
+        job.add_done_callback(release)
+        return await asyncio.wrap_future(job)
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BraveSearchProvider(SearchProvider):
+    URL = "https://api.search.brave.com/res/v1/web/search"
+
+    def __init__(self, api_key: str, connections: int, timeout: float) -> None:
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            headers={"X-Subscription-Token": api_key, "Accept": "application/json"},
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 3.0)),
+            limits=httpx.Limits(
+                max_connections=connections, max_keepalive_connections=connections
+            ),
+        )
+
+    async def search(self, query: str, max_results: int) -> list[SearchResult]:
+        response = await self._client.get(self.URL, params={"q": query, "count": max_results})
+        response.raise_for_status()
+        items = response.json().get("web", {}).get("results", [])
+        return [
+            SearchResult(i.get("title", ""), i.get("url", ""), i.get("description", ""))
+            for i in items
+        ]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class FixtureProvider(SearchProvider):
+    """Canned results by query; the ``"*"`` entry answers any other query."""
+
+    def __init__(self, results: dict[str, list[SearchResult]], latency: float = 0.0) -> None:
+        self.results = {query.strip().lower(): items for query, items in results.items()}
+        self.latency = latency
+
+    @classmethod
+    def from_file(cls, path: str) -> FixtureProvider:
+        """Load ``{"query": [{"title", "url", "snippet"}, ...], ...}`` from JSON."""
+        data = json.loads(Path(path).read_text())
+        return cls(
+            {query: [SearchResult(**item) for item in items] for query, items in data.items()}
+        )
+
+    async def search(self, query: str, max_results: int) -> list[SearchResult]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        items = self.results.get(query.strip().lower(), self.results.get("*", []))
+        return items[:max_results]
+
+
+def _clean(text: str) -> str:
+    return _SPACE.sub(" ", html.unescape(_TAG.sub("", text))).strip()
+
+
+def _shorten(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+def _canonical_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    if not host:
+        return ""
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.startswith("utm_")])
+    return f"{host}{parts.path.rstrip('/')}?{query}"
+
+
+def format_results(results: list[SearchResult], max_tokens: int) -> str:
+    """Compact text for the model: one block per distinct page, within ``max_tokens``."""
+    budget = max_tokens * CHARS_PER_TOKEN
+    seen: set[str] = set()
+    blocks: list[str] = []
+    used = 0
+    for result in results:
+        title = _clean(result.title)
+        keys = {key for key in (_canonical_url(result.url), title.lower()) if key}
+        if seen & keys:
+            continue
+        seen |= keys
+        block = f"{title}\n{_shorten(_clean(result.snippet), SNIPPET_CHARS)}\n{result.url}"
+        if used + len(block) > budget:
+            if not blocks:
+                blocks.append(_shorten(block, budget))
+            break
+        blocks.append(block)
+        used += len(block) + 2
+    return "\n\n".join(blocks) if blocks else "No results found for this query."
+
+
+def _create_provider() -> SearchProvider:
+    name = settings.SEARCH_PROVIDER
+    if name == "duckduckgo":
+        return DuckDuckGoProvider(settings.SEARCH_CONCURRENCY, settings.SEARCH_TIMEOUT_SECONDS)
+    if name == "brave":
+        return BraveSearchProvider(
+            settings.SEARCH_API_KEY, settings.SEARCH_CONCURRENCY, settings.SEARCH_TIMEOUT_SECONDS
+        )
+    if name == "fixture":
+        return FixtureProvider.from_file(settings.SEARCH_FIXTURE_PATH)
+    raise ValueError(f"Unknown SEARCH_PROVIDER: {name!r}")
+
+
+_provider: SearchProvider | None = None
+_slots = asyncio.Semaphore(settings.SEARCH_CONCURRENCY)
+
+
+def get_provider() -> SearchProvider:
+    global _provider
+    if _provider is None:
+        _provider = _create_provider()
+    return _provider
+
+
+async def _limited_search(query: str) -> list[SearchResult]:
+    async with _slots:
+        return await get_provider().search(query, settings.SEARCH_MAX_RESULTS)
+
+
+async def search(query: str) -> str:
+    """Results for ``query`` formatted for the model; raises ``SearchError``."""
+    query = query.strip()
+    if not query:
+        raise SearchError("The search query was empty.")
+    try:
+        # The timeout covers waiting for a slot, so a backlog fails fast too.
+        results = await asyncio.wait_for(_limited_search(query), settings.SEARCH_TIMEOUT_SECONDS)
+    except TimeoutError as exc:
+        logger.warning("Web search timed out: %r", query)
+        raise SearchError("The search timed out.") from exc
+    except Exception as exc:
+        logger.warning("Web search failed: %r", query, exc_info=True)
+        raise SearchError("The search service is unavailable.") from exc
+    return format_results(results, settings.SEARCH_RESULT_TOKENS)
+
+
+async def close() -> None:
+    global _provider
+    if _provider is not None:
+        provider, _provider = _provider, None
+        await provider.aclose()
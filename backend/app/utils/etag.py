@@ -0,0 +1,50 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.pagination import PageParams, paginate
+
+# Browsers must revalidate every time, but may answer from their cache on 304.
+CACHE_CONTROL = "private, no-cache"
+
+
+async def page_etag(
+    session: AsyncSession,
+    stmt: Select,
+    model: Any,
+    params: PageParams,
+    *,
+    newest_first: bool = True,
+) -> str:
+    """Weak ETag for one page of a keyset-paginated list.
+
+    ``stmt`` must apply the same filters as the list but select only the row
+    version columns — ``id``, ``created_at`` and ``updated_at`` where rows can
+    change — so the check reads at most ``limit + 1`` narrow rows, usually
+    straight from the index, before the full page is loaded.
+    """
+    page = await paginate(session, stmt, model, params, newest_first=newest_first, scalars=False)
+    raw = repr(([tuple(row) for row in page["items"]], page["next_cursor"], page["prev_cursor"]))
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,99 @@
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import Depends, Query
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.utils.exceptions import bad_request
+
+NEXT = "n"
+PREV = "p"
+
+
+@dataclass(frozen=True)
+class PageParams:
+    limit: int
+    cursor: str | None
+
+
+def page_params(
+    limit: Annotated[int, Query(ge=1, le=settings.MAX_PAGE_SIZE)] = settings.DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor)
+
+
+Pagination = Annotated[PageParams, Depends(page_params)]
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID, direction: str) -> str:
+    raw = json.dumps([created_at.isoformat(), str(row_id), direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in (NEXT, PREV):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id), direction
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise bad_request("Invalid pagination cursor") from exc
+
+
+async def paginate(
+    session: AsyncSession,
+    stmt: Select,
+    model: Any,
+    params: PageParams,
+    *,
+    newest_first: bool = True,
+    scalars: bool = True,
+) -> dict:
+    """Run ``stmt`` as one keyset page ordered by ``(created_at, id)``.
+
+    Items are ORM instances, or plain rows with ``scalars=False`` for column
+    selects; either way they must expose ``created_at`` and ``id``.
+
+    ``next_cursor`` continues in the listing order and ``prev_cursor`` walks back
+    towards the first page. Both are ``None`` when there is nothing further that way.
+    """
+    key = tuple_(model.created_at, model.id)
+    direction = NEXT
+    if params.cursor is not None:
+        created_at, row_id, direction = decode_cursor(params.cursor)
+
+    # Previous pages are read backwards from the cursor and flipped afterwards.
+    descending = (direction == NEXT) == newest_first
+    if params.cursor is not None:
+        position = tuple_(created_at, row_id)
+        stmt = stmt.where(key < position if descending else key > position)
+    if descending:
+        stmt = stmt.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        stmt = stmt.order_by(model.created_at.asc(), model.id.asc())
+
+    result = await session.execute(stmt.limit(params.limit + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
+    has_more = len(rows) > params.limit
+    rows = rows[: params.limit]
+    if direction == NEXT:
+        more_after, more_before = has_more, params.cursor is not None
+    else:
+        rows.reverse()
+        more_after, more_before = True, has_more
+
+    next_cursor = prev_cursor = None
+    if rows and more_after:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id, NEXT)
+    if rows and more_before:
+        prev_cursor = encode_cursor(rows[0].created_at, rows[0].id, PREV)
+    return {"items": rows, "next_cursor": next_cursor, "prev_cursor": prev_cursor}
@@ -0,0 +1,34 @@
+import uuid
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    # asyncpg hands back its own uuid.UUID subclass, which orjson does not accept
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-encoded response; datetimes, UUIDs and enums match pydantic's JSON output."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def columns_for(schema: type[BaseModel], model: Any) -> list:
+    """The model columns backing each field of ``schema``, in field order."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def page_response(page: dict) -> FastJSONResponse:
+    """Serialize a page of plain rows straight to JSON.
+
+    Returning a Response bypasses FastAPI's per-item response_model validation,
+    so only use this for rows selected with ``columns_for`` the response schema.
+    """
+    return FastJSONResponse({**page, "items": [row._asdict() for row in page["items"]]})
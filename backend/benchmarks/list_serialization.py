@@ -0,0 +1,106 @@
+"""Compare the ORM + pydantic list path with the plain-row + orjson fast path.
+
+Usage (from ``backend/``, against a migrated, disposable database)::
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.list_serialization
+
+A temporary case with ``BENCH_ROWS`` messages (default 10,000) is inserted,
+fetched as one page through both paths ``BENCH_REPEAT`` times, and deleted
+again. The page limit is set directly so a single response holds every row,
+bypassing the API's MAX_PAGE_SIZE cap. Both paths must produce identical JSON.
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL")
+if not BENCH_DATABASE_URL:
+    sys.exit("BENCH_DATABASE_URL is not set")
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+os.environ.setdefault("APP_ENV", "bench")
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import delete, select  # noqa: E402
+
+from app.database import AsyncSessionLocal, engine  # noqa: E402
+from app.models.case import Case  # noqa: E402
+from app.models.chat_message import ChatMessage  # noqa: E402
+from app.schemas.chat import ChatMessageRead  # noqa: E402
+from app.schemas.pagination import Page  # noqa: E402
+from app.utils.pagination import PageParams, paginate  # noqa: E402
+from app.utils.responses import columns_for, page_response  # noqa: E402
+
+ROWS = int(os.environ.get("BENCH_ROWS", "10000"))
+REPEAT = int(os.environ.get("BENCH_REPEAT", "10"))
+
+
+async def orm_path(case_id: uuid.UUID, params: PageParams) -> bytes:
+    # What FastAPI does for response_model=Page[ChatMessageRead]: hydrate ORM
+    # objects, validate each through the schema, dump to JSON-able dicts, json.dumps.
+    async with AsyncSessionLocal() as session:
+        stmt = select(ChatMessage).where(ChatMessage.case_id == case_id)
+        page = await paginate(session, stmt, ChatMessage, params)
+    adapter = TypeAdapter(Page[ChatMessageRead])
+    content = adapter.dump_python(adapter.validate_python(page), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def fast_path(case_id: uuid.UUID, params: PageParams) -> bytes:
+    async with AsyncSessionLocal() as session:
+        stmt = select(*columns_for(ChatMessageRead, ChatMessage)).where(
+            ChatMessage.case_id == case_id
+        )
+        page = await paginate(session, stmt, ChatMessage, params, scalars=False)
+    return page_response(page).body
+
+
+async def timed(fn, *args) -> tuple[float, bytes]:
+    samples = []
+    body = b""
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        body = await fn(*args)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), body
+
+
+async def main() -> None:
+    case_id = uuid.uuid4()
+    async with AsyncSessionLocal.begin() as session:
+        session.add(Case(id=case_id, title="serialization benchmark"))
+        await session.flush()
+        connection = await session.connection()
+        await connection.exec_driver_sql(
+            """
+            INSERT INTO chat_messages (id, case_id, role, content, created_at, updated_at)
+            SELECT gen_random_uuid(), $1, (ARRAY['user', 'assistant'])[1 + i % 2]::messagerole,
+                   repeat('The limitation period for breach of contract is six years. ', 8),
+                   now() - i * interval '1 second', now()
+            FROM generate_series(1, $2) AS i
+            """,
+            (case_id, ROWS),
+        )
+
+    params = PageParams(limit=ROWS, cursor=None)
+    try:
+        await fast_path(case_id, params)  # warm the pool and statement cache
+        slow_s, slow_body = await timed(orm_path, case_id, params)
+        fast_s, fast_body = await timed(fast_path, case_id, params)
+    finally:
+        async with AsyncSessionLocal.begin() as session:
+            await session.execute(delete(Case).where(Case.id == case_id))
+        await engine.dispose()
+
+    assert json.loads(slow_body) == json.loads(fast_body), "paths disagree"
+    print(f"rows={ROWS} repeat={REPEAT} bytes={len(fast_body)}")
+    print(f"orm + pydantic + json : {slow_s * 1000:8.1f} ms")
+    print(f"rows + orjson         : {fast_s * 1000:8.1f} ms")
+    print(f"speedup               : {slow_s / fast_s:8.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,331 @@
+"""End-to-end load test: realistic traffic against a real server, stubbed LLM.
+
+Usage (from ``backend/``, against a migrated, disposable database)::
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.load_test
+
+The database is truncated and seeded with ``tests.seeding`` at LOAD_SCALE.
+``benchmarks.stub_server`` is started with LOAD_WORKERS uvicorn workers.
+LOAD_USERS virtual users then log in at once, the login burst, and run
+scenarios for LOAD_DURATION seconds, drawn by weight from LOAD_MIX:
+
+- ``dashboard``: the case list and stats, polled with the last ETag
+- ``open_case``: a case with its chat and documents
+- ``chat``: a chat message and the (stubbed) AI reply
+- ``upload``: a small text document
+- ``analyze``: an analysis of a document the user uploaded
+- ``login``: logging in again
+
+Between scenarios each user pauses for a random think time averaging
+LOAD_THINK_MS.
+
+The report gives throughput and p50/p95/p99 latency per route. If the
+LOAD_BASELINE file exists, the run is compared against it. The exit status is
+1 when a route's p95 exceeds the baseline by more than LOAD_TOLERANCE (a
+factor) and LOAD_MIN_DELTA_MS, or when a route returns errors. Set
+LOAD_SAVE_BASELINE=1 to store the run as the new baseline. Baselines only
+compare runs on the same machine with the same settings.
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL")
+if not BENCH_DATABASE_URL:
+    sys.exit("BENCH_DATABASE_URL is not set")
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+os.environ.setdefault("APP_ENV", "bench")
+
+import httpx  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.services.auth_service import pwd_context  # noqa: E402
+from tests.seeding import ADMINS, LAWYERS, SeedVolumes, seed_database, vacuum_analyze  # noqa: E402
+
+SCALE = float(os.environ.get("LOAD_SCALE", "0.1"))
+USERS = int(os.environ.get("LOAD_USERS", "50"))
+DURATION = float(os.environ.get("LOAD_DURATION", "60"))
+WORKERS = int(os.environ.get("LOAD_WORKERS", "2"))
+PORT = int(os.environ.get("LOAD_PORT", "8091"))
+THINK = float(os.environ.get("LOAD_THINK_MS", "500")) / 1000
+MIX = {
+    name: float(weight)
+    for name, weight in (
+        item.split("=")
+        for item in os.environ.get(
+            "LOAD_MIX", "dashboard=40,open_case=30,chat=10,upload=8,analyze=4,login=8"
+        ).split(",")
+    )
+}
+BASELINE = Path(os.environ.get("LOAD_BASELINE", "benchmarks/load_baseline.json"))
+SAVE_BASELINE = os.environ.get("LOAD_SAVE_BASELINE") == "1"
+TOLERANCE = float(os.environ.get("LOAD_TOLERANCE", "1.25"))
+MIN_DELTA = float(os.environ.get("LOAD_MIN_DELTA_MS", "10"))
+
+PASSWORD = "password"
+DOCUMENT = ("This services agreement is made between the parties named below. " * 200).encode()
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(
+        self, client: httpx.AsyncClient, route: str, path: str | None = None, **kwargs
+    ) -> httpx.Response:
+        method, template = route.split(" ", 1)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path or template, **kwargs)
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            raise
+        self.samples[route].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, email: str) -> None:
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.headers: dict[str, str] = {}
+        self.cases: list[str] = []
+        self.documents: list[tuple[str, str]] = []
+        self.cases_etag: str | None = None
+
+    async def req(self, route: str, path: str | None = None, **kwargs) -> httpx.Response:
+        kwargs.setdefault("headers", self.headers)
+        return await self.recorder.request(self.client, route, path, **kwargs)
+
+    async def login(self) -> None:
+        response = await self.req(
+            "POST /auth/login", data={"username": self.email, "password": PASSWORD}, headers={}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def dashboard(self) -> None:
+        headers = dict(self.headers)
+        if self.cases_etag:
+            headers["If-None-Match"] = self.cases_etag
+        response = await self.req("GET /cases", headers=headers)
+        if response.status_code == 200:
+            self.cases_etag = response.headers.get("ETag")
+            self.cases = [case["id"] for case in response.json()["items"]] or self.cases
+        await self.req("GET /cases/stats")
+
+    def _case(self) -> str | None:
+        return random.choice(self.cases) if self.cases else None
+
+    async def open_case(self) -> None:
+        if (case := self._case()) is None:
+            return
+        await self.req("GET /cases/{case_id}", f"/cases/{case}")
+        await self.req("GET /cases/{case_id}/chat", f"/cases/{case}/chat")
+        await self.req("GET /cases/{case_id}/documents", f"/cases/{case}/documents")
+
+    async def chat(self) -> None:
+        if (case := self._case()) is None:
+            return
+        await self.req(
+            "POST /cases/{case_id}/chat",
+            f"/cases/{case}/chat",
+            json={"content": "What is the limitation period for this claim?"},
+        )
+
+    async def upload(self) -> None:
+        if (case := self._case()) is None:
+            return
+        response = await self.req(
+            "POST /cases/{case_id}/documents/upload",
+            f"/cases/{case}/documents/upload",
+            files={"file": ("agreement.txt", DOCUMENT, "text/plain")},
+        )
+        if response.status_code == 201:
+            self.documents.append((case, response.json()["id"]))
+
+    async def analyze(self) -> None:
+        if not self.documents:
+            await self.upload()
+        if not self.documents:
+            return
+        case, doc = random.choice(self.documents)
+        await self.req(
+            "POST /cases/{case_id}/documents/{doc_id}/analyze",
+            f"/cases/{case}/documents/{doc}/analyze",
+        )
+
+    async def run(self, start: asyncio.Event, deadline: float) -> None:
+        await start.wait()
+        await self.login()
+        await self.dashboard()
+        names, weights = list(MIX), list(MIX.values())
+        while time.monotonic() < deadline:
+            await asyncio.sleep(random.expovariate(1 / THINK) if THINK else 0)
+            scenario = getattr(self, random.choices(names, weights)[0])
+            try:
+                await scenario()
+            except httpx.HTTPError:
+                continue
+
+
+async def _prepare_database() -> None:
+    volumes = SeedVolumes().scaled(SCALE)
+    engine = create_async_engine(BENCH_DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "TRUNCATE users, cases, documents, chat_messages, llm_calls, llm_usage_daily"
+                " CASCADE"
+            )
+            await seed_database(conn, volumes, pwd_context.hash(PASSWORD))
+        await vacuum_analyze(engine)
+    finally:
+        await engine.dispose()
+
+
+def _emails() -> list[str]:
+    # Lawyers and clients in about the proportion they have cases.
+    users = SeedVolumes().scaled(SCALE).users
+    lawyers = [f"user{n}@example.com" for n in range(ADMINS + 1, ADMINS + LAWYERS + 1)]
+    clients = [f"user{n}@example.com" for n in range(ADMINS + LAWYERS + 1, users + 1)]
+    return [random.choice(lawyers if i % 2 == 0 else clients) for i in range(USERS)]
+
+
+async def _wait_ready(base_url: str, server: subprocess.Popen) -> None:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(120):
+            if server.poll() is not None:
+                sys.exit("server exited during startup")
+            try:
+                if (await client.get("/health/ready")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    sys.exit("server did not become ready")
+
+
+def _percentile(samples: list[float], q: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def _report(recorder: Recorder, elapsed: float) -> dict[str, dict[str, float]]:
+    report = {}
+    for route in sorted(recorder.samples.keys() | recorder.errors.keys()):
+        samples = recorder.samples[route]
+        report[route] = {
+            "count": len(samples),
+            "errors": recorder.errors[route],
+            "rps": len(samples) / elapsed,
+            "p50_ms": _percentile(samples, 50) * 1000,
+            "p95_ms": _percentile(samples, 95) * 1000,
+            "p99_ms": _percentile(samples, 99) * 1000,
+        }
+    return report
+
+
+def _print_report(report: dict[str, dict[str, float]]) -> None:
+    width = max(len(route) for route in report)
+    print(f"{'route':<{width}} {'count':>7} {'errors':>6} {'rps':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, row in report.items():
+        print(f"{route:<{width}} {row['count']:>7} {row['errors']:>6} {row['rps']:>7.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+
+
+def _regressions(report: dict[str, dict[str, float]], baseline: dict) -> list[str]:
+    found = []
+    for route, row in report.items():
+        if row["errors"]:
+            found.append(f"{route}: {row['errors']} errors")
+        before = baseline["routes"].get(route)
+        if before is None:
+            continue
+        limit = max(before["p95_ms"] * TOLERANCE, before["p95_ms"] + MIN_DELTA)
+        if row["p95_ms"] > limit:
+            found.append(
+                f"{route}: p95 {row['p95_ms']:.1f} ms > {limit:.1f} ms "
+                f"(baseline {before['p95_ms']:.1f} ms)"
+            )
+    return found
+
+
+async def main() -> None:
+    await _prepare_database()
+    base_url = f"http://127.0.0.1:{PORT}"
+    with tempfile.TemporaryDirectory() as upload_dir:
+        env = {
+            **os.environ,
+            "UPLOAD_DIR": upload_dir,
+            "WARMUP_LLM_CONNECTION": "false",
+            "UPLOAD_GC_INTERVAL_SECONDS": "0",
+            # Every virtual user logs in from this one address.
+            "RATE_LIMIT_LOGIN_PER_MINUTE": "0",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmarks.stub_server:app",
+             "--port", str(PORT), "--workers", str(WORKERS), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            await _wait_ready(base_url, server)
+            recorder = Recorder()
+            start = asyncio.Event()
+            limits = httpx.Limits(max_connections=USERS, max_keepalive_connections=USERS)
+            async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+                deadline = time.monotonic() + DURATION
+                users = [VirtualUser(client, recorder, email) for email in _emails()]
+                tasks = [asyncio.create_task(user.run(start, deadline)) for user in users]
+                started = time.monotonic()
+                start.set()
+                await asyncio.gather(*tasks)
+                elapsed = time.monotonic() - started
+        finally:
+            server.terminate()
+            server.wait()
+
+    report = _report(recorder, elapsed)
+    print(f"users={USERS} duration={DURATION:.0f}s workers={WORKERS} scale={SCALE} "
+          f"total_rps={sum(row['count'] for row in report.values()) / elapsed:.1f}")
+    _print_report(report)
+
+    run = {
+        "settings": {"users": USERS, "duration": DURATION, "workers": WORKERS, "scale": SCALE,
+                     "mix": MIX},
+        "routes": report,
+    }
+    if SAVE_BASELINE:
+        BASELINE.write_text(json.dumps(run, indent=2) + "\n")
+        print(f"baseline written to {BASELINE}")
+        return
+    if not BASELINE.exists():
+        print(f"no baseline at {BASELINE}; set LOAD_SAVE_BASELINE=1 to record one")
+        return
+    baseline = json.loads(BASELINE.read_text())
+    if baseline["settings"] != run["settings"]:
+        print(f"warning: baseline settings differ: {baseline['settings']}")
+    regressions = _regressions(report, baseline)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
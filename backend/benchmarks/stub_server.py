@@ -0,0 +1,74 @@
+"""The API with Claude and web search replaced by stubs of fixed latency.
+
+Served by ``benchmarks.load_test`` as ``benchmarks.stub_server:app``. Every
+uvicorn worker imports this module, so the stubs apply in each. Only the
+Anthropic client and the search provider are replaced: the tool loop, the
+thread pool, search limits and result trimming run as in production.
+
+LOAD_LLM_LATENCY_MS (default 800) is slept per model call and
+LOAD_SEARCH_LATENCY_MS (default 300) per search; LOAD_SEARCH_RATE (default
+0.3) is the share of chat turns that search before answering.
+"""
+import json
+import os
+import random
+import time
+from types import SimpleNamespace
+
+from app.main import app  # noqa: F401
+from app.services import claude_service, web_search
+from app.services.web_search import FixtureProvider, SearchResult
+
+LLM_LATENCY = float(os.environ.get("LOAD_LLM_LATENCY_MS", "800")) / 1000
+SEARCH_LATENCY = float(os.environ.get("LOAD_SEARCH_LATENCY_MS", "300")) / 1000
+SEARCH_RATE = float(os.environ.get("LOAD_SEARCH_RATE", "0.3"))
+
+ANSWER = "Under the Limitation Act 1980 the period for a simple contract claim is six years. " * 4
+ANALYSIS = json.dumps(
+    {
+        "summary": "A services agreement between two companies. " * 6,
+        "key_points": ["Term of 24 months", "Governed by English law", "Liability capped"],
+    }
+)
+
+
+USAGE = SimpleNamespace(input_tokens=1500, output_tokens=300)
+
+
+def _text(text: str) -> SimpleNamespace:
+    block = SimpleNamespace(type="text", text=text)
+    return SimpleNamespace(stop_reason="end_turn", content=[block], usage=USAGE)
+
+
+class _StubMessages:
+    def create(
+        self, *, messages: list[dict], tools: list | None = None, **kwargs
+    ) -> SimpleNamespace:
+        time.sleep(LLM_LATENCY)
+        if tools is None:
+            return _text(ANALYSIS)
+        # Only a fresh user turn searches, so the loop always ends.
+        if isinstance(messages[-1]["content"], str) and random.random() < SEARCH_RATE:
+            block = SimpleNamespace(
+                type="tool_use", id="toolu_stub", name="web_search", input={"query": "limitation"}
+            )
+            return SimpleNamespace(stop_reason="tool_use", content=[block], usage=USAGE)
+        return _text(ANSWER)
+
+
+SEARCH_RESULTS = [
+    SearchResult(
+        "Limitation Act 1980",
+        "https://www.legislation.gov.uk/ukpga/1980/58",
+        "Time limits for actions in contract and tort. " * 5,
+    ),
+    SearchResult(
+        "Limitation Act 1980 - section 5",
+        "https://www.legislation.gov.uk/ukpga/1980/58/section/5",
+        "An action founded on simple contract shall not be brought after six years.",
+    ),
+]
+
+
+claude_service._client = SimpleNamespace(messages=_StubMessages())
+web_search._provider = FixtureProvider({"*": SEARCH_RESULTS}, latency=SEARCH_LATENCY)
@@ -0,0 +1,45 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+# Database-backed suites run against a throwaway Postgres named by
+# TEST_DATABASE_URL. The schema is dropped and recreated, so never point it
+# at a database you care about. Settings are read at import time, hence the
+# environment is prepared before anything from ``app`` is imported.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("APP_ENV", "test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _reset_schema() -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from alembic import command
+    from alembic.config import Config
+
+    async def drop_schema() -> None:
+        engine = create_async_engine(TEST_DATABASE_URL)
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("DROP SCHEMA public CASCADE")
+            await conn.exec_driver_sql("CREATE SCHEMA public")
+        await engine.dispose()
+
+    asyncio.run(drop_schema())
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture(scope="session")
+def migrated_db() -> str:
+    """Empty database at the latest migration."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    _reset_schema()
+    return TEST_DATABASE_URL
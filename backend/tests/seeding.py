@@ -0,0 +1,137 @@
+"""Bulk seed data shaped like a busy production tenant.
+
+Rows are generated inside Postgres with ``generate_series`` so that hundreds of
+thousands of rows load in seconds. Ids are deterministic, which lets callers
+pick a known admin, lawyer, client or case without querying for them.
+"""
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+ADMINS = 5
+LAWYERS = 200
+USAGE_DAYS = 180
+
+
+@dataclass(frozen=True)
+class SeedVolumes:
+    users: int = 2_000
+    cases: int = 20_000
+    documents: int = 50_000
+    messages: int = 200_000
+    # The first case gets this many extra messages to model a very long history.
+    hot_case_messages: int = 20_000
+    # Daily LLM usage rollups, spread over USAGE_DAYS.
+    usage_rollups: int = 100_000
+
+    def scaled(self, factor: float) -> "SeedVolumes":
+        return SeedVolumes(
+            users=max(int(self.users * factor), ADMINS + LAWYERS + 1),
+            cases=max(int(self.cases * factor), 1),
+            documents=int(self.documents * factor),
+            messages=int(self.messages * factor),
+            hot_case_messages=int(self.hot_case_messages * factor),
+            usage_rollups=int(self.usage_rollups * factor),
+        )
+
+
+def user_id(n: int) -> uuid.UUID:
+    return uuid.UUID(f"00000000-0000-0000-0000-{n:012x}")
+
+
+def case_id(n: int) -> uuid.UUID:
+    return uuid.UUID(f"00000001-0000-0000-0000-{n:012x}")
+
+
+ADMIN_ID = user_id(1)
+LAWYER_ID = user_id(ADMINS + 1)
+CLIENT_ID = user_id(ADMINS + LAWYERS + 1)
+HOT_CASE_ID = case_id(1)
+
+
+def _uuid_sql(prefix: str, expr: str) -> str:
+    return f"('{prefix}-0000-0000-0000-' || lpad(to_hex({expr}), 12, '0'))::uuid"
+
+
+async def seed_database(
+    conn: AsyncConnection, volumes: SeedVolumes, hashed_password: str
+) -> None:
+    """Insert ``volumes`` worth of rows; every user gets ``hashed_password``."""
+    clients = volumes.users - ADMINS - LAWYERS
+    lawyer_for_case = _uuid_sql("00000000", f"{ADMINS + 1} + ((m - 1) % {LAWYERS})")
+    client_for_case = _uuid_sql("00000000", f"{ADMINS + LAWYERS + 1} + ((m - 1) % {clients})")
+    await conn.exec_driver_sql(
+        f"""
+        INSERT INTO users (id, email, full_name, hashed_password, role, is_active,
+                           created_at, updated_at)
+        SELECT {_uuid_sql("00000000", "n")}, 'user' || n || '@example.com', 'User ' || n,
+               $1,
+               CASE WHEN n <= {ADMINS} THEN 'admin'
+                    WHEN n <= {ADMINS + LAWYERS} THEN 'lawyer'
+                    ELSE 'client' END::userrole,
+               true, now() - n * interval '1 minute', now()
+        FROM generate_series(1, {volumes.users}) AS n
+        """,
+        (hashed_password,),
+    )
+    await conn.exec_driver_sql(
+        f"""
+        INSERT INTO cases (id, title, description, status, lawyer_id, client_id,
+                           created_at, updated_at)
+        SELECT {_uuid_sql("00000001", "m")}, 'Case ' || m, 'Seeded case ' || m,
+               (ARRAY['open', 'in_progress', 'closed'])[1 + m % 3]::casestatus,
+               {lawyer_for_case}, {client_for_case},
+               now() - m * interval '1 minute', now()
+        FROM generate_series(1, {volumes.cases}) AS m
+        """
+    )
+    await conn.exec_driver_sql(
+        f"""
+        INSERT INTO documents (id, case_id, filename, original_filename, mime_type,
+                               file_size, file_path, status, ai_summary, created_at,
+                               updated_at)
+        SELECT gen_random_uuid(), {_uuid_sql("00000001", f"1 + d % {volumes.cases}")},
+               d || '.pdf', 'document-' || d || '.pdf', 'application/pdf', 1024,
+               '/nonexistent/' || d || '.pdf',
+               (ARRAY['uploaded', 'analyzed', 'failed'])[1 + d % 3]::documentstatus,
+               'Summary ' || d, now() - d * interval '1 second', now()
+        FROM generate_series(1, {volumes.documents}) AS d
+        """
+    )
+    await conn.exec_driver_sql(
+        f"""
+        INSERT INTO chat_messages (id, case_id, user_id, role, content, created_at,
+                                   updated_at)
+        SELECT gen_random_uuid(),
+               CASE WHEN i <= {volumes.hot_case_messages} THEN {_uuid_sql("00000001", "1")}
+                    ELSE {_uuid_sql("00000001", f"1 + i % {volumes.cases}")} END,
+               NULL,
+               (ARRAY['user', 'assistant'])[1 + i % 2]::messagerole,
+               repeat('lorem ipsum ', 20), now() - i * interval '1 second', now()
+        FROM generate_series(1, {volumes.messages + volumes.hot_case_messages}) AS i
+        """
+    )
+    await conn.exec_driver_sql(
+        f"""
+        INSERT INTO llm_usage_daily (day, case_id, user_id, purpose, model, calls,
+                                     input_tokens, output_tokens,
+                                     cache_creation_input_tokens, cache_read_input_tokens,
+                                     latency_ms)
+        SELECT current_date - r % {USAGE_DAYS},
+               {_uuid_sql("00000001", f"1 + r % {volumes.cases}")},
+               {_uuid_sql("00000000", f"{ADMINS + 1} + r % {LAWYERS}")},
+               (ARRAY['chat', 'analysis'])[1 + r % 2], 'claude-opus-4-6', 1 + r % 7,
+               2000 * (1 + r % 7), 400 * (1 + r % 7), 0, 0, 3000 * (1 + r % 7)
+        FROM generate_series(1, {volumes.usage_rollups}) AS r
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+async def vacuum_analyze(engine: AsyncEngine) -> None:
+    """Refresh planner statistics and the visibility map, as autovacuum would."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("users", "cases", "documents", "chat_messages", "llm_usage_daily"):
+            await conn.exec_driver_sql(f"VACUUM ANALYZE {table}")
@@ -0,0 +1,17 @@
+"""Export formatting, on rows built in memory."""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.models.chat_message import MessageRole
+from app.services.chat_export import _markdown
+
+
+def test_markdown_times_are_converted_to_utc():
+    paris = timezone(timedelta(hours=2))
+    row = SimpleNamespace(
+        role=MessageRole.user,
+        full_name="Ada",
+        content="Is this binding?",
+        created_at=datetime(2026, 6, 1, 0, 30, tzinfo=paris),
+    )
+    assert _markdown([row]).startswith("**Ada** · 2026-05-31 22:30 UTC\n\nIs this binding?")
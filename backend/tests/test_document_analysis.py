@@ -0,0 +1,98 @@
+"""Single-flight document analysis on one worker, with the claim queries stubbed."""
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import document_analysis
+from app.services.document_analysis import analyze_once
+
+CASE_ID = uuid.uuid4()
+
+
+class Claims:
+    """Claim attempts; each one wins unless another worker holds the document."""
+
+    def __init__(self) -> None:
+        self.attempts: list[uuid.UUID] = []
+        self.held = False
+
+    async def __call__(self, case_id, doc_id):
+        self.attempts.append(doc_id)
+        return None if self.held else SimpleNamespace(id=doc_id, status="analyzing")
+
+
+@pytest.fixture
+def claims(monkeypatch):
+    claims = Claims()
+    monkeypatch.setattr(document_analysis, "_claim", claims)
+    return claims
+
+
+async def test_concurrent_requests_share_one_analysis(claims):
+    doc_id = uuid.uuid4()
+    runs = 0
+
+    async def analyze(doc):
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(id=doc.id, status="analyzed")
+
+    results = await asyncio.gather(*(analyze_once(CASE_ID, doc_id, analyze) for _ in range(8)))
+
+    assert runs == 1
+    assert claims.attempts == [doc_id]
+    assert len({id(doc) for doc in results}) == 1
+    assert results[0].status == "analyzed"
+    assert doc_id not in document_analysis._running
+
+
+async def test_followers_get_the_leaders_failure_and_can_retry(claims):
+    doc_id = uuid.uuid4()
+
+    async def broken(doc):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("model down")
+
+    results = await asyncio.gather(
+        *(analyze_once(CASE_ID, doc_id, broken) for _ in range(4)), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert doc_id not in document_analysis._running
+
+    async def analyze(doc):
+        return SimpleNamespace(id=doc.id, status="analyzed")
+
+    assert (await analyze_once(CASE_ID, doc_id, analyze)).status == "analyzed"
+    assert claims.attempts == [doc_id, doc_id]
+
+
+async def test_analysis_running_elsewhere_is_awaited_not_repeated(claims, monkeypatch):
+    doc_id = uuid.uuid4()
+    claims.held = True
+    outcomes = [None, SimpleNamespace(id=doc_id, status="analyzed")]
+
+    async def outcome(case_id, doc_id):
+        return outcomes.pop(0)
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    @asynccontextmanager
+    async def subscribe(case_id):
+        yield SimpleNamespace(queue=queue)
+
+    monkeypatch.setattr(document_analysis, "_outcome", outcome)
+    monkeypatch.setattr(document_analysis.case_events, "subscribe", subscribe)
+
+    async def analyze(doc):
+        raise AssertionError("another worker is running this analysis")
+
+    task = asyncio.create_task(analyze_once(CASE_ID, doc_id, analyze))
+    await asyncio.sleep(0.01)
+    # The other worker's document.updated event.
+    queue.put_nowait({"type": "document.updated"})
+    assert (await task).status == "analyzed"
+    assert claims.attempts == [doc_id]
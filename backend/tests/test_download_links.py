@@ -0,0 +1,46 @@
+"""Signed download links: scoped to one path, short-lived, never access tokens."""
+import uuid
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from app.services import auth_service
+from app.services.auth_service import (
+    create_access_token,
+    create_download_token,
+    decode_access_token,
+    decode_download_token,
+    download_link,
+)
+
+USER = str(uuid.uuid4())
+BUNDLE = f"/cases/{uuid.uuid4()}/bundle"
+
+
+def test_link_carries_its_query_and_a_token_for_its_path():
+    link = download_link(USER, BUNDLE, format="csv")
+    url = urlsplit(link.url)
+    query = parse_qs(url.query)
+    assert url.path == BUNDLE
+    assert query["format"] == ["csv"]
+    assert decode_download_token(query["token"][0], BUNDLE) == USER
+
+
+def test_token_is_refused_for_another_path():
+    token = create_download_token(USER, BUNDLE)
+    with pytest.raises(ValueError):
+        decode_download_token(token, f"/cases/{uuid.uuid4()}/bundle")
+
+
+def test_expired_token_is_refused(monkeypatch):
+    monkeypatch.setattr(auth_service.settings, "DOWNLOAD_LINK_EXPIRE_SECONDS", -1)
+    token = create_download_token(USER, BUNDLE)
+    with pytest.raises(ValueError):
+        decode_download_token(token, BUNDLE)
+
+
+def test_download_and_access_tokens_are_not_interchangeable():
+    with pytest.raises(ValueError):
+        decode_access_token(create_download_token(USER, BUNDLE))
+    with pytest.raises(ValueError):
+        decode_download_token(create_access_token(USER), BUNDLE)
@@ -0,0 +1,54 @@
+"""Shutdown drain: LLM calls outlive the requests uvicorn cuts off."""
+import asyncio
+
+import pytest
+
+from app.services import drain as drain_module
+from app.services.drain import Drain
+
+
+@pytest.fixture
+def shutdown_settings(monkeypatch):
+    monkeypatch.setattr(drain_module.settings, "SHUTDOWN_NOTICE_SECONDS", 0.0)
+    monkeypatch.setattr(drain_module.settings, "SHUTDOWN_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(drain_module.settings, "SHUTDOWN_LLM_GRACE_SECONDS", 0.5)
+
+
+async def _cut_off_request(drain: Drain, call) -> asyncio.Task:
+    # The request handler awaiting the call, cancelled at uvicorn's deadline.
+    request = asyncio.create_task(drain.run(call))
+    await asyncio.sleep(0)
+    drain.start()
+    await asyncio.sleep(0.1)
+    request.cancel()
+    return request
+
+
+async def test_call_finishes_after_uvicorn_deadline(shutdown_settings):
+    drain = Drain()
+    stored = []
+
+    async def slow_call():
+        await asyncio.sleep(0.3)
+        stored.append("answer")
+
+    request = await _cut_off_request(drain, slow_call())
+    await drain.wait()
+
+    assert request.cancelled()
+    assert stored == ["answer"]
+    assert drain.in_flight == 0
+
+
+async def test_wait_gives_up_after_grace_period(shutdown_settings):
+    drain = Drain()
+    call = asyncio.Event()
+
+    await _cut_off_request(drain, call.wait())
+    started = asyncio.get_running_loop().time()
+    await drain.wait()
+
+    assert drain.in_flight == 1
+    # Deadline: 0.1 s of uvicorn's timeout plus 0.5 s of grace, 0.1 s spent already.
+    assert 0.4 <= asyncio.get_running_loop().time() - started < 0.6
+    call.set()
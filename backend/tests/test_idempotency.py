@@ -0,0 +1,141 @@
+"""Same-worker Idempotency-Key handling, with the key table replaced by a stub session."""
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.services import idempotency, rate_limit
+from app.services.idempotency import REPLAYED_HEADER, idempotent
+from app.services.rate_limit import Limit, RateLimiter, enforce_rate_limit
+
+
+class _Result:
+    def first(self):
+        # Every claim succeeds: the first request of a key always leads.
+        return ("key",)
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    """Kinds of the statements sent to the key table, in order."""
+    sent: list[str] = []
+
+    class Session:
+        async def execute(self, stmt):
+            sent.append(
+                "insert" if stmt.is_insert else "update" if stmt.is_update else "delete"
+            )
+            return _Result()
+
+    @asynccontextmanager
+    async def session_scope():
+        yield Session()
+
+    monkeypatch.setattr(idempotency, "session_scope", session_scope)
+    return sent
+
+
+class Work:
+    """Request body that blocks until released, counting its runs."""
+
+    def __init__(self, result=None, error: Exception | None = None) -> None:
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.finish = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.finish.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def _lead(user_id: uuid.UUID, work: Work, response: Response) -> asyncio.Task:
+    task = asyncio.create_task(idempotent(user_id, "key-1", "fp", work, response))
+    await work.started.wait()
+    return task
+
+
+async def test_duplicates_get_the_leaders_result(statements):
+    work = Work(result={"answer": 42})
+    user_id = uuid.uuid4()
+    first, second = Response(), Response()
+    leader = await _lead(user_id, work, first)
+    waiter = asyncio.create_task(idempotent(user_id, "key-1", "fp", work, second))
+    await asyncio.sleep(0)
+    work.finish.set()
+
+    assert await leader == await waiter == {"answer": 42}
+    assert work.calls == 1
+    assert REPLAYED_HEADER not in first.headers
+    assert second.headers[REPLAYED_HEADER] == "true"
+    assert statements == ["insert", "update"]
+    assert (user_id, "key-1") not in idempotency._inflight
+
+
+async def test_failure_releases_the_key(statements):
+    work = Work(error=ValueError("model down"))
+    user_id = uuid.uuid4()
+    leader = await _lead(user_id, work, Response())
+    waiter = asyncio.create_task(idempotent(user_id, "key-1", "fp", work, Response()))
+    await asyncio.sleep(0)
+    work.finish.set()
+
+    for task in (leader, waiter):
+        with pytest.raises(ValueError, match="model down"):
+            await task
+    assert statements == ["insert", "delete"]
+    assert (user_id, "key-1") not in idempotency._inflight
+
+
+async def test_reusing_a_key_for_another_request_is_refused(statements):
+    work = Work(result={"answer": 42})
+    user_id = uuid.uuid4()
+    leader = await _lead(user_id, work, Response())
+    with pytest.raises(HTTPException) as refused:
+        await idempotent(user_id, "key-1", "other-fp", work, Response())
+    assert refused.value.status_code == 422
+
+    work.finish.set()
+    assert await leader == {"answer": 42}
+    assert work.calls == 1
+
+
+async def test_without_a_key_work_just_runs(statements):
+    work = Work(result=1)
+    work.finish.set()
+    assert await idempotent(uuid.uuid4(), None, "fp", work, Response()) == 1
+    assert statements == []
+
+
+async def test_duplicates_are_not_rate_limited(statements, monkeypatch):
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter(None, max_keys=10))
+    once = Limit("once", 1, 3600)
+    user_id = uuid.uuid4()
+    work = Work(result={"answer": 42})
+
+    async def limited():
+        await enforce_rate_limit(Response(), user_id, once)
+        return await work()
+
+    leader = asyncio.create_task(idempotent(user_id, "key-1", "fp", limited, Response()))
+    await work.started.wait()
+    waiters = [
+        asyncio.create_task(idempotent(user_id, "key-1", "fp", limited, Response()))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    work.finish.set()
+
+    assert await asyncio.gather(leader, *waiters) == [{"answer": 42}] * 4
+    # The one token went to the leader; new work with another key is refused.
+    with pytest.raises(HTTPException) as refused:
+        await idempotent(user_id, "key-2", "fp", limited, Response())
+    assert refused.value.status_code == 429
+    assert statements == ["insert", "update", "insert", "delete"]
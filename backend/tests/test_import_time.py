@@ -0,0 +1,68 @@
+"""Import-time budget for ``app.main``, measured with ``python -X importtime``.
+
+A worker cannot take traffic until the app is imported, so this bounds cold
+start. Modules that are slow to import must stay lazy; the startup warm-up
+loads them off the request path instead.
+
+Wall-clock time depends on the machine and its load, so by default the app is
+measured against the frameworks it cannot avoid (FastAPI and SQLAlchemy),
+timed in the same run. Set IMPORT_TIME_BUDGET_MS to also enforce an absolute
+budget on a known machine.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.services.warmup import LAZY_MODULES
+from tests.conftest import BACKEND_DIR
+
+BUDGET_MS = os.environ.get("IMPORT_TIME_BUDGET_MS")
+# app.main imports in about 1.8x the time of FastAPI plus SQLAlchemy alone.
+MAX_FRAMEWORK_RATIO = float(os.environ.get("IMPORT_TIME_MAX_FRAMEWORK_RATIO", "3"))
+FRAMEWORKS = ("fastapi", "sqlalchemy")
+
+
+def _import_app(*flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+@pytest.fixture(scope="module")
+def cumulative_us() -> dict[str, int]:
+    _import_app()  # compile bytecode first so it is not counted
+    profile = {}
+    for line in _import_app("-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def test_app_import_in_proportion_to_frameworks(cumulative_us):
+    frameworks_us = sum(cumulative_us[name] for name in FRAMEWORKS)
+    ratio = cumulative_us["app.main"] / frameworks_us
+    assert ratio <= MAX_FRAMEWORK_RATIO, (
+        f"importing app.main took {ratio:.1f}x as long as {' + '.join(FRAMEWORKS)}"
+        f" (limit {MAX_FRAMEWORK_RATIO}x)"
+    )
+
+
+@pytest.mark.skipif(BUDGET_MS is None, reason="IMPORT_TIME_BUDGET_MS is not set")
+def test_app_import_within_budget(cumulative_us):
+    budget_ms = float(BUDGET_MS)
+    elapsed_ms = cumulative_us["app.main"] / 1000
+    assert elapsed_ms <= budget_ms, f"importing app.main took {elapsed_ms:.0f}ms > {budget_ms}ms"
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_heavy_modules_stay_lazy(cumulative_us, module):
+    assert module not in cumulative_us, f"{module} is imported with the app"
@@ -0,0 +1,125 @@
+"""Keyset cursors and page boundaries, with the database replaced by in-memory rows."""
+import uuid
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.sql.operators import desc_op
+
+from app.models.case import Case
+from app.utils.pagination import NEXT, PREV, PageParams, decode_cursor, encode_cursor, paginate
+
+START = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+class Rows:
+    """Answers a paginated select the way Postgres would, from a list of rows."""
+
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    async def execute(self, stmt):
+        rows = sorted(self.rows, key=lambda r: (r.created_at, r.id))
+        if stmt._order_by_clauses[0].modifier is desc_op:
+            rows.reverse()
+        if stmt.whereclause is not None:
+            compare = stmt.whereclause.operator
+            created_at, row_id = (c.value for c in stmt.whereclause.right.clauses)
+            rows = [r for r in rows if compare((r.created_at, r.id), (created_at, row_id))]
+        found = rows[: stmt._limit]
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: found))
+
+
+def _rows(n: int) -> list:
+    # Two rows per timestamp, so the id has to break ties.
+    ids = sorted(uuid.uuid4() for _ in range(n))
+    return [
+        SimpleNamespace(name=i, created_at=START + timedelta(minutes=i // 2), id=row_id)
+        for i, row_id in enumerate(ids)
+    ]
+
+
+async def _page(db: Rows, cursor: str | None, newest_first: bool = True) -> dict:
+    params = PageParams(limit=2, cursor=cursor)
+    return await paginate(db, select(Case), Case, params, newest_first=newest_first)
+
+
+def _names(page: dict) -> list[int]:
+    return [row.name for row in page["items"]]
+
+
+def test_cursor_round_trips_without_padding():
+    row_id = uuid.uuid4()
+    created_at = datetime(2026, 3, 2, 9, 30, 15, 123456, tzinfo=UTC)
+    cursor = encode_cursor(created_at, row_id, PREV)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, row_id, PREV)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        encode_cursor(START, uuid.uuid4(), "sideways"),
+        "WyIyMDI2LTAxLTAxIiwibm90LWEtdXVpZCIsIm4iXQ",  # ["2026-01-01","not-a-uuid","n"]
+        "eyJhIjogMX0",  # {"a": 1}
+    ],
+)
+def test_malformed_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as refused:
+        decode_cursor(cursor)
+    assert refused.value.status_code == 400
+
+
+async def test_next_pages_walk_newest_first_to_the_end():
+    db = Rows(_rows(5))
+    first = await _page(db, None)
+    assert _names(first) == [4, 3]
+    assert first["prev_cursor"] is None
+
+    second = await _page(db, first["next_cursor"])
+    assert _names(second) == [2, 1]
+    assert second["prev_cursor"] is not None
+
+    last = await _page(db, second["next_cursor"])
+    assert _names(last) == [0]
+    assert last["next_cursor"] is None
+
+
+async def test_prev_pages_walk_back_to_the_first_page():
+    db = Rows(_rows(5))
+    first = await _page(db, None)
+    last = await _page(db, (await _page(db, first["next_cursor"]))["next_cursor"])
+
+    back = await _page(db, last["prev_cursor"])
+    assert _names(back) == [2, 1]
+    assert back["next_cursor"] is not None
+    assert back["prev_cursor"] is not None
+
+    start = await _page(db, back["prev_cursor"])
+    assert _names(start) == [4, 3]
+    assert start["prev_cursor"] is None
+    assert decode_cursor(start["next_cursor"])[2] == NEXT
+
+
+async def test_oldest_first_listing_and_exact_page_boundary():
+    db = Rows(_rows(4))
+    first = await _page(db, None, newest_first=False)
+    assert _names(first) == [0, 1]
+
+    last = await _page(db, first["next_cursor"], newest_first=False)
+    assert _names(last) == [2, 3]
+    # A full final page does not promise more rows.
+    assert last["next_cursor"] is None
+
+    back = await _page(db, last["prev_cursor"], newest_first=False)
+    assert _names(back) == [0, 1]
+    assert back["prev_cursor"] is None
+
+
+async def test_empty_listing_has_no_cursors():
+    page = await _page(Rows([]), None)
+    assert page == {"items": [], "next_cursor": None, "prev_cursor": None}
+
@@ -0,0 +1,208 @@
+"""Query-plan regression suite for the routers' hot paths.
+
+Each scenario drives a real endpoint through the ASGI app against a seeded
+Postgres, records every statement SQLAlchemy sends, and runs ``EXPLAIN`` on it.
+A scenario fails if any plan sequentially scans one of the large tables, if
+its estimated cost exceeds the budget, or if the ``Server-Timing`` header
+reports more queries than the request query budget (a likely N+1).
+"""
+import asyncio
+import json
+import os
+import re
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from tests.seeding import (
+    ADMIN_ID,
+    CLIENT_ID,
+    HOT_CASE_ID,
+    LAWYER_ID,
+    SeedVolumes,
+    seed_database,
+    user_id,
+    vacuum_analyze,
+)
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL is not set"
+)
+
+SCALE = float(os.environ.get("QUERY_PLAN_SCALE", "1"))
+COST_BUDGET = float(os.environ.get("QUERY_PLAN_COST_BUDGET", "1000"))
+# Aggregates visit every case in the caller's scope, so they get a larger allowance.
+AGGREGATE_COST_BUDGET = COST_BUDGET * 5
+AGGREGATE_SCENARIOS = {
+    "case_stats_lawyer",
+    "case_stats_client",
+    "usage_by_case",
+    "usage_by_user",
+}
+# Repeated with the ETag of a first response; they must answer 304.
+NOT_MODIFIED_SCENARIOS = {"list_cases_not_modified", "list_messages_not_modified"}
+LARGE_TABLES = {"users", "cases", "documents", "chat_messages", "llm_usage_daily"}
+
+# (name, token owner, method, path); "{case}" is the seeded hot case.
+SCENARIOS = [
+    ("me", LAWYER_ID, "GET", "/auth/me"),
+    ("list_cases_admin", ADMIN_ID, "GET", "/cases"),
+    ("list_cases_lawyer", LAWYER_ID, "GET", "/cases"),
+    ("list_cases_client", CLIENT_ID, "GET", "/cases"),
+    ("list_cases_status", LAWYER_ID, "GET", "/cases?status=open"),
+    ("list_cases_next_page", ADMIN_ID, "GET", "/cases?limit=20&page=2"),
+    ("list_cases_not_modified", LAWYER_ID, "GET", "/cases"),
+    ("case_stats_lawyer", LAWYER_ID, "GET", "/cases/stats"),
+    ("case_stats_client", CLIENT_ID, "GET", "/cases/stats"),
+    ("get_case", LAWYER_ID, "GET", "/cases/{case}"),
+    ("list_messages", LAWYER_ID, "GET", "/cases/{case}/chat"),
+    ("list_messages_next_page", LAWYER_ID, "GET", "/cases/{case}/chat?limit=20&page=2"),
+    ("list_messages_not_modified", LAWYER_ID, "GET", "/cases/{case}/chat"),
+    ("send_message", LAWYER_ID, "POST", "/cases/{case}/chat"),
+    ("list_documents", LAWYER_ID, "GET", "/cases/{case}/documents"),
+    ("list_documents_status", LAWYER_ID, "GET", "/cases/{case}/documents?status=analyzed"),
+    ("list_users", ADMIN_ID, "GET", "/users"),
+    ("list_users_role", ADMIN_ID, "GET", "/users?role=lawyer"),
+    ("get_user", LAWYER_ID, "GET", f"/users/{user_id(42)}"),
+    ("usage_by_case", ADMIN_ID, "GET", "/usage"),
+    ("usage_by_user", ADMIN_ID, "GET", "/usage?group_by=user"),
+    ("usage_case_by_day", ADMIN_ID, "GET", "/usage?group_by=day&case_id={case}"),
+]
+
+_CHECKED = re.compile(r"^\s*(SELECT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+async def _stub_chat(messages: list[dict], *args, **kwargs):
+    from app.services.claude_service import LLMUsage
+
+    return "stubbed reply", LLMUsage(input_tokens=100, output_tokens=20)
+
+
+def _walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+async def _collect_plans() -> tuple[dict[str, list[tuple[str, dict]]], dict[str, str]]:
+    from app import database
+    from app.main import app
+    from app.services.auth_service import create_access_token, pwd_context
+    from app.services.case_service import case_access_cache, case_stats_cache
+    from app.services.user_cache import user_cache
+
+    engine = database.engine
+    async with engine.begin() as conn:
+        await seed_database(conn, SeedVolumes().scaled(SCALE), pwd_context.hash("password"))
+    await vacuum_analyze(engine)
+
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if _CHECKED.match(statement):
+            captured.append((statement, tuple(parameters or ())))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    plans: dict[str, list[tuple[str, dict]]] = {}
+    server_timings: dict[str, str] = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for name, owner, method, path in SCENARIOS:
+                # Start cold so the lookups that caches normally absorb are checked too.
+                for cache in (user_cache, case_access_cache, case_stats_cache):
+                    cache.clear()
+                headers = {"Authorization": f"Bearer {create_access_token(str(owner))}"}
+                path = path.format(case=HOT_CASE_ID)
+                if "page=2" in path:
+                    first = await client.get(path.replace("&page=2", ""), headers=headers)
+                    cursor = first.json()["next_cursor"]
+                    path = path.replace("page=2", f"cursor={cursor}")
+                if name in NOT_MODIFIED_SCENARIOS:
+                    first = await client.get(path, headers=headers)
+                    headers["If-None-Match"] = first.headers["ETag"]
+                captured.clear()
+                body = {"content": "What is the limitation period?"} if method == "POST" else None
+                response = await client.request(method, path, headers=headers, json=body)
+                assert response.status_code < 400, (name, response.text)
+                if name in NOT_MODIFIED_SCENARIOS:
+                    assert response.status_code == 304, (name, response.status_code)
+                server_timings[name] = response.headers["Server-Timing"]
+                statements = list(captured)
+                plans[name] = []
+                async with engine.connect() as conn:
+                    for statement, parameters in statements:
+                        result = await conn.exec_driver_sql(
+                            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                        )
+                        raw = result.scalar_one()
+                        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                        plans[name].append((statement, plan))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        await engine.dispose()
+    return plans, server_timings
+
+
+@pytest.fixture(scope="module")
+def collected(migrated_db, monkeypatch_module):
+    from app.routers import chat
+
+    monkeypatch_module.setattr(chat, "chat_with_claude", _stub_chat)
+    return asyncio.run(_collect_plans())
+
+
+@pytest.fixture(scope="module")
+def query_plans(collected):
+    return collected[0]
+
+
+@pytest.fixture(scope="module")
+def server_timings(collected):
+    return collected[1]
+
+
+@pytest.fixture(scope="module")
+def monkeypatch_module():
+    with pytest.MonkeyPatch.context() as mp:
+        yield mp
+
+
+@pytest.mark.parametrize("scenario", [s[0] for s in SCENARIOS])
+def test_hot_queries_avoid_sequential_scans(query_plans, scenario):
+    assert query_plans[scenario], f"{scenario} issued no queries"
+    for statement, plan in query_plans[scenario]:
+        scanned = {
+            node["Relation Name"]
+            for node in _walk(plan)
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES
+        }
+        assert not scanned, f"{scenario}: seq scan on {scanned}\n{statement}"
+
+
+@pytest.mark.parametrize("scenario", [s[0] for s in SCENARIOS])
+def test_hot_queries_within_cost_budget(query_plans, scenario):
+    budget = AGGREGATE_COST_BUDGET if scenario in AGGREGATE_SCENARIOS else COST_BUDGET
+    for statement, plan in query_plans[scenario]:
+        cost = plan["Total Cost"]
+        assert cost <= budget, f"{scenario}: cost {cost} > {budget}\n{statement}"
+
+
+def _route_budget(method: str, path: str) -> int:
+    from starlette.routing import Match
+
+    from app.main import app
+
+    scope = {"type": "http", "method": method, "path": path.split("?")[0]}
+    for route in app.routes:
+        if route.matches(scope)[0] is Match.FULL:
+            return route.query_budget
+    raise LookupError(f"no route for {method} {path}")
+
+
+@pytest.mark.parametrize(("scenario", "method", "path"), [(s[0], s[2], s[3]) for s in SCENARIOS])
+def test_hot_paths_within_query_budget(server_timings, scenario, method, path):
+    budget = _route_budget(method, path.format(case=HOT_CASE_ID))
+    queries = int(re.search(r'db;desc="(\d+) queries"', server_timings[scenario]).group(1))
+    assert queries <= budget, f"{scenario}: {queries} queries > {budget}"
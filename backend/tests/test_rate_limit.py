@@ -0,0 +1,103 @@
+"""Token buckets on a fake clock, with the shared backend replaced by a stub."""
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services import rate_limit
+from app.services.rate_limit import Limit, RateLimiter, SharedBuckets
+
+PER_MINUTE = Limit("test", 6, 60)  # one token every 10 s
+TOKENS = Limit("tokens", 1000, 3600)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    class Clock:
+        now = 1000.0
+
+        def advance(self, seconds: float) -> None:
+            self.now += seconds
+
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock.now)
+    return clock
+
+
+class StubShared(SharedBuckets):
+    """Answers from a fixed token count and records every call."""
+
+    def __init__(self, tokens: float, error: Exception | None = None) -> None:
+        super().__init__()
+        self.tokens = tokens
+        self.error = error
+        self.calls: list[tuple[str, float, float]] = []
+
+    async def take(self, key, limit, amount, needed):
+        self.calls.append((key, amount, needed))
+        if self.error is not None:
+            raise self.error
+        if self.tokens < needed:
+            return False, self.tokens
+        self.tokens -= amount
+        return True, self.tokens
+
+
+async def test_bucket_empties_and_refills(clock):
+    limiter = RateLimiter(None, max_keys=10)
+    decisions = [await limiter.acquire("u", PER_MINUTE) for _ in range(7)]
+    assert [d.allowed for d in decisions] == [True] * 6 + [False]
+    assert decisions[-1].headers()["Retry-After"] == "10"
+
+    clock.advance(10)
+    assert (await limiter.acquire("u", PER_MINUTE)).allowed
+    assert not (await limiter.acquire("u", PER_MINUTE)).allowed
+    # Refill stops at capacity.
+    clock.advance(3600)
+    assert limiter.local.peek("u", PER_MINUTE) == PER_MINUTE.capacity
+
+
+async def test_charge_leaves_bucket_in_debt_until_refilled(clock):
+    limiter = RateLimiter(None, max_keys=10)
+    assert (await limiter.acquire("u", TOKENS, cost=0)).allowed
+    await limiter.charge("u", TOKENS, 1500)
+    assert limiter.local.peek("u", TOKENS) == -500
+
+    refused = await limiter.acquire("u", TOKENS, cost=0)
+    assert not refused.allowed
+    assert refused.headers()["RateLimit-Remaining"] == "0"
+    # 501 tokens at 1000 per hour bring it back above zero.
+    clock.advance(501 * 3.6)
+    assert (await limiter.acquire("u", TOKENS, cost=0)).allowed
+
+
+async def test_local_refusal_skips_shared_bucket(clock):
+    shared = StubShared(tokens=100)
+    limiter = RateLimiter(shared, max_keys=10)
+    for _ in range(6):
+        assert (await limiter.acquire("u", PER_MINUTE)).allowed
+    assert len(shared.calls) == 6
+
+    assert not (await limiter.acquire("u", PER_MINUTE)).allowed
+    assert len(shared.calls) == 6
+
+
+async def test_shared_refusal_does_not_spend_local_tokens(clock):
+    limiter = RateLimiter(StubShared(tokens=0), max_keys=10)
+    decision = await limiter.acquire("u", PER_MINUTE)
+    assert not decision.allowed
+    assert decision.tokens == 0
+    assert limiter.local.peek("u", PER_MINUTE) == PER_MINUTE.capacity
+
+
+async def test_unavailable_shared_bucket_falls_back_to_local(clock):
+    error = OperationalError("UPDATE", {}, ConnectionError("down"))
+    limiter = RateLimiter(StubShared(tokens=0, error=error), max_keys=10)
+    decisions = [await limiter.acquire("u", PER_MINUTE) for _ in range(7)]
+    assert [d.allowed for d in decisions] == [True] * 6 + [False]
+
+
+def test_least_recently_used_buckets_are_dropped(clock):
+    limiter = RateLimiter(None, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.local.take(key, PER_MINUTE, 6)
+    assert limiter.local.peek("a", PER_MINUTE) == PER_MINUTE.capacity
+    assert limiter.local.peek("c", PER_MINUTE) == 0
@@ -0,0 +1,48 @@
+"""Query counting through engine events, on an in-memory SQLite engine."""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from app.services import request_timing
+from app.services.request_timing import RequestTiming, instrument_engine
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    # instrument_engine takes the async engine and listens on its sync core.
+    instrument_engine(SimpleNamespace(sync_engine=engine))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def timing():
+    timing = RequestTiming()
+    token = request_timing._current.set(timing)
+    yield timing
+    request_timing._current.reset(token)
+
+
+def test_failed_statement_is_counted_and_leaves_nothing_on_the_connection(engine, timing):
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+        conn.execute(text("SELECT 1"))
+        assert timing.db_queries == 2
+        assert conn.info == {}
+
+
+def test_statements_outside_a_request_are_not_counted(engine, timing):
+    counted = []
+    event.listen(engine, "after_cursor_execute", lambda *args: counted.append(args))
+    token = request_timing._current.set(None)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        request_timing._current.reset(token)
+    assert counted
+    assert timing.db_queries == 0
@@ -0,0 +1,128 @@
+"""Usage ledger rollups and buffering, with the database replaced by a stub session."""
+import uuid
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services import usage_ledger
+from app.services.usage_ledger import UsageLedger, _rollup
+
+CASE_A, CASE_B = sorted([uuid.uuid4(), uuid.uuid4()])
+USER = uuid.uuid4()
+MONDAY = datetime(2026, 3, 2, 9, tzinfo=UTC)
+TUESDAY = datetime(2026, 3, 3, 23, 59, tzinfo=UTC)
+
+
+def _row(created_at=MONDAY, case_id=CASE_A, purpose="chat", model="m", tokens=10) -> dict:
+    return {
+        "created_at": created_at,
+        "user_id": USER,
+        "case_id": case_id,
+        "purpose": purpose,
+        "model": model,
+        "step": 0,
+        "input_tokens": tokens,
+        "output_tokens": 1,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 2,
+        "latency_ms": 100,
+    }
+
+
+def test_rollup_sums_calls_per_day_case_user_purpose_and_model():
+    rows = [
+        _row(TUESDAY, CASE_A),
+        _row(MONDAY, CASE_B),
+        _row(MONDAY.replace(hour=18), CASE_B, tokens=5),
+        _row(MONDAY, CASE_A, purpose="analysis"),
+        _row(MONDAY, CASE_A),
+    ]
+    totals = _rollup(rows)
+
+    assert [(t["day"], t["case_id"], t["purpose"]) for t in totals] == [
+        (MONDAY.date(), CASE_A, "analysis"),
+        (MONDAY.date(), CASE_A, "chat"),
+        (MONDAY.date(), CASE_B, "chat"),
+        (TUESDAY.date(), CASE_A, "chat"),
+    ]
+    both = totals[2]
+    assert both["calls"] == 2
+    assert both["input_tokens"] == 15
+    assert both["cache_read_input_tokens"] == 4
+    assert both["latency_ms"] == 200
+    assert both["user_id"] == USER and both["model"] == "m"
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    """Parameters of each statement the ledger sends; ``executed.fail`` makes writes fail."""
+
+    class Executed(list):
+        fail = False
+        meanwhile = None  # called while a write is in flight
+
+    sent = Executed()
+
+    class Session:
+        async def execute(self, stmt, params):
+            if sent.meanwhile is not None:
+                sent.meanwhile()
+            if sent.fail:
+                raise OperationalError("INSERT", {}, ConnectionError("down"))
+            sent.append(params)
+
+    @asynccontextmanager
+    async def session_scope():
+        yield Session()
+
+    monkeypatch.setattr(usage_ledger, "session_scope", session_scope)
+    return sent
+
+
+def _record(ledger: UsageLedger, tokens: int) -> None:
+    ledger.record(
+        user_id=USER,
+        case_id=CASE_A,
+        purpose="chat",
+        model="m",
+        step=0,
+        usage=SimpleNamespace(input_tokens=tokens, output_tokens=1),
+        latency_ms=100,
+    )
+
+
+async def test_flush_writes_calls_and_their_rollup(executed):
+    ledger = UsageLedger(batch_size=10, interval=60, max_buffered=10)
+    for tokens in (1, 2, 3):
+        _record(ledger, tokens)
+
+    assert await ledger.flush() == 3
+    calls, daily = executed
+    assert [row["input_tokens"] for row in calls] == [1, 2, 3]
+    assert [(row["calls"], row["input_tokens"]) for row in daily] == [(3, 6)]
+    assert await ledger.flush() == 0
+    assert len(executed) == 2
+
+
+async def test_failed_flush_puts_rows_back_in_front(executed):
+    ledger = UsageLedger(batch_size=10, interval=60, max_buffered=3)
+    for tokens in (1, 2):
+        _record(ledger, tokens)
+    executed.fail = True
+    executed.meanwhile = lambda: _record(ledger, 3)
+    with pytest.raises(OperationalError):
+        await ledger.flush()
+    assert [row["input_tokens"] for row in ledger._buffer] == [1, 2, 3]
+
+    # Over the cap, the oldest calls are dropped and counted.
+    executed.meanwhile = None
+    _record(ledger, 4)
+    assert [row["input_tokens"] for row in ledger._buffer] == [2, 3, 4]
+    assert ledger.dropped == 1
+
+    executed.fail = False
+    assert await ledger.flush() == 3
+    assert ledger._buffer == []
@@ -0,0 +1,150 @@
+"""Web search formatting, limits and failure reporting, against fixture providers."""
+import asyncio
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import claude_service, web_search
+from app.services.web_search import (
+    DuckDuckGoProvider,
+    FixtureProvider,
+    SearchError,
+    SearchProvider,
+    SearchResult,
+    format_results,
+)
+
+STATUTE = SearchResult(
+    "<b>Limitation Act 1980</b>",
+    "https://www.legislation.gov.uk/ukpga/1980/58/",
+    "Time limits   for actions &amp; arbitrations.",
+)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    def install(provider: SearchProvider) -> None:
+        monkeypatch.setattr(web_search, "_provider", provider)
+        monkeypatch.setattr(web_search, "_slots", asyncio.Semaphore(2))
+
+    return install
+
+
+def test_results_are_cleaned_and_deduplicated():
+    duplicates = [
+        STATUTE,
+        # Same page behind tracking parameters and without www.
+        SearchResult("Other title", "https://legislation.gov.uk/ukpga/1980/58?utm_source=x", "…"),
+        # Same title on a mirror.
+        SearchResult("Limitation Act 1980", "https://mirror.example.com/la1980", "…"),
+        SearchResult(
+            "Section 5", "https://www.legislation.gov.uk/ukpga/1980/58/section/5", "Six years."
+        ),
+    ]
+    text = format_results(duplicates, max_tokens=600)
+    assert text == (
+        "Limitation Act 1980\nTime limits for actions & arbitrations.\n"
+        "https://www.legislation.gov.uk/ukpga/1980/58/\n\n"
+        "Section 5\nSix years.\nhttps://www.legislation.gov.uk/ukpga/1980/58/section/5"
+    )
+
+
+def test_results_are_trimmed_to_the_token_budget():
+    results = [
+        SearchResult(f"Case {n}", f"https://example.com/{n}", "word " * 200) for n in range(5)
+    ]
+    text = format_results(results, max_tokens=100)
+    assert len(text) <= 100 * web_search.CHARS_PER_TOKEN
+    assert text.startswith("Case 0\n")
+    assert format_results([results[0]], max_tokens=10).endswith("…")
+    assert format_results([], max_tokens=100) == "No results found for this query."
+
+
+async def test_fixture_provider_answers_by_query(provider):
+    provider(FixtureProvider({"limitation period": [STATUTE], "*": []}))
+    assert "Limitation Act 1980" in await web_search.search(" Limitation Period ")
+    assert await web_search.search("unrelated") == "No results found for this query."
+
+
+async def test_slow_and_failing_searches_raise_search_error(provider, monkeypatch):
+    monkeypatch.setattr(web_search.settings, "SEARCH_TIMEOUT_SECONDS", 0.05)
+    provider(FixtureProvider({"*": [STATUTE]}, latency=1))
+    with pytest.raises(SearchError, match="timed out"):
+        await web_search.search("limitation")
+
+    class Broken(SearchProvider):
+        async def search(self, query, max_results):
+            raise ConnectionError("refused")
+
+    provider(Broken())
+    with pytest.raises(SearchError, match="unavailable"):
+        await web_search.search("limitation")
+    with pytest.raises(SearchError, match="empty"):
+        await web_search.search("  ")
+
+
+async def test_timed_out_duckduckgo_search_keeps_its_thread_slot(provider, monkeypatch):
+    monkeypatch.setattr(web_search.settings, "SEARCH_TIMEOUT_SECONDS", 0.05)
+    ddg = DuckDuckGoProvider(workers=1, timeout=1)
+    unblock = threading.Event()
+    started = []
+
+    def blocking_search(query, max_results):
+        started.append(query)
+        unblock.wait(2)
+        return []
+
+    monkeypatch.setattr(ddg, "_search", blocking_search)
+    submitted = []
+    submit = ddg._executor.submit
+    monkeypatch.setattr(
+        ddg._executor, "submit", lambda fn, *args: submitted.append(args[0]) or submit(fn, *args)
+    )
+    provider(ddg)
+    with pytest.raises(SearchError, match="timed out"):
+        await web_search.search("first")
+    # The search slot is free again but the thread is still busy, so this one
+    # times out waiting for the thread instead of submitting work behind it.
+    with pytest.raises(SearchError, match="timed out"):
+        await web_search.search("second")
+
+    unblock.set()
+    await asyncio.sleep(0.1)
+    assert await web_search.search("third") == "No results found for this query."
+    assert submitted == started == ["first", "third"]
+    await ddg.aclose()
+
+
+async def test_tool_loop_reports_failed_searches_as_tool_errors(provider, monkeypatch):
+    class Broken(SearchProvider):
+        async def search(self, query, max_results):
+            raise ConnectionError("refused")
+
+    provider(Broken())
+    usage = SimpleNamespace(input_tokens=10, output_tokens=5)
+    calls = []
+
+    def create(*, messages, **kwargs):
+        calls.append(messages)
+        if len(calls) == 1:
+            blocks = [
+                SimpleNamespace(type="tool_use", id=f"t{n}", name="web_search", input={"query": q})
+                for n, q in enumerate(["limitation", "laches"])
+            ]
+            return SimpleNamespace(stop_reason="tool_use", content=blocks, usage=usage)
+        text = SimpleNamespace(type="text", text="Six years.")
+        return SimpleNamespace(stop_reason="end_turn", content=[text], usage=usage)
+
+    client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    monkeypatch.setattr(claude_service, "_client", client)
+    answer, total = await claude_service.chat_with_claude(
+        [{"role": "user", "content": "Q"}], case_id=uuid.uuid4(), user_id=uuid.uuid4()
+    )
+
+    assert answer == "Six years."
+    assert total.total_tokens == 30
+    tool_results = calls[1][-1]["content"]
+    assert [r["tool_use_id"] for r in tool_results] == ["t0", "t1"]
+    assert all(r["is_error"] and "unavailable" in r["content"] for r in tool_results)
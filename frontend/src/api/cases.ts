@@ -1,4 +1,4 @@
-import client from './client'
+import client, { downloadFromLink, listAll } from './client'
 
 export interface Case {
   id: string
@@ -9,6 +9,8 @@ export interface Case {
   client_id: string | null
   created_at: string
   updated_at: string
+  // Returned by single-case routes: set while the chat history is archived.
+  chat_archived_at?: string | null
 }
 
 export interface CreateCasePayload {
@@ -22,8 +24,19 @@ export interface UpdateCasePayload {
   status?: 'open' | 'in_progress' | 'closed'
 }
 
-export const listCases = () =>
-  client.get<Case[]>('/cases').then((r) => r.data)
+export interface CaseStats {
+  total: number
+  open: number
+  in_progress: number
+  closed: number
+  documents: number
+  messages: number
+}
+
+export const getCaseStats = () =>
+  client.get<CaseStats>('/cases/stats').then((r) => r.data)
+
+export const listCases = () => listAll<Case>('/cases')
 
 export const createCase = (payload: CreateCasePayload) =>
   client.post<Case>('/cases', payload).then((r) => r.data)
@@ -44,3 +57,6 @@ export const assignCase = (id: string, payload: AssignCasePayload) =>
 
 export const deleteCase = (id: string) =>
   client.delete(`/cases/${id}`).then((r) => r.data)
+
+// Zip of every document, a manifest with the analyses, and the chat transcript.
+export const downloadCaseBundle = (id: string) => downloadFromLink(`/cases/${id}/bundle/link`)
@@ -1,4 +1,4 @@
-import client from './client'
+import client, { Page, downloadFromLink, idempotentPost } from './client'
 
 export interface Message {
   id: string
@@ -13,14 +13,26 @@ export interface SendMessagePayload {
 
 // POST returns [userMessage, assistantMessage]
 export const sendMessage = (caseId: string, payload: SendMessagePayload) =>
+  idempotentPost<Message[]>(`/cases/${caseId}/chat`, payload)
+
+// One page of messages, oldest first. Without a cursor it is the most recent
+// page; its next_cursor fetches the page of messages before it.
+export const listMessages = (caseId: string, cursor: string | null = null) =>
   client
-    .post<Message[]>(`/cases/${caseId}/chat`, payload)
+    .get<Page<Message>>(`/cases/${caseId}/chat`, { params: { cursor } })
     .then((r) => r.data)
 
-export const listMessages = (caseId: string) =>
-  client.get<Message[]>(`/cases/${caseId}/chat`).then((r) => r.data)
+// Moves an archived chat history back so it can be listed again.
+export const restoreMessages = (caseId: string) =>
+  client.post<{ restored: number }>(`/cases/${caseId}/chat/restore`).then((r) => r.data)
 
 export const deleteMessage = (caseId: string, messageId: string) =>
   client
     .delete(`/cases/${caseId}/chat/${messageId}`)
     .then((r) => r.data)
+
+export type ExportFormat = 'ndjson' | 'markdown' | 'csv'
+
+// Full conversation as a file; the server streams it in batches.
+export const exportMessages = (caseId: string, format: ExportFormat) =>
+  downloadFromLink(`/cases/${caseId}/chat/export/link`, { format })
@@ -27,4 +27,59 @@ client.interceptors.response.use(
   }
 )
 
+// The server's MAX_PAGE_SIZE.
+const MAX_PAGE_SIZE = 200
+
+// Keyset-paginated list response; pass a cursor back to fetch the adjacent page.
+export interface Page<T> {
+  items: T[]
+  next_cursor: string | null
+  prev_cursor: string | null
+}
+
+// Every item of a paginated list, following next_cursor one full page at a time.
+export const listAll = async <T>(url: string, params?: Record<string, unknown>): Promise<T[]> => {
+  const items: T[] = []
+  let cursor: string | null = null
+  do {
+    const { data }: { data: Page<T> } = await client.get<Page<T>>(url, {
+      params: { ...params, limit: MAX_PAGE_SIZE, cursor },
+    })
+    items.push(...data.items)
+    cursor = data.next_cursor
+  } while (cursor)
+  return items
+}
+
+export interface DownloadLink {
+  url: string
+  expires_in: number
+}
+
+// Streamed files are fetched by the browser itself from a short-lived signed
+// link, so they go straight to disk instead of being buffered as a Blob.
+export const downloadFromLink = async (linkPath: string, params?: Record<string, unknown>) => {
+  const { data } = await client.post<DownloadLink>(linkPath, undefined, { params })
+  const a = document.createElement('a')
+  a.href = `${client.defaults.baseURL}${data.url}`
+  a.click()
+}
+
+// POSTs that start LLM work send an Idempotency-Key and are retried with the
+// same key after a network error or gateway failure; the server answers a
+// retry from the first attempt instead of calling the model again.
+export const idempotentPost = async <T>(url: string, data?: unknown, retries = 2): Promise<T> => {
+  const headers = { 'Idempotency-Key': crypto.randomUUID() }
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return (await client.post<T>(url, data, { headers })).data
+    } catch (error) {
+      if (!axios.isAxiosError(error)) throw error
+      const status = error.response?.status
+      const retryable = status === undefined || (status >= 502 && status <= 504)
+      if (attempt >= retries || !retryable) throw error
+    }
+  }
+}
+
 export default client
@@ -1,4 +1,4 @@
-import client from './client'
+import client, { idempotentPost, listAll } from './client'
 
 export interface Document {
   id: string
@@ -21,13 +21,28 @@ export const uploadDocument = (caseId: string, file: File) => {
     .then((r) => r.data)
 }
 
-export const listDocuments = (caseId: string) =>
-  client.get<Document[]>(`/cases/${caseId}/documents`).then((r) => r.data)
+export interface DocumentUploadResult {
+  filename: string
+  document: Document | null
+  error: string | null
+}
 
-export const analyzeDocument = (caseId: string, docId: string) =>
-  client
-    .post<Document>(`/cases/${caseId}/documents/${docId}/analyze`)
+// One request for many files; each file succeeds or fails on its own.
+export const uploadDocuments = (caseId: string, files: File[], extract = true) => {
+  const form = new FormData()
+  files.forEach((file) => form.append('files', file))
+  return client
+    .post<DocumentUploadResult[]>(`/cases/${caseId}/documents/batch`, form, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+      params: { extract },
+    })
     .then((r) => r.data)
+}
+
+export const listDocuments = (caseId: string) => listAll<Document>(`/cases/${caseId}/documents`)
+
+export const analyzeDocument = (caseId: string, docId: string) =>
+  idempotentPost<Document>(`/cases/${caseId}/documents/${docId}/analyze`)
 
 export const downloadDocument = (caseId: string, docId: string) =>
   client
@@ -0,0 +1,56 @@
+import client from './client'
+import { useAuthStore } from '../store/auth'
+
+export interface CaseEvent {
+  event: string
+  data: Record<string, unknown>
+}
+
+const RETRY_MS = 3000
+
+// Follows /cases/:id/events until the returned function is called. Uses fetch
+// rather than EventSource so the bearer token travels in a header; reconnects
+// after errors and after the server ends the stream (e.g. a resync).
+export const subscribeCaseEvents = (caseId: string, onEvent: (e: CaseEvent) => void) => {
+  const controller = new AbortController()
+
+  const run = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const token = useAuthStore.getState().token
+        const response = await fetch(`${client.defaults.baseURL}/cases/${caseId}/events`, {
+          headers: token ? { Authorization: `Bearer ${token}` } : {},
+          signal: controller.signal,
+        })
+        if (response.status === 401 || response.status === 403 || response.status === 404) return
+        if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`)
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+        let buffer = ''
+        for (;;) {
+          const { value, done } = await reader.read()
+          if (done) break
+          buffer += value
+          let end
+          while ((end = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, end)
+            buffer = buffer.slice(end + 2)
+            let event = 'message'
+            let data = ''
+            for (const line of block.split('\n')) {
+              if (line.startsWith('event:')) event = line.slice(6).trim()
+              else if (line.startsWith('data:')) data += line.slice(5).trim()
+            }
+            if (data) onEvent({ event, data: JSON.parse(data) })
+          }
+        }
+      } catch {
+        if (controller.signal.aborted) return
+      }
+      await new Promise((resolve) => setTimeout(resolve, RETRY_MS))
+    }
+  }
+
+  run()
+  return () => controller.abort()
+}
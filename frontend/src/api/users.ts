@@ -1,4 +1,4 @@
-import client from './client'
+import client, { listAll } from './client'
 
 export interface UserPublic {
   id: string
@@ -18,8 +18,7 @@ export interface UpdateUserPayload {
 export const getUser = (id: string) =>
   client.get<UserPublic>(`/users/${id}`).then((r) => r.data)
 
-export const listUsers = () =>
-  client.get<UserPublic[]>('/users').then((r) => r.data)
+export const listUsers = () => listAll<UserPublic>('/users')
 
 export const updateUser = (id: string, payload: UpdateUserPayload) =>
   client.put<UserPublic>(`/users/${id}`, payload).then((r) => r.data)
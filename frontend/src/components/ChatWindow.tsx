@@ -1,47 +1,65 @@
 import { useEffect, useRef, useState } from 'react'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import toast from 'react-hot-toast'
-import { listMessages, sendMessage, Message } from '../api/chat'
+import { exportMessages, listMessages, restoreMessages, sendMessage, Message } from '../api/chat'
 import ChatMessage from './ChatMessage'
 import Spinner from './Spinner'
 
 interface Props {
   caseId: string
+  archived: boolean
 }
 
-const PAGE_SIZE = 30
-
-export default function ChatWindow({ caseId }: Props) {
+export default function ChatWindow({ caseId, archived }: Props) {
   const [input, setInput] = useState('')
   const [optimisticMessages, setOptimisticMessages] = useState<Message[]>([])
-  const [displayCount, setDisplayCount] = useState(PAGE_SIZE)
   const bottomRef = useRef<HTMLDivElement>(null)
   const textareaRef = useRef<HTMLTextAreaElement>(null)
   const qc = useQueryClient()
 
-  // Reset pagination when switching cases
-  useEffect(() => {
-    setDisplayCount(PAGE_SIZE)
-  }, [caseId])
+  // An archived history is brought back when the chat is opened, then listed.
+  const { mutate: restore, isError: restoreFailed } = useMutation({
+    mutationFn: () => restoreMessages(caseId),
+    onSuccess: () => {
+      qc.invalidateQueries({ queryKey: ['case', caseId] })
+      qc.invalidateQueries({ queryKey: ['messages', caseId] })
+    },
+    onError: () => toast.error('Failed to restore archived messages'),
+  })
 
-  const { data: messages, isLoading } = useQuery<Message[]>({
+  useEffect(() => {
+    if (archived) restore()
+  }, [archived, caseId, restore])
+
+  // The first page holds the latest messages; each further page is older.
+  const {
+    data,
+    isLoading: isListing,
+    hasNextPage: hasMore,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ['messages', caseId],
-    queryFn: () => listMessages(caseId),
+    queryFn: ({ pageParam }) => listMessages(caseId, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
+    enabled: !archived,
   })
+  const isLoading = isListing || (archived && !restoreFailed)
 
-  const allMessages = [...(messages ?? []), ...optimisticMessages]
-  const hasMore = allMessages.length > displayCount
-  const visibleMessages = allMessages.slice(Math.max(0, allMessages.length - displayCount))
+  const messages = data?.pages.slice().reverse().flatMap((page) => page.items) ?? []
+  const allMessages = [...messages, ...optimisticMessages]
+  const latestId = allMessages[allMessages.length - 1]?.id
 
+  // Follow new messages, not earlier pages loaded above them.
   useEffect(() => {
     bottomRef.current?.scrollIntoView({ behavior: 'smooth' })
-  }, [visibleMessages.length])
+  }, [latestId])
 
   const mutation = useMutation({
     mutationFn: (content: string) => sendMessage(caseId, { content }),
     onSuccess: () => {
       setOptimisticMessages([])
-      setDisplayCount((c) => c + 2) // make room for new user + AI message
       qc.invalidateQueries({ queryKey: ['messages', caseId] })
     },
     onError: () => {
@@ -86,10 +104,28 @@ export default function ChatWindow({ caseId }: Props) {
     }
   }
 
+  const handleExport = async () => {
+    try {
+      await exportMessages(caseId, 'markdown')
+    } catch {
+      toast.error('Export failed')
+    }
+  }
+
   return (
     <div className="flex flex-1 flex-col overflow-hidden">
       {/* Messages */}
       <div className="flex-1 overflow-y-auto px-4 py-4">
+        {!isLoading && allMessages.length > 0 && (
+          <div className="flex justify-end mb-2">
+            <button
+              onClick={handleExport}
+              className="text-xs text-gray-400 hover:text-gray-300 transition-colors"
+            >
+              Export transcript
+            </button>
+          </div>
+        )}
         {isLoading && (
           <div className="flex justify-center py-8">
             <Spinner />
@@ -100,10 +136,11 @@ export default function ChatWindow({ caseId }: Props) {
         {!isLoading && hasMore && (
           <div className="flex justify-center py-2 mb-2">
             <button
-              onClick={() => setDisplayCount((c) => c + PAGE_SIZE)}
-              className="text-xs text-indigo-400 hover:text-indigo-300 transition-colors"
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="text-xs text-indigo-400 hover:text-indigo-300 disabled:opacity-50 transition-colors"
             >
-              ↑ Load earlier messages
+              {isFetchingNextPage ? 'Loading…' : '↑ Load earlier messages'}
             </button>
           </div>
         )}
@@ -117,7 +154,7 @@ export default function ChatWindow({ caseId }: Props) {
           </div>
         )}
 
-        {visibleMessages.map((msg) => (
+        {allMessages.map((msg) => (
           <ChatMessage key={msg.id} message={msg} />
         ))}
 
@@ -4,6 +4,7 @@ import toast from 'react-hot-toast'
 import {
   listDocuments,
   uploadDocument,
+  uploadDocuments,
   analyzeDocument,
   downloadDocument,
   deleteDocument,
@@ -45,10 +46,20 @@ export default function DocumentPanel({ caseId }: Props) {
   })
 
   const uploadMutation = useMutation({
-    mutationFn: (file: File) => uploadDocument(caseId, file),
-    onSuccess: () => {
+    mutationFn: async (files: File[]) => {
+      if (files.length === 1) {
+        await uploadDocument(caseId, files[0])
+        return []
+      }
+      return uploadDocuments(caseId, files)
+    },
+    onSuccess: (results) => {
       qc.invalidateQueries({ queryKey: ['documents', caseId] })
-      toast.success('Document uploaded')
+      const failed = results.filter((r) => r.error)
+      failed.forEach((r) => toast.error(`${r.filename}: ${r.error}`))
+      const uploaded = results.length - failed.length
+      if (results.length === 0) toast.success('Document uploaded')
+      else if (uploaded > 0) toast.success(`${uploaded} documents uploaded`)
     },
     onError: () => toast.error('Upload failed'),
   })
@@ -89,17 +100,17 @@ export default function DocumentPanel({ caseId }: Props) {
   }
 
   const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
-    const file = e.target.files?.[0]
-    if (file) {
-      uploadMutation.mutate(file)
+    const files = Array.from(e.target.files ?? [])
+    if (files.length > 0) {
+      uploadMutation.mutate(files)
       e.target.value = ''
     }
   }
 
   const handleDrop = (e: React.DragEvent) => {
     e.preventDefault()
-    const file = e.dataTransfer.files[0]
-    if (file) uploadMutation.mutate(file)
+    const files = Array.from(e.dataTransfer.files)
+    if (files.length > 0) uploadMutation.mutate(files)
   }
 
   return (
@@ -128,6 +139,7 @@ export default function DocumentPanel({ caseId }: Props) {
         <input
           ref={fileInputRef}
           type="file"
+          multiple
           accept=".pdf,.docx,.txt"
           className="hidden"
           onChange={handleFileChange}
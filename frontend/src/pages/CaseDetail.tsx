@@ -2,8 +2,9 @@ import { useEffect, useState } from 'react'
 import { useParams, Navigate, useNavigate } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import toast from 'react-hot-toast'
-import { getCase, updateCase, assignCase, deleteCase as deleteCaseApi, AssignCasePayload, Case } from '../api/cases'
+import { getCase, updateCase, assignCase, deleteCase as deleteCaseApi, downloadCaseBundle, AssignCasePayload, Case } from '../api/cases'
 import { listUsers, UserPublic } from '../api/users'
+import { subscribeCaseEvents } from '../api/events'
 import { useAuthStore } from '../store/auth'
 import ChatWindow from '../components/ChatWindow'
 import DocumentPanel from '../components/DocumentPanel'
@@ -64,6 +65,7 @@ export default function CaseDetail() {
   const navigate = useNavigate()
   const [activeTab, setActiveTab] = useState<Tab>('chat')
   const [confirmDelete, setConfirmDelete] = useState(false)
+  const [isBundling, setIsBundling] = useState(false)
   const [selectedLawyerId, setSelectedLawyerId] = useState('')
   const [selectedClientId, setSelectedClientId] = useState('')
   const user = useAuthStore((s) => s.user)
@@ -92,16 +94,45 @@ export default function CaseDetail() {
     }
   }, [caseData?.lawyer_id, caseData?.client_id])
 
+  // Live updates from collaborators; every event just refetches what it touched.
+  useEffect(() => {
+    if (!id) return
+    return subscribeCaseEvents(id, ({ event }) => {
+      if (event.startsWith('message.') || event === 'ready' || event === 'resync') {
+        queryClient.invalidateQueries({ queryKey: ['messages', id] })
+      }
+      if (event.startsWith('document.') || event === 'ready' || event === 'resync') {
+        queryClient.invalidateQueries({ queryKey: ['documents', id] })
+      }
+      if (event.startsWith('case.') || event === 'resync') {
+        queryClient.invalidateQueries({ queryKey: ['case', id] })
+        queryClient.invalidateQueries({ queryKey: ['cases'] })
+      }
+    })
+  }, [id, queryClient])
+
   const { mutate: changeStatus } = useMutation({
     mutationFn: (status: string) =>
       updateCase(id!, { status: status as 'open' | 'in_progress' | 'closed' }),
     onSuccess: (updated) => {
       queryClient.setQueryData(['case', id], updated)
+      queryClient.invalidateQueries({ queryKey: ['cases'] })
       toast.success('Status updated')
     },
     onError: () => toast.error('Failed to update status'),
   })
 
+  const handleDownloadBundle = async () => {
+    setIsBundling(true)
+    try {
+      await downloadCaseBundle(id!)
+    } catch {
+      toast.error('Download failed')
+    } finally {
+      setIsBundling(false)
+    }
+  }
+
   const { mutate: doDelete, isPending: isDeleting } = useMutation({
     mutationFn: () => deleteCaseApi(id!),
     onSuccess: () => {
@@ -191,6 +222,22 @@ export default function CaseDetail() {
             </span>
           )}
 
+          <button
+            onClick={handleDownloadBundle}
+            disabled={isBundling}
+            title="Download case bundle"
+            className="text-gray-500 hover:text-indigo-400 transition-colors disabled:opacity-50"
+          >
+            {isBundling ? (
+              <Spinner size="sm" />
+            ) : (
+              <svg className="h-4 w-4" fill="none" viewBox="0 0 24 24" stroke="currentColor">
+                <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2}
+                  d="M4 16v1a3 3 0 003 3h10a3 3 0 003-3v-1m-4-4l-4 4m0 0l-4-4m4 4V4" />
+              </svg>
+            )}
+          </button>
+
           {/* Delete button (admin only) */}
           {isAdmin && (
             confirmDelete ? (
@@ -244,7 +291,9 @@ export default function CaseDetail() {
 
       {/* Tab content */}
       <div className="flex flex-1 flex-col overflow-hidden">
-        {activeTab === 'chat' && <ChatWindow caseId={id} />}
+        {activeTab === 'chat' && (
+          <ChatWindow caseId={id} archived={!!caseData?.chat_archived_at} />
+        )}
         {activeTab === 'documents' && <DocumentPanel caseId={id} />}
         {activeTab === 'details' && (
           <div className="overflow-y-auto p-6 space-y-6">
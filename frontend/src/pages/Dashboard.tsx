@@ -1,7 +1,7 @@
 import { useState } from 'react'
 import { useQuery } from '@tanstack/react-query'
 import { useNavigate } from 'react-router-dom'
-import { listCases, Case } from '../api/cases'
+import { getCaseStats, listCases, Case, CaseStats } from '../api/cases'
 import { useAuthStore } from '../store/auth'
 import Spinner from '../components/Spinner'
 
@@ -29,12 +29,11 @@ export default function Dashboard() {
     queryFn: listCases,
   })
 
-  const stats = {
-    total: cases?.length ?? 0,
-    open: cases?.filter((c) => c.status === 'open').length ?? 0,
-    in_progress: cases?.filter((c) => c.status === 'in_progress').length ?? 0,
-    closed: cases?.filter((c) => c.status === 'closed').length ?? 0,
-  }
+  // Under ['cases'] so existing case mutations invalidate the counters too
+  const { data: stats } = useQuery<CaseStats>({
+    queryKey: ['cases', 'stats'],
+    queryFn: getCaseStats,
+  })
 
   const totalPages = Math.ceil((cases?.length ?? 0) / PAGE_SIZE)
   const paginatedCases = cases?.slice((page - 1) * PAGE_SIZE, page * PAGE_SIZE)
@@ -49,10 +48,10 @@ export default function Dashboard() {
       {/* Stats */}
       <div className="grid grid-cols-2 gap-4 mb-8 sm:grid-cols-4">
         {[
-          { label: 'Total Cases', value: stats.total, color: 'text-white' },
-          { label: 'Open', value: stats.open, color: 'text-green-400' },
-          { label: 'In Progress', value: stats.in_progress, color: 'text-yellow-400' },
-          { label: 'Closed', value: stats.closed, color: 'text-gray-400' },
+          { label: 'Total Cases', value: stats?.total ?? 0, color: 'text-white' },
+          { label: 'Open', value: stats?.open ?? 0, color: 'text-green-400' },
+          { label: 'In Progress', value: stats?.in_progress ?? 0, color: 'text-yellow-400' },
+          { label: 'Closed', value: stats?.closed ?? 0, color: 'text-gray-400' },
         ].map((stat) => (
           <div key={stat.label} className="rounded-xl bg-gray-800 border border-gray-700/50 p-4">
             <p className="text-xs text-gray-500 uppercase tracking-wider">{stat.label}</p>